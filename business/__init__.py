@@ -1 +1,5 @@
-from .simulation import Simulation, SimulationParams, PharmacyDayStatistics
\ No newline at end of file
+from .simulation import Simulation, SimulationParams, PharmacyDayStatistics
+from .replication import ReplicationResult, run_replications
+from .scenario import Scenario, ScenarioCache
+from .sweep import SweepResult, sweep
+from .network import Network, SupplierParams
@@ -0,0 +1,164 @@
+import math
+import numpy as np
+
+from statistics import NormalDist
+from typing import Self
+
+from .pharmacy import PharmacyDayStatistics
+
+
+def t_quantile(p : float, df : int) -> float:
+    """
+    Квантиль распределения Стьюдента (разложение Корниша — Фишера, для df <= 2 — точная формула).
+    """
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) * math.sqrt(2 / (4 * p * (1 - p)))
+
+    z = NormalDist().inv_cdf(p)
+    return (
+        z
+        + (z ** 3 + z) / (4 * df)
+        + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+        + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3)
+        + (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / (92160 * df ** 4)
+    )
+
+
+class RunningStat:
+    """
+    Сумма, среднее и дисперсия потока значений (алгоритм Уэлфорда) без хранения самих значений.
+    """
+    def __init__(self):
+        self.count = 0
+        self.total = .0
+        self.mean = .0
+        self.m2 = .0
+
+    def add(self, value : float):
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else .0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def half_width(self, confidence : float = 0.95) -> float:
+        """
+        Полуширина доверительного интервала для среднего.
+        """
+        if self.count < 2:
+            return math.inf
+        return t_quantile((1 + confidence) / 2, self.count - 1) * self.std / math.sqrt(self.count)
+
+    def to_array(self) -> np.ndarray:
+        return np.array([self.count, self.total, self.mean, self.m2])
+
+    @classmethod
+    def from_array(cls, values : np.ndarray) -> Self:
+        stat = cls()
+        count, stat.total, stat.mean, stat.m2 = values.tolist()
+        stat.count = int(count)
+        return stat
+
+    def to_dict(self) -> dict:
+        return {
+            'total': self.total,
+            'mean': self.mean,
+            'std': self.std,
+        }
+
+
+class SimulationTotals:
+    """
+    Накопленные итоги прогона: каждый день только обновляет счётчики,
+    поэтому память не растёт с длиной горизонта.
+    """
+    METRICS = ('revenue', 'profit', 'losses', 'orders', 'delivered', 'courier_utilization')
+
+    def __init__(self, medicines : int, couriers : int = 0):
+        self.days = 0
+        self.revenue = RunningStat()
+        self.profit = RunningStat()
+        self.losses = RunningStat()
+        self.orders = RunningStat()
+        self.delivered = RunningStat()
+        self.courier_utilization = RunningStat()
+
+        self.requested_units = 0
+        self.filled_units = 0
+        self.stockouts = 0
+        self.no_courier = 0
+        self.sales = np.zeros(medicines, dtype=np.int64)
+        self.courier_orders = np.zeros(couriers, dtype=np.int64)
+
+    def add(self, statistics : PharmacyDayStatistics, sales : np.ndarray):
+        self.days += 1
+        self.revenue.add(statistics.revenue)
+        self.profit.add(statistics.profit)
+        self.losses.add(statistics.losses)
+        self.orders.add(statistics.order_count)
+        self.delivered.add(statistics.delivered)
+        self.courier_utilization.add(statistics.courier_utilization)
+
+        self.requested_units += statistics.requested_units
+        self.filled_units += statistics.filled_units
+        self.stockouts += statistics.stockouts
+        self.no_courier += statistics.no_courier
+        self.sales += sales
+        if statistics.courier_load:
+            self.courier_orders += statistics.courier_load
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        return {
+            'stats': np.stack([getattr(self, name).to_array() for name in self.METRICS]),
+            'counters': np.array([
+                self.days, self.requested_units, self.filled_units, self.stockouts, self.no_courier,
+            ], dtype=np.int64),
+            'sales': self.sales.copy(),
+            'couriers': self.courier_orders.copy(),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays : dict[str, np.ndarray]) -> Self:
+        totals = cls(len(arrays['sales']))
+        for name, values in zip(cls.METRICS, arrays['stats']):
+            setattr(totals, name, RunningStat.from_array(values))
+        (
+            totals.days, totals.requested_units, totals.filled_units, totals.stockouts, totals.no_courier,
+        ) = arrays['counters'].tolist()
+        totals.sales = arrays['sales'].astype(np.int64)
+        totals.courier_orders = arrays.get('couriers', np.zeros(0)).astype(np.int64)
+        return totals
+
+    @property
+    def fill_rate(self) -> float:
+        return self.filled_units / self.requested_units if self.requested_units else 1.0
+
+    @property
+    def service_level(self) -> float:
+        return self.delivered.total / self.orders.total if self.orders.total else 1.0
+
+    @property
+    def margin(self) -> float:
+        return (self.profit.total / self.revenue.total * 100) if self.revenue.total > 0 else 0
+
+    def to_dict(self) -> dict:
+        return {
+            'days': self.days,
+            **{name: getattr(self, name).to_dict() for name in self.METRICS},
+            'margin': self.margin,
+            'fill_rate': self.fill_rate,
+            'service_level': self.service_level,
+            'stockouts': self.stockouts,
+            'no_courier': self.no_courier,
+            'courier_orders': self.courier_orders.tolist(),
+        }
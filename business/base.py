@@ -1,4 +1,6 @@
 class IDaily:
+    __slots__ = ()
+
     def start_day(self):
         raise NotImplementedError
     
@@ -0,0 +1,277 @@
+"""
+Набор замеров горячих путей моделирования на синтетических сценариях.
+
+Каждый замер выполняется для всех сочетаний масштабов (`--scale` или явные `--skus`,
+`--customers`, `--base-orders`, `--days`), берётся лучшее время из `--repeat` повторов.
+Результаты пишутся в JSON (`--output`); с `--baseline` они сравниваются с сохранённым
+прогоном, и замедление больше `--threshold` считается регрессией (код выхода 1).
+
+    python -m business.bench --scale small medium --output bench.json
+    python -m business.bench --scale small medium --baseline bench.json
+    python -m business.bench --case simulation.run --skus 20 50000 --customers 1000 --days 30
+"""
+import argparse
+import itertools
+import json
+import platform
+import sys
+import time
+import numpy as np
+
+from datetime import datetime
+from pydantic import BaseModel
+
+from ..pharmacy import Pharmacy
+from ..simulation import Simulation, SimulationParams
+from .synthetic import synthetic_scenario
+
+
+class Scale(BaseModel):
+    skus        : int
+    customers   : int
+    base_orders : int
+    days        : int
+
+    @property
+    def key(self) -> str:
+        return f'skus={self.skus} customers={self.customers} base_orders={self.base_orders} days={self.days}'
+
+
+SCALES = {
+    'small': Scale(skus=20, customers=20, base_orders=10, days=100),
+    'medium': Scale(skus=1000, customers=10_000, base_orders=1000, days=30),
+    'large': Scale(skus=50_000, customers=100_000, base_orders=10_000, days=10),
+    'huge': Scale(skus=50_000, customers=1_000_000, base_orders=100_000, days=3),
+}
+
+
+def make_simulation(scale : Scale, scenario, seed : int = 0, array_inventory : bool = False) -> Simulation:
+    params = SimulationParams(
+        days = scale.days,
+        # курьеров хватает на все заказы, чтобы склад и кассир обрабатывали весь поток
+        couriers = (2 * scale.base_orders + scale.customers) // Pharmacy.COURIER_MAX_ORDERS + 1,
+        retail_margin = 0.25,
+        card_discount = 0.05,
+        base_orders = scale.base_orders,
+        sensitivity = 0.05,
+        array_inventory = array_inventory,
+    )
+    return Simulation(params, scenario, seed=seed, history=0)
+
+
+def day_orders(sim : Simulation) -> list:
+    pharmacy = sim.pharmacy
+    pharmacy.day = sim.current_day
+    pharmacy.start_day()
+    pharmacy.add_regular_orders(sim.current_day)
+    pharmacy.add_ordes(sim.generate_orders())
+    return pharmacy.orders
+
+
+# Каждый замер получает масштаб и сценарий, готовит состояние и возвращает
+# время измеряемой части и число обработанных единиц.
+
+def bench_generate_orders(scale, scenario):
+    sim = make_simulation(scale, scenario)
+    start = time.perf_counter()
+    orders = sim.generate_orders()
+    return time.perf_counter() - start, len(orders)
+
+
+def _bench_process_orders(scale, scenario, array_inventory):
+    sim = make_simulation(scale, scenario, array_inventory=array_inventory)
+    orders = day_orders(sim)
+    start = time.perf_counter()
+    sim.warehouse.process_orders(orders)
+    return time.perf_counter() - start, len(orders)
+
+
+def bench_warehouse_process_orders(scale, scenario):
+    return _bench_process_orders(scale, scenario, array_inventory=False)
+
+
+def bench_array_warehouse_process_orders(scale, scenario):
+    return _bench_process_orders(scale, scenario, array_inventory=True)
+
+
+def bench_warehouse_end_day(scale, scenario):
+    sim = make_simulation(scale, scenario)
+    # обычный день: первый конец дня обходит весь склад, замеряется второй, после продаж
+    sim.next_day()
+    sim.warehouse.process_orders(day_orders(sim))
+    start = time.perf_counter()
+    sim.warehouse.end_day()
+    sim.warehouse.start_day()
+    return time.perf_counter() - start, scale.skus
+
+
+def bench_warehouse_medicine_sell(scale, scenario):
+    sim = make_simulation(scale, scenario)
+    medicines = sim.warehouse.medicines
+    start = time.perf_counter()
+    for warehouse_medicine in medicines:
+        warehouse_medicine.sell(1)
+    return time.perf_counter() - start, len(medicines)
+
+
+def bench_paymaster_count_summary(scale, scenario):
+    sim = make_simulation(scale, scenario)
+    orders = day_orders(sim)
+    sim.warehouse.process_orders(orders)
+    paymaster = sim.pharmacy.paymaster
+    start = time.perf_counter()
+    for order in orders:
+        paymaster.count_summary(order)
+    return time.perf_counter() - start, len(orders)
+
+
+def bench_simulation_build(scale, scenario):
+    start = time.perf_counter()
+    make_simulation(scale, scenario)
+    return time.perf_counter() - start, scale.customers
+
+
+def bench_simulation_run(scale, scenario):
+    sim = make_simulation(scale, scenario)
+    start = time.perf_counter()
+    sim.run()
+    return time.perf_counter() - start, scale.days
+
+
+CASES = {
+    'simulation.generate_orders': (bench_generate_orders, 'заказов'),
+    'warehouse.process_orders': (bench_warehouse_process_orders, 'заказов'),
+    'array_warehouse.process_orders': (bench_array_warehouse_process_orders, 'заказов'),
+    'warehouse.end_day': (bench_warehouse_end_day, 'SKU'),
+    'warehouse_medicine.sell': (bench_warehouse_medicine_sell, 'SKU'),
+    'paymaster.count_summary': (bench_paymaster_count_summary, 'заказов'),
+    'simulation.build': (bench_simulation_build, 'клиентов'),
+    'simulation.run': (bench_simulation_run, 'дней'),
+}
+
+
+def run_case(name : str, scale : Scale, scenario, repeat : int) -> dict:
+    function, unit = CASES[name]
+    timings = []
+    for _ in range(repeat):
+        elapsed, units = function(scale, scenario)
+        timings.append(elapsed)
+
+    best = min(timings)
+    return {
+        'case': name,
+        'scale': scale.model_dump(),
+        'seconds': best,
+        'median': float(np.median(timings)),
+        'units': units,
+        'unit': unit,
+        'per_second': units / best if best else float('inf'),
+    }
+
+
+def result_key(result : dict) -> str:
+    return f"{result['case']} {Scale(**result['scale']).key}"
+
+
+def compare(results : list[dict], baseline : list[dict], threshold : float) -> tuple[list[str], int]:
+    previous = {result_key(result): result for result in baseline}
+    lines = []
+    regressions = 0
+    for result in results:
+        key = result_key(result)
+        if key not in previous:
+            lines.append(f'  нов.   {key}: {result["seconds"] * 1e3:.2f} мс')
+            continue
+
+        ratio = result['seconds'] / previous[key]['seconds']
+        if ratio > 1 + threshold:
+            status = 'РЕГР.'
+            regressions += 1
+        elif ratio < 1 - threshold:
+            status = 'уск.'
+        else:
+            status = 'ок'
+        lines.append(
+            f'  {status:6} {key}: {previous[key]["seconds"] * 1e3:.2f} -> {result["seconds"] * 1e3:.2f} мс (x{ratio:.2f})'
+        )
+    return lines, regressions
+
+
+def parse_args(argv : list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m business.bench',
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--case', nargs='+', choices=sorted(CASES), default=list(CASES))
+    parser.add_argument('--scale', nargs='+', choices=sorted(SCALES), default=['small', 'medium'])
+    parser.add_argument('--skus', type=int, nargs='+')
+    parser.add_argument('--customers', type=int, nargs='+')
+    parser.add_argument('--base-orders', dest='base_orders', type=int, nargs='+')
+    parser.add_argument('--days', type=int, nargs='+')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='JSON с результатами')
+    parser.add_argument('--baseline', help='JSON предыдущего прогона для сравнения')
+    parser.add_argument('--threshold', type=float, default=0.2, help='допустимое замедление, доля')
+    return parser.parse_args(argv)
+
+
+def scales(args : argparse.Namespace) -> list[Scale]:
+    """
+    Явно заданные размеры образуют сетку; недостающие берутся из пресетов `--scale`.
+    """
+    result = []
+    for preset in args.scale:
+        base = SCALES[preset]
+        axes = [getattr(args, name) or [getattr(base, name)] for name in Scale.model_fields]
+        for values in itertools.product(*axes):
+            scale = Scale(**dict(zip(Scale.model_fields, values)))
+            if scale not in result:
+                result.append(scale)
+    return result
+
+
+def main(argv : list[str] | None = None):
+    args = parse_args(argv)
+
+    results = []
+    scenarios = {}
+    for scale in scales(args):
+        print(scale.key, flush=True)
+        size = (scale.skus, scale.customers)
+        if size not in scenarios:
+            scenarios[size] = synthetic_scenario(*size, seed=args.seed)
+        scenario = scenarios[size]
+        for name in args.case:
+            result = run_case(name, scale, scenario, args.repeat)
+            results.append(result)
+            print(
+                f"  {name:32} {result['seconds'] * 1e3:10.2f} мс"
+                f"  {result['per_second']:14,.0f} {result['unit']}/с",
+                flush=True,
+            )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'machine': platform.machine(),
+                'results': results,
+            }, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        lines, regressions = compare(results, baseline, args.threshold)
+        print(f'\nСравнение с {args.baseline} (порог {args.threshold:.0%}):')
+        print('\n'.join(lines))
+        print(f'Регрессий: {regressions}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Стоимость обработки одного заказа складом: ключи-объекты `Medicine`
+(хеш по всем полям модели) против целочисленных `Medicine.id`.
+
+    python -m business.bench.catalog --skus 10000 --orders 20000
+"""
+import argparse
+import random
+import time
+import numpy as np
+
+from ..customer import Customer
+from ..medicine import Medicine, MedicineCatalog, MedicineGroup, MedicineType, WarehouseMedicineOrder
+from ..order import Order, OrderStatus, OrderType
+from ..warehouse import Warehouse
+
+
+def make_catalog(skus : int) -> MedicineCatalog:
+    return MedicineCatalog([
+        Medicine(
+            name = f'Лекарство {i + 1}',
+            dosage = random.choice([50, 100, 200]),
+            type = random.choice(list(MedicineType)),
+            group = random.choice(list(MedicineGroup)),
+            wholesale = round(random.uniform(10, 100), 2),
+            expiration_days = random.randint(60, 300),
+            purchase_quantity = random.randint(20, 100),
+            min_quantity = random.randint(5, 20),
+        )
+        for i in range(skus)
+    ])
+
+
+def legacy_process_order(medicines : dict[Medicine, object], order : Order):
+    preliminary_reciept = WarehouseMedicineOrder()
+
+    order.status = OrderStatus.DELIVERED
+    for medicine, cnt in order.requested_medicines.items():
+        med_bill = medicines[medicine].sell(cnt)
+
+        preliminary_reciept.count += med_bill.count
+        preliminary_reciept.cost += med_bill.cost
+
+        if med_bill.count < cnt:
+            order.status = OrderStatus.PARTIALLY
+
+    if preliminary_reciept.count == 0:
+        order.status = OrderStatus.NO_MEDICINES
+
+    order.set_preliminary_reciept(preliminary_reciept)
+
+
+def measure(skus : int, orders : int) -> dict[str, float]:
+    catalog = make_catalog(skus)
+    customer = Customer.generate_customer(np.random.default_rng(0))
+    lines = [
+        [(random.randrange(skus), random.randint(1, 5)) for _ in range(random.randint(1, 5))]
+        for _ in range(orders)
+    ]
+
+    warehouse = Warehouse(catalog, [10 ** 9] * skus)
+    by_medicine = {wm.medicine: wm for wm in warehouse.medicines}
+
+    start = time.perf_counter()
+    for order_lines in lines:
+        order = Order(customer, {catalog[i]: cnt for i, cnt in order_lines}, OrderType.RANDOM)
+        legacy_process_order(by_medicine, order)
+    before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for order_lines in lines:
+        order = Order(customer, {i: cnt for i, cnt in order_lines}, OrderType.RANDOM)
+        warehouse.process_order(order)
+    after = time.perf_counter() - start
+
+    return {
+        'before_us': before / orders * 1e6,
+        'after_us': after / orders * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--skus', type=int, default=10_000)
+    parser.add_argument('--orders', type=int, default=20_000)
+    args = parser.parse_args()
+
+    result = measure(args.skus, args.orders)
+    print(f"SKU: {args.skus}, заказов: {args.orders}")
+    print(f"ключ Medicine: {result['before_us']:.2f} мкс/заказ")
+    print(f"ключ id:       {result['after_us']:.2f} мкс/заказ")
+    print(f"ускорение:     x{result['before_us'] / result['after_us']:.1f}")
+
+
+if __name__ == '__main__':
+    main()
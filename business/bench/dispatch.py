@@ -0,0 +1,66 @@
+"""
+Время отбора заказов дня политиками доставки при росте числа заказов.
+
+    python -m business.bench.dispatch --skus 1000 --orders 10000 100000
+"""
+import argparse
+import time
+import numpy as np
+
+from ..customer import CustomerRecord
+from ..dispatch import POLICIES
+from ..order import Order, OrderType
+from ..warehouse import Warehouse
+from .catalog import make_catalog
+
+
+def make_orders(skus : int, orders : int, rng : np.random.Generator) -> list[Order]:
+    sizes = rng.integers(1, 6, size=orders)
+    medicines = rng.integers(skus, size=sizes.sum()).tolist()
+    counts = rng.integers(1, 6, size=sizes.sum()).tolist()
+    offsets = np.r_[0, np.cumsum(sizes)].tolist()
+    return [
+        Order(
+            CustomerRecord.generate(rng),
+            dict(zip(medicines[start:end], counts[start:end])),
+            OrderType.REGULAR if rng.random() < 0.2 else OrderType.RANDOM,
+        )
+        for start, end in zip(offsets, offsets[1:])
+    ]
+
+
+def measure(skus : int, orders : int, couriers : int, capacity : int, repeat : int = 3, seed : int = 0) -> dict[str, float]:
+    rng = np.random.default_rng(seed)
+    warehouse = Warehouse(make_catalog(skus), [100] * skus)
+    day_orders = make_orders(skus, orders, rng)
+
+    results = {}
+    for name, policy_class in POLICIES.items():
+        policy = policy_class()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            policy.dispatch(day_orders, warehouse, couriers, capacity)
+            timings.append(time.perf_counter() - start)
+        results[name] = min(timings)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--skus', type=int, default=1000)
+    parser.add_argument('--orders', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--couriers', type=int, default=100)
+    parser.add_argument('--capacity', type=int, default=15)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"SKU: {args.skus}, курьеров: {args.couriers} по {args.capacity} заказов")
+    for orders in args.orders:
+        results = measure(args.skus, orders, args.couriers, args.capacity, args.repeat)
+        timings = ', '.join(f'{name} {seconds * 1e3:.1f} мс' for name, seconds in results.items())
+        print(f"заказов {orders:>7}: {timings}")
+
+
+if __name__ == '__main__':
+    main()
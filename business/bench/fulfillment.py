@@ -0,0 +1,95 @@
+"""
+Обработка заказов дня складом: последовательные `process_order` против пакетного
+`process_orders` для обоих складов. Несколько партий на лекарство (часть уценена,
+часть просрочена), спрос выше запасов, чтобы встречались частичные заказы.
+
+    python -m business.bench.fulfillment --skus 1000 --orders 1000 5000 20000
+"""
+import argparse
+import time
+import numpy as np
+
+from ..customer import CustomerRecord
+from ..inventory import ArrayWarehouse
+from ..order import Order, OrderType
+from ..warehouse import Warehouse
+from .catalog import make_catalog
+
+
+BACKENDS = {'objects': Warehouse, 'arrays': ArrayWarehouse}
+
+
+def make_states(skus : int, rng : np.random.Generator) -> list[tuple]:
+    return [
+        (tuple(
+            (int(count), int(expiration))
+            for count, expiration in zip(rng.integers(0, 40, size=batches), np.sort(rng.integers(0, 200, size=batches)))
+        ), None)
+        for batches in rng.integers(1, 6, size=skus)
+    ]
+
+
+def make_orders(lines : list[dict[int, int]]) -> list[Order]:
+    customer = CustomerRecord.generate(np.random.default_rng(0))
+    return [Order(customer, dict(order_lines), OrderType.RANDOM) for order_lines in lines]
+
+
+def run(warehouse_class, catalog, states, lines, batched : bool) -> tuple[float, list[tuple]]:
+    warehouse = warehouse_class(catalog, [0] * len(catalog))
+    warehouse.load_snapshot(states, 0)
+    orders = make_orders(lines)
+
+    start = time.perf_counter()
+    if batched:
+        warehouse.process_orders(orders)
+    else:
+        for order in orders:
+            warehouse.process_order(order)
+    elapsed = time.perf_counter() - start
+
+    result = [(order.status, order.preliminary_reciept.count, order.preliminary_reciept.cost) for order in orders]
+    return elapsed, result + [tuple(warehouse.day_sales.tolist())] + warehouse.snapshot(0)
+
+
+def best(warehouse_class, catalog, states, lines, batched : bool, repeat : int) -> tuple[float, list[tuple]]:
+    runs = [run(warehouse_class, catalog, states, lines, batched) for _ in range(repeat)]
+    return min(elapsed for elapsed, _ in runs), runs[0][1]
+
+
+def measure(skus : int, orders : int, seed : int = 0, repeat : int = 3) -> dict[str, dict[str, float]]:
+    rng = np.random.default_rng(seed)
+    catalog = make_catalog(skus)
+    states = make_states(skus, rng)
+    lines = [
+        dict(zip(rng.integers(skus, size=size).tolist(), rng.integers(1, 6, size=size).tolist()))
+        for size in rng.integers(1, 6, size=orders)
+    ]
+
+    results = {}
+    for name, warehouse_class in BACKENDS.items():
+        sequential, expected = best(warehouse_class, catalog, states, lines, False, repeat)
+        batched, actual = best(warehouse_class, catalog, states, lines, True, repeat)
+        if actual != expected:
+            raise AssertionError(f'{name}: пакетная обработка расходится с последовательной')
+        results[name] = {'sequential_ms': sequential * 1e3, 'batched_ms': batched * 1e3}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--skus', type=int, default=1000)
+    parser.add_argument('--orders', type=int, nargs='+', default=[1000, 5000, 20_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"SKU: {args.skus}")
+    for orders in args.orders:
+        for name, result in measure(args.skus, orders, repeat=args.repeat).items():
+            print(
+                f"заказов {orders:>7}, склад {name:8}: по одному {result['sequential_ms']:8.1f} мс, "
+                f"пакетом {result['batched_ms']:7.1f} мс, x{result['sequential_ms'] / result['batched_ms']:.1f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Пропускная способность сети аптек в аптеко-днях в секунду при разном числе процессов.
+Результаты при любом числе процессов совпадают, это тоже проверяется.
+
+    python -m business.bench.network --stores 200 --days 30 --workers 0 1 2 4
+"""
+import argparse
+import time
+
+from ..mock import CUSTOMERS_MOCK, MEDICINES_MOCK
+from ..network import Network, SupplierParams
+from ..scenario import Scenario
+from ..simulation import SimulationParams
+
+
+def measure(stores : int, days : int, workers : int, capacity : float | None, seed : int = 0) -> tuple[float, list[dict]]:
+    scenario = Scenario.compile(MEDICINES_MOCK, CUSTOMERS_MOCK)
+    params = SimulationParams(
+        days=days, couriers=2, retail_margin=0.25, card_discount=0.05, base_orders=20, sensitivity=0.05,
+    )
+
+    start = time.perf_counter()
+    with Network([(params, scenario)] * stores, SupplierParams(capacity=capacity), seed=seed, workers=workers) as network:
+        records = [statistics.to_record() for statistics in network.iter_days()]
+    return time.perf_counter() - start, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stores', type=int, default=200)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4])
+    parser.add_argument('--supplier-capacity', dest='supplier_capacity', type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"аптек: {args.stores}, дней: {args.days}")
+    expected = None
+    for workers in args.workers:
+        elapsed, records = measure(args.stores, args.days, workers, args.supplier_capacity)
+        if expected is not None and records != expected:
+            raise AssertionError(f'{workers} процессов: результат отличается')
+        expected = records
+        print(f"процессов {workers}: {elapsed:6.2f} с, {args.stores * args.days / elapsed:8.0f} аптеко-дней/с")
+
+
+if __name__ == '__main__':
+    main()
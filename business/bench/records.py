@@ -0,0 +1,124 @@
+"""
+Память и скорость записей горячего пути при 100 тыс. заказов в день: заказ, клиент случайного
+заказа и чек склада как классы с `__slots__` без проверки против прежних
+(pydantic `Customer` и `WarehouseMedicineOrder`, `Order` со словарём атрибутов).
+
+    python -m business.bench.records --orders 100000 --skus 1000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+import numpy as np
+
+from contextlib import contextmanager
+from pydantic import BaseModel
+
+from .. import medicine, warehouse as warehouse_module
+from ..customer import Customer, CustomerRecord
+from ..order import Order, OrderStatus, OrderType
+from ..paymaster import PayMaster
+from ..warehouse import Warehouse
+from .catalog import make_catalog
+
+
+class PydanticReceipt(BaseModel):
+    count : int = 0
+    cost : float = 0
+
+
+class DictOrder:
+    def __init__(self, customer, medicines : dict[int, int], order_type : OrderType):
+        self.customer = customer
+        self.requested_medicines = medicines
+        self.status = OrderStatus.NO_COURIER
+        self.type = order_type
+
+        self.preliminary_reciept = None
+        self.summary = None
+
+    def set_preliminary_reciept(self, preliminary_reciept):
+        self.preliminary_reciept = preliminary_reciept
+
+    def set_summary(self, summary : float):
+        self.summary = summary
+
+
+@contextmanager
+def receipt_class(cls):
+    saved = medicine.WarehouseMedicineOrder, warehouse_module.WarehouseMedicineOrder
+    medicine.WarehouseMedicineOrder = warehouse_module.WarehouseMedicineOrder = cls
+    try:
+        yield
+    finally:
+        medicine.WarehouseMedicineOrder, warehouse_module.WarehouseMedicineOrder = saved
+
+
+def make_lines(orders : int, skus : int, seed : int) -> list[dict[int, int]]:
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(1, 6, size=orders).tolist()
+    medicines = rng.integers(skus, size=sum(sizes)).tolist()
+    counts = rng.integers(1, 6, size=sum(sizes)).tolist()
+
+    lines = []
+    start = 0
+    for size in sizes:
+        lines.append(dict(zip(medicines[start:start + size], counts[start:start + size])))
+        start += size
+    return lines
+
+
+def run_day(lines, skus, customer_factory, order_class, seed) -> tuple[list, float]:
+    warehouse = Warehouse(make_catalog(skus), [10 ** 9] * skus)
+    paymaster = PayMaster(retail_margin=0.25)
+    rng = np.random.default_rng(seed)
+
+    start = time.perf_counter()
+    orders = [order_class(customer_factory(rng), dict(order_lines), OrderType.RANDOM) for order_lines in lines]
+    for order in orders:
+        warehouse.process_order(order)
+        paymaster.count_summary(order)
+    return orders, time.perf_counter() - start
+
+
+def measure(lines, skus : int, customer_factory, order_class, receipt, seed : int = 0) -> dict[str, float]:
+    with receipt_class(receipt):
+        gc.collect()
+        _, elapsed = run_day(lines, skus, customer_factory, order_class, seed)
+
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        # склад дня освобождается при выходе из run_day, остаётся только то, что держат заказы
+        orders, _ = run_day(lines, skus, customer_factory, order_class, seed)
+        held = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        del orders
+
+    return {
+        'orders_per_s': len(lines) / elapsed,
+        'bytes_per_order': held / len(lines),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', type=int, default=100_000)
+    parser.add_argument('--skus', type=int, default=1000)
+    args = parser.parse_args()
+
+    lines = make_lines(args.orders, args.skus, seed=0)
+    results = {
+        'pydantic': measure(lines, args.skus, Customer.generate_customer, DictOrder, PydanticReceipt),
+        'slots': measure(lines, args.skus, CustomerRecord.generate, Order, medicine.WarehouseMedicineOrder),
+    }
+
+    print(f"SKU: {args.skus}, заказов за день: {args.orders}")
+    for name, result in results.items():
+        print(f"{name:9} {result['orders_per_s']:>10,.0f} заказов/с  {result['bytes_per_order']:>7,.0f} байт/заказ")
+    print(f"ускорение: x{results['slots']['orders_per_s'] / results['pydantic']['orders_per_s']:.2f}, "
+          f"память: x{results['pydantic']['bytes_per_order'] / results['slots']['bytes_per_order']:.2f}")
+
+
+if __name__ == '__main__':
+    main()
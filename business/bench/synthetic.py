@@ -0,0 +1,48 @@
+"""
+Синтетические сценарии любого размера: массивы `Scenario` генерируются напрямую,
+без CSV и разбора таблиц, так что миллион постоянных клиентов строится за секунды.
+Распределения те же, что у генераторов вкладки «Конфигурация».
+"""
+import numpy as np
+
+from ..scenario import Scenario, _encode_text
+from ..tables import MEDICINE_GROUPS, MEDICINE_TYPES
+
+
+STREETS = ['Ленина', 'Гагарина', 'Советская']
+
+
+def synthetic_scenario(skus : int, customers : int, seed : int = 0) -> Scenario:
+    rng = np.random.default_rng(seed)
+
+    arrays = {
+        'counts': rng.integers(50, 201, size=skus),
+        'dosage': rng.choice([50, 100, 200], size=skus),
+        'type': rng.integers(len(MEDICINE_TYPES), size=skus).astype(np.int8),
+        'expiration_days': rng.integers(30, 301, size=skus),
+        'wholesale': np.round(rng.uniform(10, 100, size=skus), 2),
+        'group': rng.integers(len(MEDICINE_GROUPS), size=skus).astype(np.int8),
+        'purchase_quantity': rng.integers(20, 101, size=skus),
+        'min_quantity': rng.integers(5, 21, size=skus),
+    }
+
+    sizes = rng.integers(1, 4, size=customers) if skus else np.zeros(customers, dtype=np.int64)
+    arrays.update({
+        'discount_card': rng.random(customers) > 0.5,
+        'regularity': rng.integers(2, 8, size=customers),
+        'order_offsets': np.r_[0, np.cumsum(sizes)].astype(np.int64),
+        'order_medicines': rng.integers(max(skus, 1), size=sizes.sum()),
+        'order_counts': rng.integers(1, 6, size=sizes.sum()),
+    })
+
+    phones = rng.integers(9000000000, 10000000000, size=customers).tolist()
+    streets = rng.integers(len(STREETS), size=customers).tolist()
+    houses = rng.integers(1, 101, size=customers).tolist()
+    texts = {
+        'medicine_names': [f'Лекарство {i + 1}' for i in range(skus)],
+        'customer_names': [f'Постоянный {i + 1}' for i in range(customers)],
+        'phones': [f'+7{phone}' for phone in phones],
+        'addresses': [f'ул. {STREETS[street]}, {house}' for street, house in zip(streets, houses)],
+    }
+    arrays.update({field: _encode_text(values) for field, values in texts.items()})
+    return Scenario(arrays, {field: len(values) for field, values in texts.items()})
@@ -0,0 +1,157 @@
+"""
+Контрольные точки моделирования.
+
+Состояние хранится в архиве `.npz` из плоских массивов (партии, ожидаемые закупки,
+накопленные итоги, показатели по дням, состояние правила закупок) и JSON-заголовка с днём, параметрами и состоянием
+генераторов случайных чисел. Заказы и модели pydantic не сериализуются.
+"""
+import hashlib
+import json
+import os
+import numpy as np
+
+from io import BytesIO
+
+from .accumulators import SimulationTotals
+from .pharmacy import PharmacyDayStatistics
+
+
+FORMAT_VERSION = 1
+
+SUMMARY_FIELDS = (
+    'day', 'revenue', 'profit', 'losses', 'requested_units', 'filled_units',
+    'stockouts', 'no_courier', 'order_count', 'delivered',
+)
+
+RNG_STREAMS = ('demand_rng', 'customers_rng', 'supply_rng')
+
+
+def catalog_fingerprint(sim) -> str:
+    payload = json.dumps(
+        [medicine.model_dump(mode='json') for medicine in sim.catalog],
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _params_without_days(params) -> dict:
+    values = params.model_dump(mode='json')
+    del values['days']
+    return values
+
+
+def dump_checkpoint(sim, extra : dict | None = None) -> bytes:
+    day = sim.current_day - 1
+    states = sim.warehouse.snapshot(day)
+
+    batches = [
+        (medicine_id, count, expiration_day)
+        for medicine_id, (medicine_batches, _) in enumerate(states)
+        for count, expiration_day in medicine_batches
+    ]
+    awaiting = np.zeros((len(states), 3), dtype=np.int64)
+    for medicine_id, (_, medicine_awaiting) in enumerate(states):
+        if medicine_awaiting:
+            awaiting[medicine_id] = medicine_awaiting
+
+    arrays = {
+        'batches': np.array(batches, dtype=np.int64).reshape(-1, 3),
+        'awaiting': awaiting,
+        'summary': np.array(
+            [[getattr(stat, name) for name in SUMMARY_FIELDS] for stat in sim.statistics],
+            dtype=float,
+        ).reshape(-1, len(SUMMARY_FIELDS)),
+        **{f'totals_{name}': values for name, values in sim.totals.to_arrays().items()},
+        **{f'reorder_{name}': values for name, values in sim.warehouse.reorder.state().items()},
+    }
+
+    meta = {
+        'version': FORMAT_VERSION,
+        'current_day': sim.current_day,
+        'catalog': catalog_fingerprint(sim),
+        'params': sim.params.model_dump(mode='json'),
+        'rng': {name: getattr(sim, name).bit_generator.state for name in RNG_STREAMS},
+        'extra': extra or {},
+    }
+    arrays['meta'] = np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8)
+
+    buffer = BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def checkpoint_meta(data : bytes) -> dict:
+    with np.load(BytesIO(data), allow_pickle=False) as archive:
+        return json.loads(archive['meta'].tobytes().decode('utf-8'))
+
+
+def restore_checkpoint(sim, data : bytes) -> dict:
+    """
+    Возвращает симуляцию к состоянию из контрольной точки. Симуляция должна быть создана
+    с тем же справочником и параметрами (кроме числа дней). Возвращает `extra`.
+    """
+    with np.load(BytesIO(data), allow_pickle=False) as archive:
+        arrays = {name: archive[name] for name in archive.files}
+
+    meta = json.loads(arrays['meta'].tobytes().decode('utf-8'))
+    if meta['version'] != FORMAT_VERSION:
+        raise ValueError(f"Неподдерживаемая версия контрольной точки: {meta['version']}")
+    if meta['catalog'] != catalog_fingerprint(sim):
+        raise ValueError("Контрольная точка создана для другого справочника лекарств")
+    if _params_without_days(sim.params) != {k: v for k, v in meta['params'].items() if k != 'days'}:
+        raise ValueError("Контрольная точка создана с другими параметрами моделирования")
+
+    day = meta['current_day'] - 1
+    states = [[[], None] for _ in sim.catalog]
+    for medicine_id, count, expiration_day in arrays['batches'].tolist():
+        states[medicine_id][0].append((count, expiration_day))
+    for medicine_id, (count, expiration_days, awaiting_day) in enumerate(arrays['awaiting'].tolist()):
+        if count:
+            states[medicine_id][1] = (count, expiration_days, awaiting_day)
+
+    sim.warehouse.load_snapshot([(tuple(batches), awaiting) for batches, awaiting in states], day)
+    sim.pharmacy.day = day
+    for name in RNG_STREAMS:
+        getattr(sim, name).bit_generator.state = meta['rng'][name]
+
+    sim.totals = SimulationTotals.from_arrays({
+        name[len('totals_'):]: values for name, values in arrays.items() if name.startswith('totals_')
+    })
+    reorder_state = {name[len('reorder_'):]: values for name, values in arrays.items() if name.startswith('reorder_')}
+    if reorder_state:
+        sim.warehouse.reorder.load_state(reorder_state)
+
+    history = sim.pharmacy.history
+    if history is not None:
+        history.truncate(day)
+        if day > 0 and day % sim.sample_every == 0 and day not in history:
+            history.record(day, sim.warehouse)
+
+    summary = [
+        dict(zip(SUMMARY_FIELDS, row))
+        for row in arrays['summary'].tolist()
+    ]
+    kept = [stat for stat in sim.statistics if stat.day <= day]
+    if [stat.day for stat in kept] != [int(row['day']) for row in summary]:
+        kept = [PharmacyDayStatistics(**row, history=history) for row in summary]
+    sim.statistics.clear()
+    sim.statistics.extend(kept)
+
+    sim.current_day = meta['current_day']
+    sim.stopped_by = None
+    return meta['extra']
+
+
+def write_checkpoint(sim, filename : str | os.PathLike, extra : dict | None = None):
+    tmp = f'{filename}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(dump_checkpoint(sim, extra))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, filename)
+
+
+def read_checkpoint(sim, filename : str | os.PathLike) -> dict:
+    with open(filename, 'rb') as f:
+        return restore_checkpoint(sim, f.read())
@@ -0,0 +1,235 @@
+"""
+Консольный запуск моделирования без графического интерфейса.
+
+Показатели каждого дня выводятся строкой JSONL или CSV сразу по завершении дня,
+история прогона в памяти не хранится. С `--checkpoint` состояние периодически сохраняется
+на диск, а `--resume` продолжает прерванный запуск с последней контрольной точки: файл
+результатов обрезается до неё (при выводе в stdout строки после неё выводятся повторно).
+
+    python -m business.cli --medicines meds.csv --customers customers.csv \\
+        --days 100000 --replications 4 --seed 1 --format csv --output out.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+from .checkpoint import checkpoint_meta, write_checkpoint
+from .dispatch import POLICIES
+from .mock import CUSTOMERS_MOCK, MEDICINES_MOCK
+from .network import Network, SupplierParams
+from .profiling import Profiler, write_chrome_trace
+from .reorder import POLICIES as REORDER_POLICIES
+from .replication import replication_seeds
+from .scenario import Scenario, ScenarioCache
+from .simulation import Simulation, SimulationParams
+from .tables import CatalogImportError, CustomerTable, MedicineTable
+
+
+DEFAULT_PARAMS = {
+    'days': 10,
+    'couriers': 1,
+    'retail_margin': 0.25,
+    'card_discount': 0.05,
+    'base_orders': 10,
+    'sensitivity': 0.05,
+}
+
+FIELDS = [
+    'replication', 'day', 'revenue', 'profit', 'losses', 'margin',
+    'orders', 'delivered', 'fill_rate', 'stockouts', 'no_courier', 'courier_utilization',
+]
+
+NETWORK_FIELDS = [
+    'day', 'stores', 'revenue', 'profit', 'losses', 'orders', 'delivered', 'stockouts', 'no_courier',
+    'supplier_requested', 'supplier_shipped',
+]
+
+
+class JsonlWriter:
+    def __init__(self, stream, header : bool = True, fields : list[str] = FIELDS):
+        self.stream = stream
+
+    def write(self, record : dict):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+class CsvWriter:
+    def __init__(self, stream, header : bool = True, fields : list[str] = FIELDS):
+        self.writer = csv.DictWriter(stream, fieldnames=fields)
+        if header:
+            self.writer.writeheader()
+
+    def write(self, record : dict):
+        self.writer.writerow(record)
+
+
+WRITERS = {
+    'jsonl': JsonlWriter,
+    'csv': CsvWriter,
+}
+
+
+def build_params(args : argparse.Namespace) -> SimulationParams:
+    values = dict(DEFAULT_PARAMS)
+    if args.params:
+        with open(args.params, 'r', encoding='utf-8') as f:
+            values.update(json.load(f))
+
+    for name in SimulationParams.model_fields:
+        if (value := getattr(args, name, None)) is not None:
+            values[name] = value
+
+    return SimulationParams(**values)
+
+
+def load_scenario(args : argparse.Namespace) -> Scenario:
+    if args.scenario_cache and args.medicines and args.customers:
+        return ScenarioCache(args.scenario_cache).get(args.medicines, args.customers)
+
+    return Scenario.compile(
+        MedicineTable.read_csv(args.medicines, strict=True)[0] if args.medicines else MEDICINES_MOCK,
+        CustomerTable.read_csv(args.customers, strict=True)[0] if args.customers else CUSTOMERS_MOCK,
+    )
+
+
+def parse_args(argv : list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m business.cli',
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--medicines', help='CSV со справочником лекарств (по умолчанию — демонстрационный)')
+    parser.add_argument('--customers', help='CSV с постоянными клиентами (по умолчанию — демонстрационный)')
+    parser.add_argument('--params', help='JSON с полями SimulationParams')
+    parser.add_argument('--scenario-cache', dest='scenario_cache', help='каталог скомпилированных сценариев')
+
+    parser.add_argument('--days', type=int)
+    parser.add_argument('--couriers', type=int)
+    parser.add_argument('--retail-margin', dest='retail_margin', type=float)
+    parser.add_argument('--card-discount', dest='card_discount', type=float)
+    parser.add_argument('--base-orders', dest='base_orders', type=int)
+    parser.add_argument('--sensitivity', type=float)
+    parser.add_argument('--array-inventory', dest='array_inventory', action='store_true', default=None)
+    parser.add_argument('--dispatch', choices=sorted(POLICIES), help='очередь доставки заказов курьерами')
+    parser.add_argument('--reorder', choices=sorted(REORDER_POLICIES),
+                        help='правило закупок; параметры по лекарствам — в reorder_params файла --params')
+
+    parser.add_argument('--stores', type=int, default=1, help='число аптек сети с общим поставщиком')
+    parser.add_argument('--supplier-capacity', dest='supplier_capacity', type=float,
+                        help='дневной выпуск поставщика в партиях закупки на лекарство (по умолчанию без ограничений)')
+    parser.add_argument('--workers', type=int, help='процессов для аптек сети')
+
+    parser.add_argument('--replications', type=int, default=1)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--format', choices=sorted(WRITERS), default='jsonl')
+    parser.add_argument('--output', default='-', help='файл результатов, "-" — stdout')
+    parser.add_argument('--summary', help='JSON с итогами каждого прогона')
+    parser.add_argument('--checkpoint', help='файл контрольной точки')
+    parser.add_argument('--checkpoint-every', dest='checkpoint_every', type=int, default=1000)
+    parser.add_argument('--resume', action='store_true', help='продолжить с контрольной точки')
+    parser.add_argument('--profile', help='замерить этапы дня: трасса Chrome в файл, итоги в stderr')
+    return parser.parse_args(argv)
+
+
+def run(args : argparse.Namespace, stream):
+    params = build_params(args)
+    scenario = load_scenario(args)
+
+    resume_data = None
+    if args.resume and args.checkpoint and os.path.exists(args.checkpoint):
+        with open(args.checkpoint, 'rb') as f:
+            resume_data = f.read()
+
+    extra = checkpoint_meta(resume_data)['extra'] if resume_data else {}
+    if resume_data and stream.seekable():
+        # строки, выведенные после контрольной точки, будут выведены заново
+        if 'offset' in extra:
+            stream.seek(extra['offset'])
+        else:
+            stream.seek(0, os.SEEK_END)
+        stream.truncate()
+
+    writer = WRITERS[args.format](stream, header=resume_data is None)
+    first_replication = extra.get('replication', 0)
+
+    summaries = list(extra.get('summaries', []))
+    profilers = []
+    for replication, seed in enumerate(replication_seeds(args.seed, args.replications)):
+        if replication < first_replication:
+            continue
+
+        sim = Simulation(params, scenario, seed=seed, history=0, profiler=Profiler() if args.profile else None)
+        if resume_data and replication == first_replication:
+            sim.restore(resume_data)
+
+        while not sim.is_complete:
+            record = sim.next_day().to_record()
+            writer.write({'replication': replication, **record})
+            stream.flush()
+
+            if args.checkpoint and (sim.current_day - 1) % args.checkpoint_every == 0:
+                write_checkpoint(sim, args.checkpoint, {
+                    'replication': replication,
+                    'summaries': summaries,
+                    **({'offset': stream.tell()} if stream.seekable() else {}),
+                })
+        summaries.append({'replication': replication, **sim.totals.to_dict()})
+        if args.profile:
+            profilers.append(sim.profiler)
+            print(f'Прогон {replication}:\n{sim.profiler.summary_table()}', file=sys.stderr)
+
+    if args.profile:
+        write_chrome_trace(args.profile, profilers)
+
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(summaries, f, ensure_ascii=False, indent=2)
+
+
+def run_network(args : argparse.Namespace, stream):
+    params = build_params(args)
+    scenario = load_scenario(args)
+    writer = WRITERS[args.format](stream, fields=NETWORK_FIELDS)
+
+    stores = [(params, scenario)] * args.stores
+    supplier = SupplierParams(capacity=args.supplier_capacity)
+    with Network(stores, supplier, seed=args.seed, workers=args.workers) as network:
+        for statistics in network.iter_days():
+            writer.write(statistics.to_record())
+            stream.flush()
+        totals = network.totals()
+
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump([{'store': store, **store_totals} for store, store_totals in enumerate(totals)], f, ensure_ascii=False, indent=2)
+
+
+def main(argv : list[str] | None = None):
+    args = parse_args(argv)
+    try:
+        _run_main(args)
+    except CatalogImportError as e:
+        sys.exit(str(e))
+
+
+def _run_main(args : argparse.Namespace):
+    if args.stores > 1:
+        if args.checkpoint or args.replications > 1:
+            sys.exit("Сеть аптек не поддерживает --checkpoint и --replications")
+    runner = run_network if args.stores > 1 else run
+
+    if args.output == '-':
+        try:
+            runner(args, sys.stdout)
+        except BrokenPipeError:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    else:
+        mode = 'r+' if args.resume and args.checkpoint and os.path.exists(args.checkpoint) else 'w'
+        with open(args.output, mode, encoding='utf-8', newline='') as f:
+            runner(args, f)
+
+
+if __name__ == '__main__':
+    main()
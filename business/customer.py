@@ -1,5 +1,6 @@
-import random
+import numpy as np
 
+from dataclasses import dataclass
 from typing import Self
 from pydantic import BaseModel
 
@@ -8,32 +9,192 @@ from .medicine import Medicine
 
 RND_STREETS = ["Ленина", "Гагарина", "Советская"]
 
-class Customer(BaseModel):
+
+def random_customer_fields(rng : np.random.Generator) -> dict:
+    return dict(
+        name=f"Клиент {rng.integers(1, 101)}",
+        phone=f"+7{rng.integers(9000000000, 10000000000)}",
+        address=f"ул. {RND_STREETS[rng.integers(len(RND_STREETS))]}, {rng.integers(1, 101)}",
+        discount_card=bool(rng.random() > 0.7)
+    )
+
+
+@dataclass(slots=True)
+class CustomerRecord:
+    """
+    Клиент внутри моделирования: те же поля, что у `Customer`, но без проверки pydantic —
+    такие записи создаются для каждого случайного заказа и для всех постоянных клиентов.
+    """
     name : str
     phone : str
     address : str
     discount_card : bool
-    regular_medicines : dict[Medicine, int] | None = None
+    regular_medicines : dict[int, int] | None = None
     regularity : int | None = None
 
     @classmethod
-    def generate_customer(cls) -> Self:
-        return cls(
-            name=f"Клиент {random.randint(1, 100)}",
-            phone=f"+7{random.randint(9000000000, 9999999999)}",
-            address=f"ул. {random.choice(RND_STREETS)}, {random.randint(1, 100)}",
-            discount_card=random.random() > 0.7
+    def generate(cls, rng : np.random.Generator) -> Self:
+        return cls(**random_customer_fields(rng))
+
+
+class RegularCustomers:
+    """
+    Постоянные клиенты, разложенные по периодичности. В день `day` заказывают клиенты тех
+    корзин, периодичность которых делит `day`, поэтому день затрагивает только их, а не всех
+    клиентов. Заказы корзины заранее развёрнуты в плоские массивы и суммарный спрос по лекарствам.
+
+    `CustomerRecord` клиента создаётся при первом его заказе.
+    """
+    def __init__(
+        self,
+        names : list[str],
+        phones : list[str],
+        addresses : list[str],
+        discount_card : np.ndarray,
+        regularity : np.ndarray,
+        order_offsets : np.ndarray,
+        order_medicines : np.ndarray,
+        order_counts : np.ndarray,
+        medicines : int,
+    ):
+        self.names = names
+        self.phones = phones
+        self.addresses = addresses
+        self.discount_card = np.asarray(discount_card, dtype=bool)
+        self.regularity = np.asarray(regularity, dtype=np.int64)
+        self.order_offsets = np.asarray(order_offsets, dtype=np.int64)
+        self.order_medicines = np.asarray(order_medicines, dtype=np.int64)
+        self.order_counts = np.asarray(order_counts, dtype=np.int64)
+        self.medicines = medicines
+        self._records: list[CustomerRecord | None] = [None] * len(self.regularity)
+
+        # корзина: клиенты по возрастанию номера, их позиции заказов подряд и спрос по лекарствам
+        self.buckets: dict[int, tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        order = np.argsort(self.regularity, kind='stable')
+        periods, starts = np.unique(self.regularity[order], return_index=True)
+        for period, rows in zip(periods.tolist(), np.split(order, starts[1:])):
+            lines = self._lines(rows)
+            demand = np.bincount(self.order_medicines[lines], weights=self.order_counts[lines], minlength=medicines)
+            self.buckets[period] = (rows, lines, demand.astype(np.int64))
+
+    @classmethod
+    def from_records(cls, records : list, medicines : int) -> Self:
+        sizes = [len(record.regular_medicines) for record in records]
+        customers = cls(
+            [record.name for record in records],
+            [record.phone for record in records],
+            [record.address for record in records],
+            np.array([record.discount_card for record in records], dtype=bool),
+            np.array([record.regularity for record in records], dtype=np.int64),
+            np.r_[0, np.cumsum(sizes, dtype=np.int64)],
+            np.array([m for record in records for m in record.regular_medicines], dtype=np.int64),
+            np.array([c for record in records for c in record.regular_medicines.values()], dtype=np.int64),
+            medicines,
         )
+        customers._records = list(records)
+        return customers
+
+    def due_periods(self, day : int) -> list[int]:
+        return [period for period in self.buckets if day % period == 0]
+
+    def due_rows(self, day : int) -> np.ndarray:
+        rows = [self.buckets[period][0] for period in self.due_periods(day)]
+        if not rows:
+            return np.zeros(0, dtype=np.int64)
+        return rows[0] if len(rows) == 1 else np.sort(np.concatenate(rows))
+
+    def due(self, day : int) -> list[CustomerRecord]:
+        """
+        Клиенты, заказывающие в день `day`, в порядке списка клиентов.
+        """
+        rows = self.due_rows(day).tolist()
+        records = self._records
+        missing = [row for row in rows if records[row] is None]
+        if missing:
+            self._create_records(missing)
+        return [records[row] for row in rows]
+
+    def demand(self, day : int) -> np.ndarray:
+        """
+        Сколько единиц каждого лекарства закажут постоянные клиенты в день `day`.
+        """
+        demand = np.zeros(self.medicines, dtype=np.int64)
+        for period in self.due_periods(day):
+            demand += self.buckets[period][2]
+        return demand
+
+    def expected_demand(self, day : int, days : np.ndarray, medicines : np.ndarray) -> np.ndarray:
+        """
+        Сколько единиц лекарств `medicines` закажут постоянные клиенты в дни
+        с `day + 1` по `day + days` (`days` — по каждому лекарству).
+        """
+        total = np.zeros(len(medicines), dtype=np.int64)
+        for period, (_, _, demand) in self.buckets.items():
+            total += demand[medicines] * ((day + days) // period - day // period)
+        return total
+
+    def _lines(self, rows : np.ndarray) -> np.ndarray:
+        """
+        Номера позиций регулярных заказов клиентов `rows` подряд.
+        """
+        sizes = self.order_offsets[rows + 1] - self.order_offsets[rows]
+        return np.repeat(self.order_offsets[rows] - np.cumsum(sizes) + sizes, sizes) + np.arange(sizes.sum())
+
+    def _create_records(self, rows : list[int]):
+        index = np.array(rows, dtype=np.int64)
+        lines = self._lines(index)
+        medicines = self.order_medicines[lines].tolist()
+        counts = self.order_counts[lines].tolist()
+        ends = np.cumsum(self.order_offsets[index + 1] - self.order_offsets[index]).tolist()
+
+        start = 0
+        for row, end, card, period in zip(rows, ends, self.discount_card[index].tolist(), self.regularity[index].tolist()):
+            self._records[row] = CustomerRecord(
+                name = self.names[row],
+                phone = self.phones[row],
+                address = self.addresses[row],
+                discount_card = card,
+                regular_medicines = dict(zip(medicines[start:end], counts[start:end])),
+                regularity = period,
+            )
+            start = end
+
+    def __getitem__(self, row : int) -> CustomerRecord:
+        if self._records[row] is None:
+            self._create_records([row])
+        return self._records[row]
+
+    def __iter__(self):
+        missing = [row for row, record in enumerate(self._records) if record is None]
+        if missing:
+            self._create_records(missing)
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+class Customer(BaseModel):
+    name : str
+    phone : str
+    address : str
+    discount_card : bool
+    regular_medicines : dict[int, int] | None = None
+    regularity : int | None = None
+
+    @classmethod
+    def generate_customer(cls, rng : np.random.Generator) -> Self:
+        return cls(**random_customer_fields(rng))
 
     @classmethod
-    def generate_regular_customer(cls, medicines : list[Medicine]) -> Self:
-        generated_customer = cls.generate_customer()
+    def generate_regular_customer(cls, medicines : list[Medicine], rng : np.random.Generator) -> Self:
+        generated_customer = cls.generate_customer(rng)
 
         generated_customer.regular_medicines = {
-            random.choice(medicines) : random.randint(1,5)
-            for _ in range(random.randint(1,3))
+            medicines[rng.integers(len(medicines))].id : int(rng.integers(1, 6))
+            for _ in range(rng.integers(1, 4))
         }
-        generated_customer.regularity = random.randint(2,7)
-        generated_customer.discount_card = random.random() > 0.4
+        generated_customer.regularity = int(rng.integers(2, 8))
+        generated_customer.discount_card = bool(rng.random() > 0.4)
 
         return generated_customer
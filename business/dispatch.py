@@ -0,0 +1,140 @@
+"""
+Распределение заказов дня по курьерам.
+
+Политика задаёт порядок, в котором заказы получают курьеров; заказы сверх
+`couriers * capacity` остаются без курьера. Порядок строится одной устойчивой сортировкой
+по ключам политики (`np.lexsort`), поэтому при равных ключах заказы идут в порядке
+поступления, а весь отбор стоит O(n log n).
+
+Отобранные заказы раздаются курьерам в порядке обработки: заказ получает курьер, уже
+везущий заказы на ту же улицу, пока у него есть место, иначе — наименее загруженный курьер.
+Поэтому загрузка курьеров зависит от того, как заказы распределены по улицам.
+"""
+import heapq
+import numpy as np
+
+from .fulfillment import OrderLines
+from .order import Order
+
+
+class DispatchPlan:
+    """
+    Отобранные заказы (`selected` — индексы в списке дня в порядке обработки складом,
+    `streets` — их улицы), курьер каждого из них и загрузка курьеров.
+    """
+    def __init__(self, selected : np.ndarray, streets : list[str], couriers : int, capacity : int):
+        self.selected = selected
+        self.capacity = capacity
+
+        load = [0] * couriers
+        # куча (загрузка, курьер); загрузка только растёт, поэтому устаревшая запись
+        # обновляется, лишь когда оказывается на вершине
+        queue = [(0, courier) for courier in range(couriers)]
+        assigned = []
+        street_courier: dict[str, int] = {}
+        for street in streets:
+            courier = street_courier.get(street)
+            if courier is None or load[courier] >= capacity:
+                while load[queue[0][1]] != queue[0][0]:
+                    heapq.heapreplace(queue, (load[queue[0][1]], queue[0][1]))
+                courier = street_courier[street] = queue[0][1]
+            assigned.append(courier)
+            load[courier] += 1
+
+        self.courier = np.array(assigned, dtype=np.int64)
+        self.load = np.array(load, dtype=np.int64)
+
+    @property
+    def utilization(self) -> np.ndarray:
+        return self.load / self.capacity
+
+    def __len__(self) -> int:
+        return len(self.selected)
+
+
+class DispatchPolicy:
+    """
+    Очередь заказов в порядке поступления. Подклассы возвращают из `keys` ключи сортировки
+    (последний — главный, как в `np.lexsort`); меньшее значение — раньше.
+    """
+    name = 'fifo'
+    title = 'По порядку поступления'
+
+    def keys(self, orders : list[Order], warehouse) -> list[np.ndarray]:
+        return []
+
+    def dispatch(self, orders : list[Order], warehouse, couriers : int, capacity : int) -> DispatchPlan:
+        keys = self.keys(orders, warehouse) if orders else []
+        selected = np.lexsort(keys) if keys else np.arange(len(orders))
+        selected = selected[:couriers * capacity]
+        streets = [street_of(orders[order_num].customer.address) for order_num in selected.tolist()]
+        return DispatchPlan(selected, streets, couriers, capacity)
+
+
+class ValuePolicy(DispatchPolicy):
+    """
+    Сначала самые дорогие заказы по оптовой стоимости запрошенного.
+    """
+    name = 'value'
+    title = 'Сначала дорогие'
+
+    def keys(self, orders : list[Order], warehouse) -> list[np.ndarray]:
+        lines = OrderLines(orders)
+        prices = warehouse.catalog.wholesale()
+        value = np.bincount(lines.order, weights=prices[lines.medicine] * lines.count, minlength=len(orders))
+        return [-value]
+
+
+class RegularPolicy(DispatchPolicy):
+    """
+    Сначала заказы постоянных клиентов.
+    """
+    name = 'regular'
+    title = 'Сначала постоянные клиенты'
+
+    def keys(self, orders : list[Order], warehouse) -> list[np.ndarray]:
+        return [np.array([not order.is_regular for order in orders])]
+
+
+class DiscountedPolicy(DispatchPolicy):
+    """
+    Сначала заказы, в которых есть уценённый товар: он быстрее уходит со склада до списания.
+    """
+    name = 'discounted'
+    title = 'Сначала уценённый товар'
+
+    def keys(self, orders : list[Order], warehouse) -> list[np.ndarray]:
+        lines = OrderLines(orders)
+        discounted = warehouse.discounted()[lines.medicine]
+        return [np.bincount(lines.order[discounted], minlength=len(orders)) == 0]
+
+
+class StreetPolicy(DispatchPolicy):
+    """
+    Заказы группируются по улице, первыми идут улицы с наибольшим числом заказов,
+    так что курьер получает заказы одной-двух соседних групп.
+    """
+    name = 'street'
+    title = 'По улицам'
+
+    def keys(self, orders : list[Order], warehouse) -> list[np.ndarray]:
+        _, street, count = np.unique(
+            [street_of(order.customer.address) for order in orders],
+            return_inverse=True,
+            return_counts=True,
+        )
+        return [street, -count[street]]
+
+
+def street_of(address : str) -> str:
+    """
+    Улица из адреса вида «ул. Ленина, 12».
+    """
+    street, _, _ = address.rpartition(',')
+    return street or address
+
+
+POLICIES = {
+    policy.name: policy
+    for policy in (DispatchPolicy, ValuePolicy, RegularPolicy, DiscountedPolicy, StreetPolicy)
+}
@@ -0,0 +1,142 @@
+"""
+Пакетная обработка заказов дня складом.
+
+Все позиции всех заказов раскладываются по партиям за один проход: для каждого лекарства
+запросы идут в порядке заказов, партии — в порядке поступления (FIFO), просроченные партии
+не продаются. Количества, себестоимость и статусы совпадают с последовательными вызовами
+`process_order` в том же порядке, включая порядок сложения стоимостей.
+"""
+import numpy as np
+
+from .medicine import WarehouseMedicineOrder
+from .order import Order, OrderStatus
+
+
+STATUSES = (OrderStatus.DELIVERED, OrderStatus.PARTIALLY, OrderStatus.NO_MEDICINES)
+DELIVERED, PARTIALLY, NO_MEDICINES = range(len(STATUSES))
+
+
+def _segment_starts(values : np.ndarray) -> np.ndarray:
+    """
+    Для каждого элемента отсортированного массива — индекс первого элемента с тем же значением.
+    """
+    new = np.r_[True, values[1:] != values[:-1]]
+    return np.flatnonzero(new)[np.cumsum(new) - 1]
+
+
+def allocate(
+    line_medicine : np.ndarray,
+    line_count : np.ndarray,
+    batch_medicine : np.ndarray,
+    batch_available : np.ndarray,
+    batch_price : np.ndarray,
+    batch_multiplier : np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Распределяет позиции заказов по партиям. Партии сгруппированы по `batch_medicine`
+    (по возрастанию), внутри лекарства идут в порядке списания; у просроченных
+    `batch_available` равно нулю.
+
+    Возвращает отпущенное количество и себестоимость каждой позиции и списание по партиям.
+    """
+    lines = len(line_medicine)
+    line_cost = np.zeros(lines, dtype=float)
+    batch_sold = np.zeros(len(batch_medicine), dtype=np.int64)
+    if not lines:
+        return np.zeros(0, dtype=np.int64), line_cost, batch_sold
+
+    # запасы всех лекарств на одной шкале: партия занимает [batch_start, batch_end)
+    batch_end = np.cumsum(batch_available)
+    batch_start = batch_end - batch_available
+    edges = np.r_[0, batch_end]
+    stock_start = edges[np.searchsorted(batch_medicine, line_medicine, 'left')]
+    stock_end = edges[np.searchsorted(batch_medicine, line_medicine, 'right')]
+
+    # сколько запрошено этого же лекарства предыдущими позициями дня
+    order = np.argsort(line_medicine, kind='stable')
+    counts = line_count[order]
+    before = np.cumsum(counts) - counts
+    before -= before[_segment_starts(line_medicine[order])]
+    demand_before = np.empty_like(before)
+    demand_before[order] = before
+
+    line_start = np.minimum(stock_start + demand_before, stock_end)
+    line_end = np.minimum(line_start + line_count, stock_end)
+    line_filled = line_end - line_start
+
+    first = np.searchsorted(batch_end, line_start, 'right')
+    span = np.where(line_filled > 0, np.searchsorted(batch_end, line_end, 'left') - first + 1, 0)
+
+    # по одной партии за шаг, чтобы стоимость складывалась в том же порядке, что в `sell`
+    for step in range(int(span.max())):
+        active = np.flatnonzero(span > step)
+        batch = first[active] + step
+        sold = np.minimum(batch_end[batch], line_end[active]) - np.maximum(batch_start[batch], line_start[active])
+        line_cost[active] += batch_price[batch] * sold * batch_multiplier[batch]
+        np.add.at(batch_sold, batch, sold)
+
+    return line_filled, line_cost, batch_sold
+
+
+class OrderLines:
+    """
+    Позиции заказов дня плоскими массивами: номер заказа, номер позиции в заказе,
+    лекарство и запрошенное количество.
+    """
+    def __init__(self, orders : list[Order]):
+        self.orders = len(orders)
+        sizes = np.array([len(order.requested_medicines) for order in orders], dtype=np.int64)
+        self.medicine = np.array(
+            [medicine_id for order in orders for medicine_id in order.requested_medicines],
+            dtype=np.int64,
+        )
+        self.count = np.array(
+            [count for order in orders for count in order.requested_medicines.values()],
+            dtype=np.int64,
+        )
+        self.order = np.repeat(np.arange(len(orders)), sizes)
+        self.position = np.arange(len(self.order)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+
+    def __len__(self) -> int:
+        return len(self.medicine)
+
+
+class Fulfillment:
+    """
+    Итог обработки заказов дня: по каждому заказу запрошено и отпущено единиц,
+    себестоимость отпущенного и код статуса (индекс в `STATUSES`).
+    """
+    def __init__(self, lines : OrderLines, line_filled : np.ndarray, line_cost : np.ndarray):
+        self.lines = lines
+        self.line_filled = line_filled
+        self.line_cost = line_cost
+
+        self.requested = np.bincount(lines.order, weights=lines.count, minlength=lines.orders).astype(np.int64)
+        self.filled = np.bincount(lines.order, weights=line_filled, minlength=lines.orders).astype(np.int64)
+        self.cost = np.zeros(lines.orders, dtype=float)
+        for position in range(int(lines.position.max(initial=-1)) + 1):
+            current = lines.position == position
+            self.cost[lines.order[current]] += line_cost[current]
+
+        short = np.bincount(lines.order[line_filled < lines.count], minlength=lines.orders) > 0
+        self.status = np.where(short, PARTIALLY, DELIVERED).astype(np.int8)
+        self.status[self.filled == 0] = NO_MEDICINES
+
+    @property
+    def delivered(self) -> np.ndarray:
+        return self.status != NO_MEDICINES
+
+    @property
+    def statuses(self) -> list[OrderStatus]:
+        return [STATUSES[code] for code in self.status.tolist()]
+
+    def apply(self, orders : list[Order]):
+        """
+        Проставляет заказам статусы и предварительные чеки, как это делает `process_order`.
+        """
+        for order, status, count, cost in zip(orders, self.statuses, self.filled.tolist(), self.cost.tolist()):
+            order.status = status
+            order.set_preliminary_reciept(WarehouseMedicineOrder(count, cost))
+
+    def __len__(self) -> int:
+        return self.lines.orders
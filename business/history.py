@@ -0,0 +1,98 @@
+from bisect import bisect_right
+
+from .medicine import MedicineCatalog
+from .warehouse import Warehouse
+
+
+class WarehouseHistory:
+    """
+    История состояний склада по дням.
+
+    Каждые `keyframe_interval` дней сохраняется полный снимок склада,
+    в остальные дни — только позиции, изменившиеся с предыдущего записанного дня
+    (продажи, поступления, списания, ожидаемые закупки). Дни можно записывать с пропусками.
+    """
+    def __init__(self, keyframe_interval : int = 30):
+        self.keyframe_interval = keyframe_interval
+
+        self.catalog: MedicineCatalog | None = None
+        self._keyframe_days: list[int] = []
+        self._keyframes: dict[int, list[tuple]] = {}
+        self._deltas: dict[int, dict[int, tuple]] = {}
+        self._last_state: list[tuple] | None = None
+        self._cached: tuple[int, Warehouse] | None = None
+
+    def record(self, day : int, warehouse : Warehouse):
+        state = warehouse.snapshot(day)
+        self.catalog = warehouse.catalog
+
+        if self._last_state is None or (day - self._keyframe_days[-1]) >= self.keyframe_interval:
+            self._keyframe_days.append(day)
+            self._keyframes[day] = state
+            self._deltas[day] = {}
+        else:
+            self._deltas[day] = {
+                medicine_id: medicine_state
+                for medicine_id, (medicine_state, last_state) in enumerate(zip(state, self._last_state))
+                if medicine_state != last_state
+            }
+
+        self._last_state = state
+
+    def forget_before(self, day : int):
+        """
+        Удаляет данные, не нужные для восстановления дней начиная с `day`.
+        """
+        idx = bisect_right(self._keyframe_days, day) - 1
+        if idx <= 0:
+            return
+
+        first_kept = self._keyframe_days[idx]
+        for keyframe_day in self._keyframe_days[:idx]:
+            del self._keyframes[keyframe_day]
+        self._keyframe_days = self._keyframe_days[idx:]
+
+        for old_day in [d for d in self._deltas if d < first_kept]:
+            del self._deltas[old_day]
+
+    def truncate(self, day : int):
+        """
+        Забывает все дни после `day`: следующий записанный день будет `day + 1`.
+        """
+        for later_day in [d for d in self._deltas if d > day]:
+            del self._deltas[later_day]
+        while self._keyframe_days and self._keyframe_days[-1] > day:
+            del self._keyframes[self._keyframe_days.pop()]
+
+        self._cached = None
+        self._last_state = None
+        if self._deltas:
+            last_day = next(reversed(self._deltas))
+            self._last_state = self.restore(last_day).snapshot(last_day)
+        else:
+            self._keyframe_days.clear()
+            self._keyframes.clear()
+            self._deltas.clear()
+
+    def restore(self, day : int) -> Warehouse:
+        if day not in self._deltas:
+            raise KeyError(f"Нет данных о складе за день {day}")
+
+        if self._cached and self._cached[0] == day:
+            return self._cached[1]
+
+        keyframe_day = self._keyframe_days[bisect_right(self._keyframe_days, day) - 1]
+        state = list(self._keyframes[keyframe_day])
+        for delta_day in range(keyframe_day + 1, day + 1):
+            for medicine_id, medicine_state in self._deltas.get(delta_day, {}).items():
+                state[medicine_id] = medicine_state
+
+        warehouse = Warehouse.from_snapshot(self.catalog, state, day)
+        self._cached = (day, warehouse)
+        return warehouse
+
+    def __contains__(self, day : int) -> bool:
+        return day in self._deltas
+
+    def __len__(self) -> int:
+        return len(self._deltas)
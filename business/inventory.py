@@ -0,0 +1,231 @@
+import numpy as np
+
+from .base import IDaily
+from .fulfillment import Fulfillment, OrderLines, allocate
+from .medicine import DISCOUNT_DAYS, MedicineCatalog, WarehouseMedicineOrder
+from .order import Order, OrderStatus
+from .reorder import MAX_LEAD_DAYS, ReorderPolicy
+
+
+class ArrayWarehouse(IDaily):
+    """
+    Склад, хранящий партии всех лекарств в массивах NumPy.
+
+    Партии упорядочены по `Medicine.id`, внутри лекарства — по порядку поступления,
+    поэтому списание, старение и дозаказ выполняются одним векторным проходом за день.
+    Интерфейс совпадает с `Warehouse`.
+    """
+    def __init__(self, catalog : MedicineCatalog, counts : list[int], rng : np.random.Generator | None = None):
+        self.catalog = catalog
+        self.rng = rng if rng is not None else np.random.default_rng()
+        size = len(catalog)
+
+        self.wholesale = np.array([m.wholesale for m in catalog], dtype=float)
+        self.expiration_days = np.array([m.expiration_days for m in catalog], dtype=np.int64)
+
+        self.batch_medicine = np.arange(size, dtype=np.int64)
+        self.batch_count = np.array(counts, dtype=np.int64).reshape(size)
+        self.batch_expiration = self.expiration_days.copy()
+        self.batch_discounted = self.batch_expiration <= DISCOUNT_DAYS
+        self.counts = self.batch_count.copy()
+
+        self.awaiting_count = np.zeros(size, dtype=np.int64)
+        self.awaiting_expiration = np.zeros(size, dtype=np.int64)
+        self.awaiting_days = np.zeros(size, dtype=np.int64)
+        self.day_sales = np.zeros(size, dtype=np.int64)
+        self.day_requested = np.zeros(size, dtype=np.int64)
+        self.day_losses = np.zeros(size)
+        self.reorder = ReorderPolicy(catalog)
+        self.external_supply = False
+
+        self._update_offsets()
+
+    def _update_offsets(self):
+        self.offsets = np.searchsorted(self.batch_medicine, np.arange(len(self.catalog) + 1))
+
+    def discounted(self) -> np.ndarray:
+        return np.bincount(
+            self.batch_medicine[self.batch_discounted],
+            minlength=len(self.catalog)
+        ) > 0
+
+    def sell(self, medicine_id : int, cnt : int) -> WarehouseMedicineOrder:
+        start, end = self.offsets[medicine_id], self.offsets[medicine_id + 1]
+        available = np.where(self.batch_expiration[start:end] > 0, self.batch_count[start:end], 0)
+
+        before = np.cumsum(available) - available
+        sold = np.minimum(available, np.maximum(cnt - before, 0))
+        self.batch_count[start:end] -= sold
+
+        multiplier = np.where(self.batch_discounted[start:end], 0.5, 1)
+        order = WarehouseMedicineOrder(
+            count = int(sold.sum()),
+            cost = float((self.wholesale[medicine_id] * sold * multiplier).sum()),
+        )
+        self.counts[medicine_id] -= order.count
+        self.day_sales[medicine_id] += order.count
+        return order
+
+    def process_order(self, order : Order):
+        preliminary_reciept = WarehouseMedicineOrder()
+
+        order.status = OrderStatus.DELIVERED
+        for medicine_id, cnt in order.requested_medicines.items():
+            med_bill = self.sell(medicine_id, cnt)
+            self.day_requested[medicine_id] += cnt
+
+            preliminary_reciept.count += med_bill.count
+            preliminary_reciept.cost += med_bill.cost
+
+            if med_bill.count < cnt:
+                order.status = OrderStatus.PARTIALLY
+
+        if preliminary_reciept.count == 0:
+            order.status = OrderStatus.NO_MEDICINES
+
+        order.set_preliminary_reciept(preliminary_reciept)
+
+    def process_orders(self, orders : list[Order]) -> Fulfillment:
+        lines = OrderLines(orders)
+        line_filled, line_cost, batch_sold = allocate(
+            lines.medicine,
+            lines.count,
+            self.batch_medicine,
+            np.where(self.batch_expiration > 0, self.batch_count, 0),
+            self.wholesale[self.batch_medicine],
+            np.where(self.batch_discounted, 0.5, 1),
+        )
+
+        self.batch_count -= batch_sold
+        sold = np.bincount(self.batch_medicine, weights=batch_sold, minlength=len(self.catalog)).astype(np.int64)
+        self.counts -= sold
+        self.day_sales += sold
+        self.day_requested += np.bincount(lines.medicine, weights=lines.count, minlength=len(self.catalog)).astype(np.int64)
+
+        fulfillment = Fulfillment(lines, line_filled, line_cost)
+        fulfillment.apply(orders)
+        return fulfillment
+
+    def start_day(self):
+        self.day_sales = np.zeros(len(self.catalog), dtype=np.int64)
+        self.day_requested = np.zeros(len(self.catalog), dtype=np.int64)
+        self.day_losses = np.zeros(len(self.catalog))
+
+        arrived = np.flatnonzero((self.awaiting_count > 0) & (self.awaiting_days == 0))
+        if not arrived.size:
+            return
+
+        self.batch_medicine = np.concatenate((self.batch_medicine, arrived))
+        self.batch_count = np.concatenate((self.batch_count, self.awaiting_count[arrived]))
+        self.batch_expiration = np.concatenate((self.batch_expiration, self.awaiting_expiration[arrived]))
+        self.batch_discounted = self.batch_expiration <= DISCOUNT_DAYS
+        self.counts[arrived] += self.awaiting_count[arrived]
+        self.awaiting_count[arrived] = 0
+
+        order = np.argsort(self.batch_medicine, kind='stable')
+        self.batch_medicine = self.batch_medicine[order]
+        self.batch_count = self.batch_count[order]
+        self.batch_expiration = self.batch_expiration[order]
+        self.batch_discounted = self.batch_discounted[order]
+        self._update_offsets()
+
+    def end_day(self) -> float:
+        size = len(self.catalog)
+
+        self.batch_expiration -= 1
+        expired = self.batch_expiration <= 0
+
+        expired_medicine = self.batch_medicine[expired]
+        expired_count = self.batch_count[expired]
+        expired_cost = expired_count * self.wholesale[expired_medicine]
+        losses = float(expired_cost.sum())
+        self.day_losses = np.bincount(expired_medicine, weights=expired_cost, minlength=size)
+        self.counts -= np.bincount(expired_medicine, weights=expired_count, minlength=size).astype(np.int64)
+
+        keep = ~expired & (self.batch_count > 0)
+        self.batch_medicine = self.batch_medicine[keep]
+        self.batch_count = self.batch_count[keep]
+        self.batch_expiration = self.batch_expiration[keep]
+        self.batch_discounted = self.batch_expiration <= DISCOUNT_DAYS
+        self._update_offsets()
+
+        self.reorder.observe(self.day_requested)
+        if not self.external_supply:
+            reorder, quantities = self.purchase_requests()
+            self.awaiting_count[reorder] = quantities
+            self.awaiting_expiration[reorder] = self.expiration_days[reorder]
+            self.awaiting_days[reorder] = self.rng.integers(1, MAX_LEAD_DAYS + 1, size=reorder.size)
+        self.awaiting_days[self.awaiting_count > 0] -= 1
+
+        return losses
+
+    def purchase_requests(self) -> tuple[np.ndarray, np.ndarray]:
+        medicine_ids = np.flatnonzero(self.awaiting_count == 0)
+        quantities = self.reorder.quantities(medicine_ids, self.counts[medicine_ids])
+        ordered = quantities > 0
+        return medicine_ids[ordered], quantities[ordered]
+
+    def receive(self, medicine_ids : np.ndarray, counts : np.ndarray, lead_days : np.ndarray):
+        self.awaiting_count[medicine_ids] = counts
+        self.awaiting_expiration[medicine_ids] = self.expiration_days[medicine_ids]
+        self.awaiting_days[medicine_ids] = lead_days - 1
+
+    def snapshot(self, day : int) -> list[tuple]:
+        batch_count = self.batch_count.tolist()
+        batch_expiration = (self.batch_expiration + day).tolist()
+        offsets = self.offsets.tolist()
+
+        states = []
+        for medicine_id in range(len(self.catalog)):
+            start, end = offsets[medicine_id], offsets[medicine_id + 1]
+            awaiting = None
+            if self.awaiting_count[medicine_id]:
+                awaiting = (
+                    int(self.awaiting_count[medicine_id]),
+                    int(self.awaiting_expiration[medicine_id]),
+                    day + int(self.awaiting_days[medicine_id]),
+                )
+            states.append((tuple(zip(batch_count[start:end], batch_expiration[start:end])), awaiting))
+        return states
+
+    def load_snapshot(self, states : list[tuple], day : int):
+        size = len(self.catalog)
+        batches = [
+            (medicine_id, count, expiration_day - day)
+            for medicine_id, (medicine_batches, _) in enumerate(states)
+            for count, expiration_day in medicine_batches
+        ]
+        batch_medicine, batch_count, batch_expiration = (
+            np.array(column, dtype=np.int64).reshape(-1)
+            for column in (zip(*batches) if batches else ([], [], []))
+        )
+
+        self.batch_medicine = batch_medicine
+        self.batch_count = batch_count
+        self.batch_expiration = batch_expiration
+        self.batch_discounted = self.batch_expiration <= DISCOUNT_DAYS
+        self.counts = np.bincount(self.batch_medicine, weights=self.batch_count, minlength=size).astype(np.int64)
+
+        self.awaiting_count = np.zeros(size, dtype=np.int64)
+        self.awaiting_expiration = np.zeros(size, dtype=np.int64)
+        self.awaiting_days = np.zeros(size, dtype=np.int64)
+        for medicine_id, (_, awaiting) in enumerate(states):
+            if awaiting:
+                count, expiration_days, awaiting_day = awaiting
+                self.awaiting_count[medicine_id] = count
+                self.awaiting_expiration[medicine_id] = expiration_days
+                self.awaiting_days[medicine_id] = awaiting_day - day
+
+        self._update_offsets()
+
+    def to_table(self):
+        starts = self.offsets[:-1]
+        has_batches = starts < self.offsets[1:]
+        return [
+            [
+                medicine.name,
+                int(self.counts[medicine.id]),
+                int(self.batch_expiration[starts[medicine.id]]) if has_batches[medicine.id] else '',
+            ]
+            for medicine in self.catalog
+        ]
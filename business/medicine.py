@@ -1,11 +1,18 @@
-import random
+import heapq
+import itertools
+import numpy as np
 
+from dataclasses import dataclass
 from enum import Enum
+from typing import Self
 from pydantic import BaseModel
 
 from .base import IDaily
 
 
+DISCOUNT_DAYS = 30
+
+
 class HashableMixin:
     """
     Миксин для автоматической генерации __hash__ и __eq__ на основе полей модели.
@@ -43,26 +50,77 @@ class Medicine(HashableMixin, BaseModel):
     expiration_days     : int
     purchase_quantity   : int
     min_quantity        : int
+    id                  : int = -1
 
 
-class BatchOfMedicines(IDaily):
-    def __init__(self, count, expiration_days):
-        self.count = count
-        self.expiration_days = expiration_days
+class MedicineCatalog:
+    """
+    Справочник лекарств с плотными целочисленными идентификаторами.
+    Склад, заказы и клиенты ссылаются на лекарства по `Medicine.id`.
+    """
+    def __init__(self, medicines : list[Medicine] | None = None):
+        self.medicines: list[Medicine] = []
+        self._ids_by_name: dict[str, int] = {}
+        self._wholesale: np.ndarray | None = None
+        for medicine in medicines or []:
+            self.add(medicine)
 
-    @property
-    def is_discounted(self) -> bool:
-        return self.expiration_days <= 30
+    def add(self, medicine : Medicine) -> int:
+        medicine_id = self._ids_by_name.get(medicine.name, len(self.medicines))
+        medicine.id = medicine_id
+        self._wholesale = None
 
-    @property
-    def is_expired(self) -> bool:
-        return self.expiration_days <= 0
+        if medicine_id == len(self.medicines):
+            self.medicines.append(medicine)
+            self._ids_by_name[medicine.name] = medicine_id
+        else:
+            self.medicines[medicine_id] = medicine
 
-    def start_day(self):
-        return None
+        return medicine_id
+
+    def id_of(self, name : str) -> int:
+        return self._ids_by_name[name]
+
+    def by_name(self, name : str) -> Medicine:
+        return self.medicines[self._ids_by_name[name]]
+
+    def wholesale(self) -> np.ndarray:
+        """
+        Оптовые цены по идентификаторам.
+        """
+        if self._wholesale is None:
+            self._wholesale = np.array([medicine.wholesale for medicine in self.medicines], dtype=float)
+        return self._wholesale
+
+    def __getitem__(self, medicine_id : int) -> Medicine:
+        return self.medicines[medicine_id]
+
+    def __iter__(self):
+        return iter(self.medicines)
+
+    def __len__(self) -> int:
+        return len(self.medicines)
+
+
+class BatchOfMedicines:
+    """
+    Партия лекарства. `expiration_days` — срок годности при поступлении на склад; на складе
+    партия получает абсолютный день списания `expiration_day` по календарю склада, а флаги
+    уценки и просрочки выставляет календарь в день события.
+    """
+    __slots__ = ('count', 'expiration_days', 'expiration_day', 'is_discounted', 'is_expired')
 
-    def end_day(self):
-        self.expiration_days -= 1
+    def __init__(self, count, expiration_days):
+        self.count = count
+        self.expiration_days = expiration_days
+        self.expiration_day = None
+        self.is_discounted = expiration_days <= DISCOUNT_DAYS
+        self.is_expired = expiration_days <= 0
+
+    def days_left(self, day : int) -> int:
+        if self.expiration_day is None:
+            return self.expiration_days
+        return self.expiration_day - day
 
     def sell(self, cnt) -> int:
         can_sell = min(self.count, cnt)
@@ -73,26 +131,81 @@ class BatchOfMedicines(IDaily):
     def is_empty(self) -> bool:
         return self.count <= 0
 
-    def __str__(self):
-        return f'{self.count}: {self.expiration_days} дн.'
-
 
-class WarehouseMedicineOrder(BaseModel):
+class ExpiryCalendar:
+    """
+    Часы склада и очередь событий партий: начало уценки и списание, упорядоченные по дню
+    в куче. Конец дня обрабатывает только наступившие события, а не все партии склада.
+    Календарь также помнит лекарства, остатки которых менялись за день (`touched`).
+    """
+    DISCOUNT = 0
+    EXPIRY = 1
+
+    def __init__(self):
+        self.day = 0
+        self.touched: set[int] = set()
+        self._events: list[tuple] = []
+        self._sequence = itertools.count()
+
+    def stock(self, medicine_id : int, batch : BatchOfMedicines):
+        batch.expiration_day = self.day + batch.expiration_days
+        if not batch.is_discounted:
+            self._push(batch.expiration_day - DISCOUNT_DAYS, medicine_id, self.DISCOUNT, batch)
+        self._push(batch.expiration_day, medicine_id, self.EXPIRY, batch)
+        self.touched.add(medicine_id)
+
+    def _push(self, day : int, medicine_id : int, kind : int, batch : BatchOfMedicines):
+        heapq.heappush(self._events, (day, medicine_id, next(self._sequence), kind, batch))
+
+    def advance(self) -> set[int]:
+        """
+        Переходит к следующему дню; возвращает лекарства, у партий которых наступили события.
+        События уже проданных партий остаются в очереди и просто отмечают лекарство.
+        """
+        self.day += 1
+        changed = set()
+        events = self._events
+        while events and events[0][0] <= self.day:
+            _, medicine_id, _, kind, batch = heapq.heappop(events)
+            batch.is_discounted = True
+            if kind == self.EXPIRY:
+                batch.is_expired = True
+            changed.add(medicine_id)
+        return changed
+
+    def take_touched(self) -> set[int]:
+        touched, self.touched = self.touched, set()
+        return touched
+
+
+@dataclass(slots=True)
+class WarehouseMedicineOrder:
     count : int = 0
     cost : float = 0
 
 
 class WarehouseMedicine(IDaily):
-    def __init__(self, medicine : Medicine, count):
+    """
+    Остаток одного лекарства. Партии стоят на календаре `calendar`, общем для склада;
+    календарь переводит на следующий день и решает о закупках его владелец — склад.
+    """
+    def __init__(self, medicine : Medicine, count, calendar : ExpiryCalendar | None = None):
         self.medicine = medicine
-        self.batches : list[BatchOfMedicines] = [BatchOfMedicines(count, self.medicine.expiration_days)]
-        self.count = count
+        self.calendar = calendar or ExpiryCalendar()
+        self.batches : list[BatchOfMedicines] = []
+        self.count = 0
+        self._stock(BatchOfMedicines(count, self.medicine.expiration_days))
 
         self.awaiting_batch = None
         self.awaiting_days = 0
 
+    def _stock(self, batch : BatchOfMedicines):
+        self.batches.append(batch)
+        self.count += batch.count
+        self.calendar.stock(self.medicine.id, batch)
+
     def has_discounted(self) -> bool:
-        return any(map(lambda x: x.is_discounted, self.batches))
+        return any(batch.is_discounted for batch in self.batches)
 
     def sell(self, cnt : int) -> WarehouseMedicineOrder:
         order = WarehouseMedicineOrder()
@@ -109,27 +222,28 @@ class WarehouseMedicine(IDaily):
             cnt -= can_sell
 
         self.count -= order.count
+        self.calendar.touched.add(self.medicine.id)
 
         return order
 
-    def _process_purchase_batch(self):
-        if self.count < self.medicine.min_quantity and self.awaiting_batch is None:
-            self.awaiting_batch = BatchOfMedicines(self.medicine.purchase_quantity, self.medicine.expiration_days)
-            self.awaiting_days = random.randint(1, 3)
-
-        if self.awaiting_batch:
-            self.awaiting_days -= 1
+    def receive(self, count : int, lead_days : int):
+        """
+        Заказанная поставка: придёт к началу дня через `lead_days` дней.
+        """
+        self.awaiting_batch = BatchOfMedicines(count, self.medicine.expiration_days)
+        self.awaiting_days = lead_days - 1
 
     def start_day(self):
         if self.awaiting_batch and self.awaiting_days == 0:
-            self.batches.append(self.awaiting_batch)
-            self.count += self.awaiting_batch.count
+            self._stock(self.awaiting_batch)
             self.awaiting_batch = None
 
-    def end_day(self) -> float:
+    def write_off(self) -> float:
+        """
+        Списывает просроченные партии и убирает пустые; возвращает стоимость списанного.
+        """
         losses = 0
         for batch in self.batches:
-            batch.end_day()
             if batch.is_expired:
                 losses += batch.count * self.medicine.wholesale
                 self.count -= batch.count
@@ -139,14 +253,51 @@ class WarehouseMedicine(IDaily):
             for batch in self.batches
             if not batch.is_expired and not batch.is_empty
         ]
+        return losses
 
-        self._process_purchase_batch()
-
+    def end_day(self, write_off : bool = True) -> float:
+        """
+        `write_off=False` — у лекарства за день не было ни продаж, ни событий партий,
+        и списывать нечего.
+        """
+        losses = self.write_off() if write_off else 0
+        if self.awaiting_batch:
+            self.awaiting_days -= 1
         return losses
 
+    def snapshot(self, day : int) -> tuple:
+        batches = tuple(
+            (batch.count, day + batch.days_left(self.calendar.day))
+            for batch in self.batches
+        )
+        awaiting = None
+        if self.awaiting_batch:
+            awaiting = (
+                self.awaiting_batch.count,
+                self.awaiting_batch.expiration_days,
+                day + self.awaiting_days,
+            )
+        return batches, awaiting
+
+    @classmethod
+    def from_snapshot(cls, medicine : Medicine, state : tuple, day : int, calendar : ExpiryCalendar | None = None) -> Self:
+        batches, awaiting = state
+
+        warehouse_medicine = cls(medicine, 0, calendar)
+        warehouse_medicine.batches = []
+        warehouse_medicine.count = 0
+        for count, expiration_day in batches:
+            warehouse_medicine._stock(BatchOfMedicines(count, expiration_day - day))
+
+        if awaiting:
+            count, expiration_days, awaiting_day = awaiting
+            warehouse_medicine.awaiting_batch = BatchOfMedicines(count, expiration_days)
+            warehouse_medicine.awaiting_days = awaiting_day - day
+
+        return warehouse_medicine
 
     def str_batches(self) -> str:
-        return ', '.join(map(str, self.batches))
+        return ', '.join(f'{batch.count}: {batch.days_left(self.calendar.day)} дн.' for batch in self.batches)
 
     def str_awiting(self) -> str:
         if not self.awaiting_batch:
@@ -0,0 +1,247 @@
+"""
+Сеть аптек с общим региональным поставщиком.
+
+Каждая аптека — обычная `Simulation` со своими клиентами, курьерами и складом, но закупки
+её склад не заказывает сам: в конце дня аптеки отправляют заявки, поставщик распределяет
+свой запас и назначает срок доставки, отгрузки доходят до аптек перед следующим днём.
+
+Аптеки разбиты на группы по процессам-исполнителям, которые обмениваются с координатором
+только на границе дней: получают отгрузки, моделируют день всех своих аптек и возвращают
+показатели и заявки. Случайные потоки аптек и поставщика порождаются из одного `seed`,
+поэтому результат не зависит от числа процессов.
+"""
+import multiprocessing
+import numpy as np
+
+from pydantic import BaseModel
+
+from .base import IDaily
+from .fulfillment import allocate
+from .scenario import Scenario
+from .simulation import Simulation, SimulationParams
+
+
+class SupplierParams(BaseModel):
+    # дневной выпуск каждого лекарства в партиях закупки, None — без ограничений
+    capacity        : float | None = None
+    storage_days    : int = 7
+    max_lead_days   : int = 3
+
+
+class Supplier(IDaily):
+    """
+    Региональный склад: запас каждого лекарства пополняется выпуском за день до
+    `storage_days` дневных выпусков. При нехватке заявки одного лекарства обслуживаются
+    по кругу: каждый день очередь аптек сдвигается на одну.
+    """
+    def __init__(self, scenario : Scenario, params : SupplierParams, rng : np.random.Generator):
+        self.params = params
+        self.rng = rng
+        self.medicines = len(scenario)
+
+        self.production = None
+        self.stock = None
+        if params.capacity is not None:
+            purchase_quantity = np.asarray(scenario.arrays['purchase_quantity'], dtype=float)
+            self.production = np.round(params.capacity * purchase_quantity).astype(np.int64)
+            self.stock = self.production * params.storage_days
+
+        self.day = 0
+        self.requested_units = 0
+        self.shipped_units = 0
+
+    def start_day(self):
+        self.day += 1
+        self.requested_units = 0
+        self.shipped_units = 0
+
+    def ship(self, store : np.ndarray, medicine : np.ndarray, count : np.ndarray, stores : int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Распределяет заявки дня; возвращает отгруженное количество и срок доставки по каждой.
+        """
+        if self.stock is None:
+            shipped = count.copy()
+        else:
+            queue = np.argsort((store - self.day) % stores, kind='stable')
+            shipped = np.empty_like(count)
+            shipped[queue], _, sold = allocate(
+                medicine[queue],
+                count[queue],
+                np.arange(self.medicines),
+                self.stock,
+                np.ones(self.medicines),
+                np.ones(self.medicines),
+            )
+            self.stock -= sold
+
+        self.requested_units += int(count.sum())
+        self.shipped_units += int(shipped.sum())
+        return shipped, self.rng.integers(1, self.params.max_lead_days + 1, size=len(count))
+
+    def end_day(self):
+        if self.stock is not None:
+            self.stock = np.minimum(self.stock + self.production, self.production * self.params.storage_days)
+
+
+class NetworkDayStatistics(BaseModel):
+    day             : int
+    stores          : list[dict]
+    requested_units : int = 0
+    shipped_units   : int = 0
+
+    def to_record(self) -> dict:
+        return {
+            'day': self.day,
+            'stores': len(self.stores),
+            **{
+                name: sum(record[name] for record in self.stores)
+                for name in ('revenue', 'profit', 'losses', 'orders', 'delivered', 'stockouts', 'no_courier')
+            },
+            'supplier_requested': self.requested_units,
+            'supplier_shipped': self.shipped_units,
+        }
+
+
+class Shard:
+    """
+    Группа аптек одного исполнителя.
+    """
+    def __init__(self, stores : list[tuple[int, SimulationParams, Scenario, np.random.SeedSequence]]):
+        self.indexes = [index for index, _, _, _ in stores]
+        self.simulations = []
+        for _, params, scenario, seed in stores:
+            sim = Simulation(params, scenario, seed=seed, history=0)
+            sim.warehouse.external_supply = True
+            self.simulations.append(sim)
+
+    def next_day(self, shipments : dict[int, tuple]) -> list[tuple]:
+        results = []
+        for index, sim in zip(self.indexes, self.simulations):
+            if index in shipments:
+                sim.warehouse.receive(*shipments[index])
+            record = sim.next_day().to_record()
+            results.append((index, record, *sim.warehouse.purchase_requests()))
+        return results
+
+    def totals(self) -> list[tuple[int, dict]]:
+        return [(index, sim.totals.to_dict()) for index, sim in zip(self.indexes, self.simulations)]
+
+
+def _shard_main(connection, stores):
+    shard = Shard(stores)
+    while (message := connection.recv()) is not None:
+        command, payload = message
+        connection.send(getattr(shard, command)(*payload))
+    connection.close()
+
+
+class Network:
+    """
+    Сеть из `len(stores)` аптек. `stores` — параметры и сценарий каждой аптеки; справочник
+    лекарств у всех сценариев общий. `workers=0` моделирует все аптеки в текущем процессе.
+    """
+    def __init__(
+        self,
+        stores : list[tuple[SimulationParams, Scenario]],
+        supplier : SupplierParams | None = None,
+        seed : int | None = None,
+        workers : int | None = None,
+    ):
+        if not stores:
+            raise ValueError("В сети нет аптек")
+        names = stores[0][1].text('medicine_names')
+        if any(scenario.text('medicine_names') != names for _, scenario in stores[1:]):
+            raise ValueError("У аптек сети должен быть общий справочник лекарств")
+        if len({params.days for params, _ in stores}) > 1:
+            raise ValueError("У аптек сети должен быть одинаковый срок моделирования")
+
+        self.stores = stores
+        self.days = stores[0][0].days
+        *store_seeds, supplier_seed = np.random.SeedSequence(seed).spawn(len(stores) + 1)
+        self.supplier = Supplier(stores[0][1], supplier or SupplierParams(), np.random.default_rng(supplier_seed))
+
+        workers = min(multiprocessing.cpu_count() if workers is None else workers, len(stores))
+        specs = [(index, params, scenario, seed) for index, ((params, scenario), seed) in enumerate(zip(stores, store_seeds))]
+        groups = [specs[shard::workers] for shard in range(workers)] if workers else [specs]
+        self.groups = [[index for index, _, _, _ in group] for group in groups]
+
+        self.shards = []
+        self.processes = []
+        if workers:
+            for group in groups:
+                parent, child = multiprocessing.Pipe()
+                process = multiprocessing.Process(target=_shard_main, args=(child, group), daemon=True)
+                process.start()
+                child.close()
+                self.shards.append(parent)
+                self.processes.append(process)
+        else:
+            self.shards.append(Shard(specs))
+
+        self.current_day = 1
+        self.shipments: dict[int, tuple] = {}
+
+    def _call(self, command : str, payloads : list[tuple]) -> list:
+        """
+        Выполняет команду во всех группах (`payloads` — аргументы для каждой группы)
+        и возвращает объединённые результаты в порядке аптек.
+        """
+        if self.processes:
+            for connection, payload in zip(self.shards, payloads):
+                connection.send((command, payload))
+            results = [connection.recv() for connection in self.shards]
+        else:
+            results = [getattr(shard, command)(*payload) for shard, payload in zip(self.shards, payloads)]
+        return sorted((item for result in results for item in result), key=lambda item: item[0])
+
+    def next_day(self) -> NetworkDayStatistics:
+        results = self._call('next_day', [
+            ({index: self.shipments[index] for index in group if index in self.shipments},)
+            for group in self.groups
+        ])
+
+        self.supplier.start_day()
+        store = np.concatenate([np.full(len(ids), index) for index, _, ids, _ in results])
+        medicine = np.concatenate([ids for _, _, ids, _ in results])
+        count = np.concatenate([counts for _, _, _, counts in results])
+        shipped, lead_days = self.supplier.ship(store, medicine, count, len(self.stores))
+        self.supplier.end_day()
+
+        self.shipments = {}
+        delivered = shipped > 0
+        for index in np.unique(store[delivered]).tolist():
+            rows = delivered & (store == index)
+            self.shipments[index] = (medicine[rows], shipped[rows], lead_days[rows])
+
+        statistics = NetworkDayStatistics(
+            day = self.current_day,
+            stores = [record for _, record, _, _ in results],
+            requested_units = self.supplier.requested_units,
+            shipped_units = self.supplier.shipped_units,
+        )
+        self.current_day += 1
+        return statistics
+
+    def iter_days(self):
+        while not self.is_complete:
+            yield self.next_day()
+
+    def totals(self) -> list[dict]:
+        return [totals for _, totals in self._call('totals', [()] * len(self.groups))]
+
+    def close(self):
+        for connection, process in zip(self.shards, self.processes):
+            connection.send(None)
+            process.join()
+        self.processes = []
+        self.shards = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def is_complete(self) -> bool:
+        return self.current_day > self.days
@@ -0,0 +1,283 @@
+"""
+Подбор параметров правила закупок для каждого лекарства моделированием.
+
+Цель по лекарству — стоимость списанного плюс `stockout_cost` его оптовых цен за каждую
+недопоставленную единицу. Лекарства почти не влияют друг на друга, поэтому один прогон
+проверяет сразу по варианту параметров для каждого лекарства: в прогоне `slot` лекарство
+получает свой `slot`-й ещё не отсеянный вариант. Варианты — сочетания множителей `factors`
+к параметрам правила по умолчанию (из справочника); вариант из единиц — исходные параметры.
+
+Поиск идёт раундами последовательного деления: в каждом раунде прогоны добавляются до
+удвоенного числа повторов, после раунда у каждого лекарства остаётся доля `keep` лучших
+вариантов. Все варианты считаются на одних и тех же зёрнах (общие случайные числа),
+прогоны выполняются параллельно через `run_tasks`.
+
+    python -m business.optimizer --medicines meds.csv --customers customers.csv \\
+        --policy ss --days 90 --replications 8 --output best.json
+    python -m business.cli --medicines meds.csv --customers customers.csv --params best.json
+"""
+import argparse
+import itertools
+import json
+import time
+import numpy as np
+
+from .replication import replication_seeds, run_tasks
+from .reorder import POLICIES
+from .scenario import Scenario
+from .simulation import Simulation, SimulationParams
+
+
+FACTORS = (0.5, 1, 1.5, 2, 3)
+
+
+def simulate_costs(params : SimulationParams, medicines_data, customers_data, seed : int) -> np.ndarray:
+    """
+    Списанное (в деньгах) и недопоставленное (в единицах) по каждому лекарству за прогон.
+    """
+    sim = Simulation(params, medicines_data, customers_data, seed, history=0)
+    size = len(sim.catalog)
+    losses = np.zeros(size)
+    unmet = np.zeros(size, dtype=np.int64)
+    while not sim.is_complete:
+        sim.next_day()
+        warehouse = sim.warehouse
+        losses += warehouse.day_losses
+        unmet += warehouse.day_requested - warehouse.day_sales
+    return np.stack((losses, unmet))
+
+
+class OptimizationResult:
+    """
+    `params` — подобранные значения параметров правила по лекарствам, `cost` и
+    `baseline_cost` — средняя цель по лекарствам у подобранного и у исходного варианта
+    в прогонах поиска. `validation` — итоги проверки на новых зёрнах, если она делалась.
+    """
+    def __init__(
+        self,
+        policy : str,
+        params : dict[str, np.ndarray],
+        cost : np.ndarray,
+        baseline_cost : np.ndarray,
+        rounds : list[dict],
+        simulations : int,
+        validation : dict | None = None,
+    ):
+        self.policy = policy
+        self.params = params
+        self.cost = cost
+        self.baseline_cost = baseline_cost
+        self.rounds = rounds
+        self.simulations = simulations
+        self.validation = validation
+
+    def to_params(self, base_params : SimulationParams) -> SimulationParams:
+        return base_params.model_copy(update={
+            'reorder': self.policy,
+            'reorder_params': {name: values.tolist() for name, values in self.params.items()},
+        })
+
+    def to_dict(self) -> dict:
+        return {
+            'policy': self.policy,
+            'cost': float(self.cost.sum()),
+            'baseline_cost': float(self.baseline_cost.sum()),
+            'simulations': self.simulations,
+            'rounds': self.rounds,
+            'validation': self.validation,
+        }
+
+
+def _candidate_values(defaults : dict[str, np.ndarray], factors : list[float]) -> tuple[np.ndarray, int]:
+    """
+    Значения параметров всех вариантов: `values[candidate, parameter, medicine]`
+    и номер исходного варианта.
+    """
+    names = list(defaults)
+    combinations = list(itertools.product(factors, repeat=len(names)))
+    base = np.stack([defaults[name] for name in names]).astype(float)
+    values = np.rint(np.array(combinations)[:, :, None] * base[None]).astype(np.int64)
+    return values, combinations.index((1,) * len(names))
+
+
+def optimize_reorder(
+    params : SimulationParams,
+    medicines_data,
+    customers_data = None,
+    policy : str = 'ss',
+    factors : list[float] = FACTORS,
+    replications : int = 8,
+    first_replications : int = 2,
+    keep : float = 0.5,
+    stockout_cost : float = 1.0,
+    seed : int = 0,
+    workers : int | None = None,
+    validate : bool = True,
+) -> OptimizationResult:
+    """
+    Подбирает параметры правила `policy` по лекарствам на горизонте `params.days`.
+    С `validate` подобранные и исходные параметры (`params`) сравниваются на
+    `replications` новых зёрнах, тоже общих для обоих.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Неизвестное правило закупок: {policy}, доступны: {', '.join(POLICIES)}")
+    if not isinstance(medicines_data, Scenario):
+        medicines_data, customers_data = Scenario.compile(medicines_data, customers_data), None
+
+    catalog, _ = medicines_data.build_catalog()
+    wholesale = catalog.wholesale()
+    size = len(catalog)
+    names = POLICIES[policy].PARAMETERS
+    values, baseline = _candidate_values(POLICIES[policy].defaults(catalog), sorted(set(factors) | {1}))
+    candidates = len(values)
+    medicines = np.arange(size)
+
+    seeds = replication_seeds(seed, 2 * replications)
+    totals = np.zeros((candidates, size))
+    samples = np.zeros((candidates, size), dtype=np.int64)
+    alive = np.ones((candidates, size), dtype=bool)
+
+    rounds = []
+    simulations = 0
+    done = 0
+    target = min(first_replications, replications)
+    while True:
+        # варианты каждого лекарства по слотам; в лишних слотах лекарство получает
+        # первый из своих вариантов, но этот прогон ему не засчитывается
+        order = np.argsort(~alive, axis=0, kind='stable')
+        survivors = alive.sum(axis=0)
+        slots = int(survivors.max())
+
+        tasks, slot_of_task = [], []
+        for slot in range(slots):
+            chosen = order[np.where(slot < survivors, slot, 0), medicines]
+            slot_params = params.model_copy(update={
+                'reorder': policy,
+                'reorder_params': {name: values[chosen, index, medicines].tolist() for index, name in enumerate(names)},
+            })
+            for replication in range(done, target):
+                tasks.append((slot_params, seeds[replication]))
+                slot_of_task.append(slot)
+
+        started = time.perf_counter()
+        results = run_tasks(tasks, medicines_data, None, workers, simulate=simulate_costs)
+        simulations += len(tasks)
+
+        for slot, (losses, unmet) in zip(slot_of_task, results):
+            counted = slot < survivors
+            chosen = order[slot, medicines[counted]]
+            cost = losses + stockout_cost * wholesale * unmet
+            totals[chosen, medicines[counted]] += cost[counted]
+            samples[chosen, medicines[counted]] += 1
+
+        mean = np.where(alive, totals / np.maximum(samples, 1), np.inf)
+        rounds.append({
+            'replications': target,
+            'candidates': int(alive.sum()),
+            'simulations': len(tasks),
+            'seconds': time.perf_counter() - started,
+            'cost': float(mean.min(axis=0).sum()),
+        })
+
+        done = target
+        if done >= replications or slots == 1:
+            break
+
+        # отсев: у каждого лекарства остаются лучшие варианты по среднему на общих зёрнах
+        kept = np.maximum(np.ceil(survivors * keep), 1)
+        rank = np.empty_like(order)
+        np.put_along_axis(rank, np.argsort(mean, axis=0, kind='stable'), np.arange(candidates)[:, None], axis=0)
+        alive &= rank < kept
+        target = min(2 * target, replications)
+
+    best = mean.argmin(axis=0)
+    result = OptimizationResult(
+        policy = policy,
+        params = {name: values[best, index, medicines] for index, name in enumerate(names)},
+        cost = mean[best, medicines],
+        baseline_cost = totals[baseline] / np.maximum(samples[baseline], 1),
+        rounds = rounds,
+        simulations = simulations,
+    )
+
+    if validate:
+        compared = [params, result.to_params(params)]
+        tasks = [(compared_params, check_seed) for compared_params in compared for check_seed in seeds[replications:]]
+        costs = [
+            float((losses + stockout_cost * wholesale * unmet).sum())
+            for losses, unmet in run_tasks(tasks, medicines_data, None, workers, simulate=simulate_costs)
+        ]
+        result.simulations += len(tasks)
+        result.validation = {
+            'replications': replications,
+            'baseline': float(np.mean(costs[:replications])),
+            'optimized': float(np.mean(costs[replications:])),
+        }
+
+    return result
+
+
+def parse_args(argv : list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m business.optimizer',
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--medicines', help='CSV со справочником лекарств (по умолчанию — демонстрационный)')
+    parser.add_argument('--customers', help='CSV с постоянными клиентами (по умолчанию — демонстрационный)')
+    parser.add_argument('--params', help='JSON с полями SimulationParams')
+    parser.add_argument('--scenario-cache', dest='scenario_cache', help='каталог скомпилированных сценариев')
+    parser.add_argument('--days', type=int, help='горизонт одного прогона поиска')
+
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='ss')
+    parser.add_argument('--factors', type=float, nargs='+', default=list(FACTORS),
+                        help='множители к параметрам правила по умолчанию')
+    parser.add_argument('--replications', type=int, default=8)
+    parser.add_argument('--first-replications', dest='first_replications', type=int, default=2)
+    parser.add_argument('--keep', type=float, default=0.5, help='доля вариантов, остающихся после раунда')
+    parser.add_argument('--stockout-cost', dest='stockout_cost', type=float, default=1.0,
+                        help='цена недопоставленной единицы в оптовых ценах лекарства')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--no-validate', dest='validate', action='store_false')
+    parser.add_argument('--output', help='JSON с параметрами моделирования и подобранным правилом')
+    return parser.parse_args(argv)
+
+
+def main(argv : list[str] | None = None):
+    from .cli import build_params, load_scenario
+
+    args = parse_args(argv)
+    params = build_params(args)
+    result = optimize_reorder(
+        params,
+        load_scenario(args),
+        policy = args.policy,
+        factors = args.factors,
+        replications = args.replications,
+        first_replications = args.first_replications,
+        keep = args.keep,
+        stockout_cost = args.stockout_cost,
+        seed = args.seed,
+        workers = args.workers,
+        validate = args.validate,
+    )
+
+    for number, stats in enumerate(result.rounds, 1):
+        print(
+            f"Раунд {number}: вариантов {stats['candidates']}, повторов {stats['replications']}, "
+            f"прогонов {stats['simulations']}, {stats['seconds']:.1f} с, цель {stats['cost']:,.2f}"
+        )
+    print(f'Цель на прогонах поиска: {result.baseline_cost.sum():,.2f} -> {result.cost.sum():,.2f}')
+    if result.validation:
+        validation = result.validation
+        print(f"Проверка на {validation['replications']} новых зёрнах: {validation['baseline']:,.2f} -> {validation['optimized']:,.2f}")
+    print(f'Всего прогонов: {result.simulations}')
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result.to_params(params).model_dump(mode='json'), f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
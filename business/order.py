@@ -1,8 +1,8 @@
 from enum import Enum
 from typing import Self
 
-from .customer import Customer
-from .medicine import Medicine, WarehouseMedicineOrder
+from .customer import Customer, CustomerRecord
+from .medicine import MedicineCatalog, WarehouseMedicineOrder
 
 
 class OrderType(str, Enum):
@@ -18,7 +18,9 @@ class OrderStatus(str, Enum):
 
 
 class Order:
-    def __init__(self, customer : Customer, medicines : dict[Medicine, int], order_type : OrderType):
+    __slots__ = ('customer', 'requested_medicines', 'status', 'type', 'preliminary_reciept', 'summary')
+
+    def __init__(self, customer : Customer | CustomerRecord, medicines : dict[int, int], order_type : OrderType):
         self.customer = customer
         self.requested_medicines = medicines
         self.status = OrderStatus.NO_COURIER
@@ -34,7 +36,7 @@ class Order:
         self.summary = summary
 
     @classmethod
-    def create_regular_order(cls, customer : Customer) -> Self:
+    def create_regular_order(cls, customer : Customer | CustomerRecord) -> Self:
         return cls(
             customer,
             customer.regular_medicines,
@@ -44,10 +46,10 @@ class Order:
     def __str__(self):
         return f'<Order: {self.customer}\t| {self.status.value}\t| {self.type.value}\t| {self.requested_medicines}>'
 
-    def to_row(self):
+    def to_row(self, catalog : MedicineCatalog):
         med_count = [
-            f'{med.name}: {count}'
-            for med, count in self.requested_medicines.items()
+            f'{catalog[medicine_id].name}: {count}'
+            for medicine_id, count in self.requested_medicines.items()
         ]
         return [
             self.customer.name,
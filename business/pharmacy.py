@@ -1,11 +1,14 @@
-from copy import deepcopy
 from pydantic import BaseModel
 from typing import Self
 
 from .base import IDaily
-from .customer import Customer
+from .customer import Customer, CustomerRecord, RegularCustomers
+from .dispatch import DispatchPolicy
+from .fulfillment import DELIVERED
+from .history import WarehouseHistory
 from .order import Order
 from .paymaster import PayMaster
+from .profiling import NULL_PROFILER
 from .warehouse import Warehouse
 
 
@@ -14,16 +17,50 @@ class PharmacyDayStatistics(BaseModel):
     revenue     : float = .0
     profit      : float = .0
     losses      : float = .0
+    requested_units : int = 0
+    filled_units    : int = 0
+    stockouts       : int = 0
+    no_courier      : int = 0
+    order_count     : int = 0
+    delivered       : int = 0
+    courier_load    : list[int] = []
+    courier_capacity : int = 0
     orders      : list[Order] = []
-    warehouse   : Warehouse | None = None
+    history     : WarehouseHistory | None = None
 
     class Config:
         arbitrary_types_allowed = True
 
+    @property
+    def warehouse(self) -> Warehouse | None:
+        if self.history is None or self.day not in self.history:
+            return None
+        return self.history.restore(self.day)
+
     @property
     def margin(self) -> float:
         return (self.profit / self.revenue * 100) if self.revenue > 0 else 0
 
+    @property
+    def courier_utilization(self) -> float:
+        capacity = len(self.courier_load) * self.courier_capacity
+        return sum(self.courier_load) / capacity if capacity else 0
+
+    def to_record(self) -> dict:
+        return {
+            'day': self.day,
+            'revenue': self.revenue,
+            'profit': self.profit,
+            'losses': self.losses,
+            'margin': self.margin,
+            'orders': self.order_count,
+            'delivered': self.delivered,
+            'fill_rate': self.filled_units / self.requested_units if self.requested_units else 1.0,
+            'stockouts': self.stockouts,
+            'no_courier': self.no_courier,
+            'courier_utilization': self.courier_utilization,
+        }
+
     def __add__(self, other: Self) -> Self:
         return PharmacyDayStatistics(
             day = self.day + other.day,
@@ -38,65 +75,92 @@ class PharmacyDayStatistics(BaseModel):
         return self.__add__(other)
 
     def __str__(self):
+        warehouse = self.warehouse
         orders = [
-            repr(order.to_row())
+            repr(order.to_row(warehouse.catalog))
             for order in self.orders
         ]
         orders_str = '\n'.join(orders) if orders else ''
-        warehouse = self.warehouse.to_table()
-        warehouse_str = '\n'.join(map(str, warehouse))
+        warehouse_str = '\n'.join(map(str, warehouse.to_table()))
         day_str = f'День {self.day}'
         return f'{day_str}\n{self.revenue=}\t{self.profit=}\t{self.losses=}\n{orders_str}\n{warehouse_str}'
 
 
 class Pharmacy(IDaily):
     COURIER_MAX_ORDERS = 15
-    def __init__(self, warehouse : Warehouse, paymaster : PayMaster, regular_customers : list[Customer], couriers : int):
+    def __init__(self, warehouse : Warehouse, paymaster : PayMaster, regular_customers : RegularCustomers | list[Customer | CustomerRecord], couriers : int, history : WarehouseHistory | None = None, dispatch : DispatchPolicy | None = None, sample_every : int = 1):
         self.warehouse = warehouse
         self.paymaster = paymaster
+        if not isinstance(regular_customers, RegularCustomers):
+            regular_customers = RegularCustomers.from_records(regular_customers, len(warehouse.catalog))
         self.regular_customers = regular_customers
         self.couriers = couriers
+        self.history = history
+        # история склада записывается только за каждый `sample_every`-й день
+        self.sample_every = sample_every
+        self.dispatch = dispatch or DispatchPolicy()
+        self.profiler = NULL_PROFILER
 
+        self.day = 0
         self.orders = None
         self.statistics = None
 
     def start_day(self):
         self.orders = list()
-        self.statistics = PharmacyDayStatistics()
+        self.statistics = PharmacyDayStatistics(day=self.day, history=self.history)
         self.warehouse.start_day()
 
     def add_regular_orders(self, day : int):
-        for customer in self.regular_customers:
-            if day % customer.regularity == 0:
-                self.orders.append(Order.create_regular_order(customer))
+        self.orders.extend(map(Order.create_regular_order, self.regular_customers.due(day)))
 
     def add_ordes(self, orders : list[Order]):
         self.orders += orders
 
     def deliver_orders(self):
-        can_deliver = min(len(self.orders), self.couriers * self.COURIER_MAX_ORDERS)
-        for order_num in range(can_deliver):
-            order = self.orders[order_num]
-            self.warehouse.process_order(order)
-
-            revenue = self.paymaster.count_summary(order)
-            self.statistics.revenue += revenue
-            self.statistics.profit += (revenue - order.preliminary_reciept.cost)
+        with self.profiler.phase('dispatch'):
+            plan = self.dispatch.dispatch(self.orders, self.warehouse, self.couriers, self.COURIER_MAX_ORDERS)
+            deliverable = [self.orders[order_num] for order_num in plan.selected.tolist()]
+        with self.profiler.phase('process_orders'):
+            fulfillment = self.warehouse.process_orders(deliverable)
+
+        with self.profiler.phase('count_summary'):
+            for order in deliverable:
+                revenue = self.paymaster.count_summary(order)
+                self.statistics.revenue += revenue
+                self.statistics.profit += (revenue - order.preliminary_reciept.cost)
+
+        self.statistics.requested_units += int(fulfillment.requested.sum())
+        self.statistics.filled_units += int(fulfillment.filled.sum())
+        self.statistics.stockouts += int((fulfillment.status != DELIVERED).sum())
+        self.statistics.delivered += int(fulfillment.delivered.sum())
+        self.statistics.no_courier = len(self.orders) - len(deliverable)
+        self.statistics.courier_load = plan.load.tolist()
+        self.statistics.courier_capacity = self.COURIER_MAX_ORDERS
 
     def end_day(self):
-        self.statistics.losses = self.warehouse.end_day()
-        self.statistics.warehouse = deepcopy(self.warehouse)
+        with self.profiler.phase('warehouse.end_day'):
+            self.statistics.losses = self.warehouse.end_day()
+        if self.history is not None and self.day % self.sample_every == 0:
+            with self.profiler.phase('history.record'):
+                self.history.record(self.day, self.warehouse)
         self.statistics.orders = self.orders
+        self.statistics.order_count = len(self.orders)
         self.statistics.profit -= self.statistics.losses
 
     def get_statistics(self):
         return self.statistics
 
     def process_day(self, day, orders):
-        self.start_day()
-        self.add_regular_orders(day)
-        self.add_ordes(orders)
-        self.deliver_orders()
-        self.end_day()
-        self.statistics.day = day
+        profiler = self.profiler
+        self.day = day
+        with profiler.phase('start_day'):
+            self.start_day()
+        with profiler.phase('add_regular_orders'):
+            self.add_regular_orders(day)
+        with profiler.phase('add_orders'):
+            self.add_ordes(orders)
+        with profiler.phase('deliver_orders'):
+            self.deliver_orders()
+        with profiler.phase('end_day'):
+            self.end_day()
         return self.get_statistics()
@@ -0,0 +1,153 @@
+"""
+Замер времени этапов моделирования.
+
+`Simulation.next_day` и `Pharmacy.process_day` оборачивают свои этапы в `profiler.phase(name)`.
+По умолчанию стоит `NULL_PROFILER`: его `phase` возвращает один и тот же пустой контекст,
+так что выключенный замер стоит один вызов метода на этап. `Profiler` копит время и число
+вызовов каждого этапа за прогон и по дням, а события — для трассы Chrome
+(`chrome://tracing`, Perfetto, speedscope), где вложенные этапы видны как flame graph.
+"""
+import json
+import os
+import time
+
+from contextlib import nullcontext
+
+
+_NULL_PHASE = nullcontext()
+
+
+class NullProfiler:
+    enabled = False
+
+    def phase(self, name : str):
+        return _NULL_PHASE
+
+    def set_day(self, day : int):
+        return None
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class PhaseStat:
+    __slots__ = ('calls', 'total', 'max')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = .0
+        self.max = .0
+
+    def add(self, seconds : float):
+        self.calls += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+
+class _Phase:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name : str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._stack.append(self.name)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter_ns()
+        profiler = self.profiler
+        path = '/'.join(profiler._stack)
+        profiler._stack.pop()
+        profiler._record(path, self.name, self.start, end)
+        return False
+
+
+class Profiler(NullProfiler):
+    """
+    Этапы называются путём вложенности: `next_day/process_day/deliver_orders`.
+    Хранится не больше `max_events` событий трассы; итоги считаются по всем вызовам.
+    """
+    enabled = True
+
+    def __init__(self, max_events : int = 1_000_000):
+        self.max_events = max_events
+        self.phases: dict[str, PhaseStat] = {}
+        self.days: dict[int, dict[str, float]] = {}
+        self.events: list[tuple[str, int, int, int]] = []
+        self.day = 0
+        self._stack: list[str] = []
+        self._origin = time.perf_counter_ns()
+
+    def phase(self, name : str) -> _Phase:
+        return _Phase(self, name)
+
+    def set_day(self, day : int):
+        self.day = day
+
+    def _record(self, path : str, name : str, start : int, end : int):
+        seconds = (end - start) / 1e9
+        stat = self.phases.get(path)
+        if stat is None:
+            stat = self.phases[path] = PhaseStat()
+        stat.add(seconds)
+
+        day = self.days.setdefault(self.day, {})
+        day[path] = day.get(path, .0) + seconds
+
+        if len(self.events) < self.max_events:
+            self.events.append((name, start - self._origin, end - start, self.day))
+
+    def summary(self) -> list[dict]:
+        roots = sum(stat.total for path, stat in self.phases.items() if '/' not in path)
+        return [
+            {
+                'phase': path,
+                'calls': stat.calls,
+                'total': stat.total,
+                'mean': stat.total / stat.calls,
+                'max': stat.max,
+                'share': stat.total / roots if roots else .0,
+            }
+            for path, stat in sorted(self.phases.items())
+        ]
+
+    def summary_table(self) -> str:
+        rows = self.summary()
+        width = max((len(row['phase']) for row in rows), default=5)
+        lines = [f"{'Этап':{width}}  {'вызовов':>8}  {'всего, с':>10}  {'среднее, мс':>11}  {'макс, мс':>9}  {'доля':>6}"]
+        for row in rows:
+            lines.append(
+                f"{row['phase']:{width}}  {row['calls']:>8}  {row['total']:>10.3f}  "
+                f"{row['mean'] * 1e3:>11.3f}  {row['max'] * 1e3:>9.3f}  {row['share']:>6.1%}"
+            )
+        return '\n'.join(lines)
+
+    def day_table(self) -> list[dict]:
+        return [{'day': day, **phases} for day, phases in sorted(self.days.items())]
+
+    def trace_events(self, tid : int = 0) -> list[dict]:
+        return [
+            {
+                'name': name,
+                'ph': 'X',
+                'ts': start / 1e3,
+                'dur': duration / 1e3,
+                'pid': os.getpid(),
+                'tid': tid,
+                'args': {'day': day},
+            }
+            for name, start, duration, day in self.events
+        ]
+
+
+def write_chrome_trace(filename : str | os.PathLike, profilers : list[Profiler]):
+    """
+    Трасса в формате Chrome Trace Event; каждый профилировщик (прогон) — отдельный поток.
+    """
+    events = [event for tid, profiler in enumerate(profilers) for event in profiler.trace_events(tid)]
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
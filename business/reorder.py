@@ -0,0 +1,172 @@
+"""
+Правила закупок склада.
+
+В конце каждого дня склад сообщает правилу запрошенное за день (`observe`) и спрашивает
+объёмы закупки (`quantities`) для лекарств без ожидаемой поставки; у лекарства может быть
+не больше одной ожидаемой поставки. Параметры правил задаются по каждому лекарству (список
+длины справочника) или одним числом для всех; не заданные берутся из справочника.
+"""
+import numpy as np
+
+from .customer import RegularCustomers
+from .medicine import MedicineCatalog
+
+
+# наибольший срок поставки собственных закупок склада, дней
+MAX_LEAD_DAYS = 3
+
+
+class ReorderPolicy:
+    """
+    Точка заказа (R, Q): когда остаток ниже `reorder_point`, заказывается `quantity`.
+    По умолчанию это `min_quantity` и `purchase_quantity` из справочника.
+
+    Решения правил с `continuous = True` меняются только вместе с остатком, поэтому склад
+    проверяет лишь лекарства с движением за день; остальные правила проверяют весь склад.
+    """
+    name = 'rq'
+    title = 'Точка заказа (R, Q)'
+    PARAMETERS = ('reorder_point', 'quantity')
+    continuous = True
+
+    def __init__(self, catalog : MedicineCatalog, regular_customers : RegularCustomers | None = None, **params):
+        unknown = set(params) - set(self.PARAMETERS)
+        if unknown:
+            raise ValueError(f"Неизвестные параметры правила {self.name}: {', '.join(sorted(unknown))}")
+
+        self.regular_customers = regular_customers
+        defaults = self.defaults(catalog)
+        self.params = {
+            name: np.broadcast_to(np.asarray(params.get(name, defaults[name]), dtype=np.int64), (len(catalog),))
+            for name in self.PARAMETERS
+        }
+        self.day = 0
+
+    @classmethod
+    def defaults(cls, catalog : MedicineCatalog) -> dict[str, np.ndarray]:
+        return {
+            'reorder_point': _catalog_column(catalog, 'min_quantity'),
+            'quantity': _catalog_column(catalog, 'purchase_quantity'),
+        }
+
+    def observe(self, requested : np.ndarray):
+        self.day += 1
+
+    def quantities(self, medicine_ids : np.ndarray, counts : np.ndarray) -> np.ndarray:
+        """
+        Объём закупки каждого из `medicine_ids` при остатках `counts`; 0 — не заказывать.
+        """
+        reorder_point, quantity = (self.params[name][medicine_ids] for name in self.PARAMETERS)
+        return np.where(counts < reorder_point, quantity, 0)
+
+    def state(self) -> dict[str, np.ndarray]:
+        return {'day': np.array([self.day], dtype=np.int64)}
+
+    def load_state(self, state : dict[str, np.ndarray]):
+        self.day = int(state['day'][0])
+
+
+class OrderUpToPolicy(ReorderPolicy):
+    """
+    (s, S): когда остаток ниже `reorder_point`, запас пополняется до `order_up_to`.
+    """
+    name = 'ss'
+    title = 'Пополнение до уровня (s, S)'
+    PARAMETERS = ('reorder_point', 'order_up_to')
+
+    @classmethod
+    def defaults(cls, catalog : MedicineCatalog) -> dict[str, np.ndarray]:
+        min_quantity = _catalog_column(catalog, 'min_quantity')
+        return {
+            'reorder_point': min_quantity,
+            'order_up_to': min_quantity + _catalog_column(catalog, 'purchase_quantity'),
+        }
+
+    def quantities(self, medicine_ids : np.ndarray, counts : np.ndarray) -> np.ndarray:
+        reorder_point, order_up_to = (self.params[name][medicine_ids] for name in self.PARAMETERS)
+        return np.where(counts < reorder_point, np.maximum(order_up_to - counts, 0), 0)
+
+
+class PeriodicReviewPolicy(ReorderPolicy):
+    """
+    Периодическая проверка: раз в `period` дней запас пополняется до `order_up_to`.
+    """
+    name = 'periodic'
+    title = 'Периодическая проверка'
+    PARAMETERS = ('period', 'order_up_to')
+    continuous = False
+
+    @classmethod
+    def defaults(cls, catalog : MedicineCatalog) -> dict[str, np.ndarray]:
+        return {
+            'period': np.full(len(catalog), 7, dtype=np.int64),
+            'order_up_to': _catalog_column(catalog, 'min_quantity') + _catalog_column(catalog, 'purchase_quantity'),
+        }
+
+    def quantities(self, medicine_ids : np.ndarray, counts : np.ndarray) -> np.ndarray:
+        period, order_up_to = (self.params[name][medicine_ids] for name in self.PARAMETERS)
+        review = self.day % np.maximum(period, 1) == 0
+        return np.where(review, np.maximum(order_up_to - counts, 0), 0)
+
+
+class ForecastPolicy(ReorderPolicy):
+    """
+    По прогнозу спроса: заказы постоянных клиентов известны по расписанию
+    (`RegularCustomers.expected_demand`), остальной спрос — экспоненциальное среднее
+    запрошенного сверх них. Закупка делается, когда остатка не хватит на срок поставки
+    и `safety_days` дней, и покрывает ещё `cover_days` дней.
+    """
+    name = 'forecast'
+    title = 'По прогнозу спроса'
+    PARAMETERS = ('cover_days', 'safety_days')
+    continuous = False
+    SMOOTHING = 0.2
+
+    def __init__(self, catalog : MedicineCatalog, regular_customers : RegularCustomers | None = None, **params):
+        super().__init__(catalog, regular_customers, **params)
+        self.rate = np.zeros(len(catalog))
+
+    @classmethod
+    def defaults(cls, catalog : MedicineCatalog) -> dict[str, np.ndarray]:
+        return {
+            'cover_days': np.full(len(catalog), 7, dtype=np.int64),
+            'safety_days': np.full(len(catalog), 2, dtype=np.int64),
+        }
+
+    def observe(self, requested : np.ndarray):
+        super().observe(requested)
+        regular = self.regular_customers.demand(self.day) if self.regular_customers is not None else 0
+        self.rate += self.SMOOTHING * (np.maximum(requested - regular, 0) - self.rate)
+
+    def forecast(self, medicine_ids : np.ndarray, days : np.ndarray) -> np.ndarray:
+        """
+        Ожидаемый спрос на лекарства `medicine_ids` в следующие `days` дней.
+        """
+        demand = self.rate[medicine_ids] * days
+        if self.regular_customers is not None:
+            demand += self.regular_customers.expected_demand(self.day, days, medicine_ids)
+        return demand
+
+    def quantities(self, medicine_ids : np.ndarray, counts : np.ndarray) -> np.ndarray:
+        cover_days, safety_days = (self.params[name][medicine_ids] for name in self.PARAMETERS)
+        horizon = MAX_LEAD_DAYS + safety_days
+        reorder = counts < self.forecast(medicine_ids, horizon)
+        target = np.ceil(self.forecast(medicine_ids, horizon + cover_days)).astype(np.int64)
+        return np.where(reorder, np.maximum(target - counts, 0), 0)
+
+    def state(self) -> dict[str, np.ndarray]:
+        return {**super().state(), 'rate': self.rate.copy()}
+
+    def load_state(self, state : dict[str, np.ndarray]):
+        super().load_state(state)
+        self.rate = state['rate'].astype(float)
+
+
+def _catalog_column(catalog : MedicineCatalog, field : str) -> np.ndarray:
+    return np.array([getattr(medicine, field) for medicine in catalog], dtype=np.int64)
+
+
+POLICIES = {
+    policy.name: policy
+    for policy in (ReorderPolicy, OrderUpToPolicy, PeriodicReviewPolicy, ForecastPolicy)
+}
@@ -0,0 +1,141 @@
+import math
+import tempfile
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from .accumulators import t_quantile
+from .scenario import Scenario
+from .simulation import Simulation, SimulationParams
+
+
+METRICS = ('revenue', 'profit', 'losses', 'delivered')
+
+
+class ReplicationResult:
+    """
+    Показатели по дням для N независимых прогонов: `samples[replication, day, metric]`.
+    """
+    def __init__(self, samples : np.ndarray, confidence : float = 0.95):
+        self.samples = samples
+        self.confidence = confidence
+        self.days = np.arange(1, samples.shape[1] + 1)
+
+        replications = samples.shape[0]
+        self.mean = samples.mean(axis=0)
+        if replications > 1:
+            self.std = samples.std(axis=0, ddof=1)
+            half_width = t_quantile((1 + confidence) / 2, replications - 1) * self.std / math.sqrt(replications)
+        else:
+            self.std = np.zeros_like(self.mean)
+            half_width = np.full_like(self.mean, np.inf)
+
+        self.ci_low = self.mean - half_width
+        self.ci_high = self.mean + half_width
+
+    @property
+    def replications(self) -> int:
+        return self.samples.shape[0]
+
+    def metric(self, name : str) -> dict[str, np.ndarray]:
+        col = METRICS.index(name)
+        return {
+            'mean': self.mean[:, col],
+            'std': self.std[:, col],
+            'ci_low': self.ci_low[:, col],
+            'ci_high': self.ci_high[:, col],
+        }
+
+    def to_rows(self) -> list[dict]:
+        rows = []
+        for idx, day in enumerate(self.days):
+            row = {'day': int(day)}
+            for col, name in enumerate(METRICS):
+                row[f'{name}_mean'] = float(self.mean[idx, col])
+                row[f'{name}_std'] = float(self.std[idx, col])
+                row[f'{name}_ci_low'] = float(self.ci_low[idx, col])
+                row[f'{name}_ci_high'] = float(self.ci_high[idx, col])
+            rows.append(row)
+        return rows
+
+
+_worker_catalog = None
+
+
+def _init_worker(medicines_data, customers_data):
+    global _worker_catalog
+    _worker_catalog = (medicines_data, customers_data)
+
+
+def simulate_replication(params : SimulationParams, medicines_data, customers_data, seed : int) -> np.ndarray:
+    sim = Simulation(params, medicines_data, customers_data, seed, history=0)
+
+    result = np.empty((params.days, len(METRICS)))
+    for idx in range(params.days):
+        stat = sim.next_day()
+        result[idx] = (stat.revenue, stat.profit, stat.losses, stat.delivered)
+    return result
+
+
+Simulate = Callable[[SimulationParams, Scenario, None, int], np.ndarray]
+
+
+def _run_task(task : tuple[Simulate, SimulationParams, int]) -> np.ndarray:
+    simulate, params, seed = task
+    return simulate(params, *_worker_catalog, seed)
+
+
+def replication_seeds(seed : int | None, replications : int) -> list[int]:
+    return np.random.SeedSequence(seed).generate_state(replications).tolist()
+
+
+def run_tasks(
+    tasks : list[tuple[SimulationParams, int]],
+    medicines_data,
+    customers_data,
+    workers : int | None = None,
+    simulate : Simulate = simulate_replication,
+) -> list[np.ndarray]:
+    """
+    Справочники компилируются один раз здесь; сохранённый на диск `Scenario` передаётся
+    исполнителям только путём и открывается ими через mmap, сценарий в памяти для этого
+    сохраняется во временный каталог. Задача — пара (`params`, `seed`); `simulate(params,
+    medicines_data, customers_data, seed)` — функция уровня модуля, результат которой
+    возвращается по каждой задаче.
+    """
+    if not isinstance(medicines_data, Scenario):
+        medicines_data, customers_data = Scenario.compile(medicines_data, customers_data), None
+
+    jobs = [(simulate, params, seed) for params, seed in tasks]
+    if workers == 1:
+        _init_worker(medicines_data, customers_data)
+        return [_run_task(job) for job in jobs]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if medicines_data.path is None:
+            path = Path(tmp) / 'scenario'
+            medicines_data.save(path)
+            medicines_data = Scenario(medicines_data.arrays, medicines_data.sizes, path)
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(medicines_data, customers_data),
+        ) as executor:
+            return list(executor.map(_run_task, jobs))
+
+
+def run_replications(
+    params : SimulationParams,
+    medicines_data,
+    customers_data,
+    replications : int,
+    seed : int | None = None,
+    workers : int | None = None,
+    confidence : float = 0.95,
+) -> ReplicationResult:
+    tasks = [(params, s) for s in replication_seeds(seed, replications)]
+    results = run_tasks(tasks, medicines_data, customers_data, workers)
+    return ReplicationResult(np.stack(results), confidence)
@@ -0,0 +1,222 @@
+"""
+Скомпилированный сценарий: справочник лекарств, постоянные клиенты и их регулярные заказы
+в виде плоских массивов, сохраняемых каталогом файлов `.npy`.
+
+Файлы открываются через `mmap`, поэтому процессы-исполнители, получившие сценарий
+(передаётся только путь), читают одни и те же страницы памяти. `ScenarioCache` хранит
+сценарии по хешу содержимого исходных CSV и компилирует их только при первом обращении.
+"""
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+
+from pathlib import Path
+from typing import Self
+
+from .customer import RegularCustomers
+from .medicine import Medicine, MedicineCatalog
+from .tables import CatalogImportError, CustomerTable, MedicineTable, MEDICINE_GROUPS, MEDICINE_TYPES
+
+
+FORMAT_VERSION = 1
+
+MEDICINE_FIELDS = (
+    'counts', 'dosage', 'type', 'expiration_days', 'wholesale', 'group', 'purchase_quantity', 'min_quantity',
+)
+CUSTOMER_FIELDS = ('discount_card', 'regularity', 'order_offsets', 'order_medicines', 'order_counts')
+TEXT_FIELDS = ('medicine_names', 'customer_names', 'phones', 'addresses')
+
+SEPARATOR = '\0'
+
+
+def _encode_text(values : list[str]) -> np.ndarray:
+    return np.frombuffer(SEPARATOR.join(values).encode('utf-8'), dtype=np.uint8)
+
+
+def _decode_text(data : np.ndarray, size : int) -> list[str]:
+    if size == 0:
+        return []
+    return data.tobytes().decode('utf-8').split(SEPARATOR)
+
+
+class Scenario:
+    """
+    Данные сценария после разбора и проверки. Повторяющиеся названия лекарств уже
+    объединены, регулярные заказы ссылаются на лекарства по идентификаторам справочника
+    (`order_medicines`, границы клиентов — `order_offsets`).
+    """
+    def __init__(self, arrays : dict[str, np.ndarray], sizes : dict[str, int], path : Path | None = None):
+        self.arrays = arrays
+        self.sizes = sizes
+        self.path = path
+        self._digest: str | None = None
+
+    @classmethod
+    def compile(cls, medicines_data, customers_data) -> Self:
+        """
+        Строит сценарий из таблиц (`MedicineTable`, `CustomerTable`) или строк CSV.
+        Ошибки в строках и неизвестные лекарства в заказах — `CatalogImportError`.
+        Без `customers_data` сценарий строится без постоянных клиентов.
+        """
+        if not isinstance(medicines_data, MedicineTable):
+            medicines_data, _ = MedicineTable.from_rows(medicines_data, strict=True)
+        if not isinstance(customers_data, CustomerTable):
+            customers_data, _ = CustomerTable.from_rows(customers_data or [], strict=True)
+
+        if errors := customers_data.unknown_medicines(medicines_data.names):
+            raise CatalogImportError(errors)
+
+        # повторное название заменяет предыдущую строку, но сохраняет идентификатор первой
+        last_rows = {name: row for row, name in enumerate(medicines_data.names)}
+        ids = {name: medicine_id for medicine_id, name in enumerate(last_rows)}
+        rows = np.array(list(last_rows.values()), dtype=np.int64)
+
+        arrays = {
+            field: np.asarray(column)[rows]
+            for field, column in zip(MEDICINE_FIELDS, medicines_data.columns[1:])
+        }
+
+        customer_names, phones, addresses, cards, _, regularity = customers_data.columns
+        medicine_ids = np.array([ids[name] for name in customers_data.names], dtype=np.int64)
+        arrays.update({
+            'discount_card': cards.astype(bool),
+            'regularity': regularity,
+            'order_offsets': customers_data.order_offsets,
+            'order_medicines': medicine_ids[customers_data.order_names],
+            'order_counts': customers_data.order_counts,
+        })
+
+        texts = {
+            'medicine_names': list(ids),
+            'customer_names': customer_names,
+            'phones': phones,
+            'addresses': addresses,
+        }
+        arrays.update({field: _encode_text(values) for field, values in texts.items()})
+        sizes = {field: len(values) for field, values in texts.items()}
+        return cls(arrays, sizes)
+
+    @classmethod
+    def load(cls, path : str | os.PathLike, mmap : bool = True) -> Self:
+        path = Path(path)
+        with open(path / 'meta.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['version'] != FORMAT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия сценария: {meta['version']}")
+
+        arrays = {
+            field: np.load(path / f'{field}.npy', mmap_mode='r' if mmap else None)
+            for field in MEDICINE_FIELDS + CUSTOMER_FIELDS + TEXT_FIELDS
+        }
+        scenario = cls(arrays, meta['sizes'], path)
+        scenario._digest = meta['digest']
+        return scenario
+
+    def save(self, path : str | os.PathLike):
+        """
+        Записывает сценарий в каталог `path` атомарно: сначала во временный каталог рядом.
+        """
+        path = Path(path)
+        tmp = path.with_name(f'{path.name}.tmp{os.getpid()}')
+        tmp.mkdir(parents=True)
+        for field, array in self.arrays.items():
+            np.save(tmp / f'{field}.npy', np.ascontiguousarray(array))
+        with open(tmp / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump({'version': FORMAT_VERSION, 'sizes': self.sizes, 'digest': self.digest}, f)
+
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            # каталог уже записал другой процесс
+            shutil.rmtree(tmp)
+
+    @property
+    def digest(self) -> str:
+        """
+        Хеш содержимого сценария; не зависит от того, из чего он скомпилирован.
+        """
+        if self._digest is None:
+            sha = hashlib.sha256(str(FORMAT_VERSION).encode())
+            for field in sorted(self.arrays):
+                array = np.ascontiguousarray(self.arrays[field])
+                sha.update(f'{field}:{array.dtype.str}:{array.shape}'.encode())
+                sha.update(array.tobytes())
+            self._digest = sha.hexdigest()
+        return self._digest
+
+    def text(self, field : str) -> list[str]:
+        return _decode_text(self.arrays[field], self.sizes[field])
+
+    def build_catalog(self) -> tuple[MedicineCatalog, list[int]]:
+        columns = [self.arrays[field].tolist() for field in MEDICINE_FIELDS]
+        counts, dosages, types, expirations, wholesales, groups, purchases, minimums = columns
+
+        catalog = MedicineCatalog()
+        for medicine_id, name in enumerate(self.text('medicine_names')):
+            catalog.add(Medicine.model_construct(
+                name = name,
+                dosage = dosages[medicine_id],
+                type = MEDICINE_TYPES[types[medicine_id]],
+                group = MEDICINE_GROUPS[groups[medicine_id]],
+                wholesale = wholesales[medicine_id],
+                expiration_days = expirations[medicine_id],
+                purchase_quantity = purchases[medicine_id],
+                min_quantity = minimums[medicine_id],
+            ))
+        return catalog, counts
+
+    def build_customers(self) -> RegularCustomers:
+        return RegularCustomers(
+            self.text('customer_names'),
+            self.text('phones'),
+            self.text('addresses'),
+            self.arrays['discount_card'],
+            self.arrays['regularity'],
+            self.arrays['order_offsets'],
+            self.arrays['order_medicines'],
+            self.arrays['order_counts'],
+            len(self),
+        )
+
+    def __getstate__(self):
+        if self.path is not None:
+            return {'path': self.path}
+        return self.__dict__
+
+    def __setstate__(self, state):
+        if set(state) == {'path'}:
+            state = Scenario.load(state['path']).__dict__
+        self.__dict__.update(state)
+
+    def __len__(self) -> int:
+        return self.sizes['medicine_names']
+
+
+def file_digest(*filenames : str | os.PathLike) -> str:
+    sha = hashlib.sha256(str(FORMAT_VERSION).encode())
+    for filename in filenames:
+        with open(filename, 'rb') as f:
+            while chunk := f.read(1 << 20):
+                sha.update(chunk)
+        sha.update(b'\0')
+    return sha.hexdigest()
+
+
+class ScenarioCache:
+    """
+    Каталог скомпилированных сценариев; ключ — хеш содержимого исходных CSV.
+    """
+    def __init__(self, path : str | os.PathLike):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def get(self, medicines_csv : str | os.PathLike, customers_csv : str | os.PathLike) -> Scenario:
+        target = self.path / file_digest(medicines_csv, customers_csv)
+        if not target.exists():
+            Scenario.compile(
+                MedicineTable.read_csv(medicines_csv, strict=True)[0],
+                CustomerTable.read_csv(customers_csv, strict=True)[0],
+            ).save(target)
+        return Scenario.load(target)
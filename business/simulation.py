@@ -1,16 +1,76 @@
 import numpy as np
-import random
 
-from pydantic import BaseModel
+from collections import deque
+from pydantic import BaseModel, field_validator, model_validator
 
-from .customer import Customer
-from .medicine import Medicine, MedicineGroup, MedicineType
+from .accumulators import SimulationTotals
+from .checkpoint import dump_checkpoint, restore_checkpoint
+from .customer import CustomerRecord
+from .dispatch import POLICIES
+from .inventory import ArrayWarehouse
+from .medicine import MedicineCatalog
 from .order import Order, OrderType
 from .paymaster import PayMaster
+from .history import WarehouseHistory
 from .pharmacy import Pharmacy, PharmacyDayStatistics
+from .profiling import NULL_PROFILER, NullProfiler
+from .reorder import POLICIES as REORDER_POLICIES
+from .scenario import Scenario
+from .stopping import StopCondition
 from .warehouse import Warehouse
 
 
+def _first_occurrences(values : np.ndarray) -> np.ndarray:
+    order = np.argsort(values, axis=1, kind='stable')
+    sorted_values = np.take_along_axis(values, order, axis=1)
+
+    first_sorted = np.ones(values.shape, dtype=bool)
+    first_sorted[:, 1:] = sorted_values[:, 1:] != sorted_values[:, :-1]
+
+    first = np.empty_like(first_sorted)
+    np.put_along_axis(first, order, first_sorted, axis=1)
+    return first
+
+
+def choice_without_replacement(probs : np.ndarray, sizes : np.ndarray, rng : np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Для каждого элемента `sizes` выбирает `size` различных индексов с вероятностями `probs`,
+    как `rng.choice(len(probs), size, p=probs, replace=False)`, но для всех выборок сразу.
+
+    Выборка с возвращением с отбрасыванием повторов распределена так же,
+    как последовательный выбор без возвращения.
+    Возвращает индексы подряд и границы выборок (`offsets`, длина `len(sizes) + 1`).
+    """
+    cdf = np.cumsum(probs)
+    cdf /= cdf[-1]
+
+    offsets = np.zeros(len(sizes) + 1, dtype=np.intp)
+    np.cumsum(sizes, out=offsets[1:])
+    result = np.empty(offsets[-1], dtype=np.intp)
+
+    rows = np.arange(len(sizes))
+    candidates = np.empty((len(sizes), 0), dtype=np.intp)
+    width = 2 * int(sizes.max(initial=1))
+
+    while rows.size:
+        draws = np.searchsorted(cdf, rng.random((rows.size, width)), side='right')
+        candidates = np.hstack((candidates, np.minimum(draws, len(cdf) - 1)))
+
+        first = _first_occurrences(candidates)
+        rank = np.cumsum(first, axis=1)
+        row_sizes = sizes[rows]
+        done = rank[:, -1] >= row_sizes
+
+        take = first[done] & (rank[done] <= row_sizes[done, None])
+        row, col = np.nonzero(take)
+        result[offsets[rows[done]][row] + rank[done][row, col] - 1] = candidates[done][row, col]
+
+        rows = rows[~done]
+        candidates = candidates[~done]
+
+    return result, offsets
+
+
 class SimulationParams(BaseModel):
     days            : int
     couriers        : int
@@ -18,6 +78,35 @@ class SimulationParams(BaseModel):
     card_discount   : float
     base_orders     : int
     sensitivity     : float
+    array_inventory : bool = False
+    dispatch        : str = 'fifo'
+    # правило закупок и его параметры: число или список по лекарствам
+    reorder         : str = 'rq'
+    reorder_params  : dict[str, int | list[int]] = {}
+
+    @field_validator('dispatch')
+    @classmethod
+    def check_dispatch(cls, value : str) -> str:
+        if value not in POLICIES:
+            raise ValueError(f"Неизвестная политика доставки: {value}, доступны: {', '.join(POLICIES)}")
+        return value
+
+    @field_validator('reorder')
+    @classmethod
+    def check_reorder(cls, value : str) -> str:
+        if value not in REORDER_POLICIES:
+            raise ValueError(f"Неизвестное правило закупок: {value}, доступны: {', '.join(REORDER_POLICIES)}")
+        return value
+
+    @model_validator(mode='after')
+    def check_reorder_params(self):
+        parameters = REORDER_POLICIES[self.reorder].PARAMETERS
+        if unknown := set(self.reorder_params) - set(parameters):
+            raise ValueError(
+                f"Неизвестные параметры правила {self.reorder}: {', '.join(sorted(unknown))}, "
+                f"доступны: {', '.join(parameters)}"
+            )
+        return self
 
     @property
     def order_intensity(self):
@@ -25,110 +114,160 @@ class SimulationParams(BaseModel):
 
 
 class Simulation:
-    def __init__(self, params : SimulationParams, medicines_data, customers_data):
+    """
+    Все случайные величины берутся из генераторов самой симуляции:
+    отдельные потоки для спроса, случайных клиентов и сроков поставки,
+    порождённые из одного `SeedSequence`.
+
+    Справочники передаются скомпилированным сценарием (`Scenario`, тогда `customers_data` не нужен)
+    либо таблицами или строками CSV, из которых сценарий компилируется.
+
+    Итоги прогона всегда копятся в `totals`. Подробная статистика по дням (`statistics`)
+    и история склада хранятся для всех дней (`history=None`), для последних `history` дней
+    или не хранятся вовсе (`history=0`); `sample_every` оставляет в обеих каждый k-й день.
+    `profiler` замеряет время этапов каждого дня (см. `business.profiling`).
+    """
+    def __init__(
+        self,
+        params : SimulationParams,
+        medicines_data,
+        customers_data = None,
+        seed : int | np.random.SeedSequence | None = None,
+        history : int | None = None,
+        sample_every : int = 1,
+        profiler : NullProfiler | None = None,
+    ):
         self.params = params
+        self.history = history
+        self.sample_every = sample_every
 
-        self.warehouse, self._medicines_by_name = self.parse_medicines(medicines_data)
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        demand_seed, customers_seed, supply_seed = self.seed_sequence.spawn(3)
+        self.demand_rng = np.random.default_rng(demand_seed)
+        self.customers_rng = np.random.default_rng(customers_seed)
+        self.supply_rng = np.random.default_rng(supply_seed)
+
+        self.scenario = (
+            medicines_data if isinstance(medicines_data, Scenario)
+            else Scenario.compile(medicines_data, customers_data)
+        )
+        self.warehouse, self.catalog = self.build_warehouse(self.scenario)
         self.pharmacy = Pharmacy(
             warehouse = self.warehouse,
             paymaster = PayMaster(retail_margin=params.retail_margin),
-            regular_customers = self.parse_customers(customers_data),
+            regular_customers = self.scenario.build_customers(),
             couriers = params.couriers,
+            history = WarehouseHistory() if history != 0 else None,
+            dispatch = POLICIES[params.dispatch](),
+            sample_every = sample_every,
+        )
+        self.warehouse.reorder = REORDER_POLICIES[params.reorder](
+            self.catalog, self.pharmacy.regular_customers, **params.reorder_params
         )
 
-        self.statistics: list[PharmacyDayStatistics] = []
+        self.profiler = profiler
+
+        self.statistics: list[PharmacyDayStatistics] | deque[PharmacyDayStatistics] = (
+            [] if history is None else deque(maxlen=history)
+        )
+        self.totals = SimulationTotals(len(self.catalog), params.couriers)
         self.current_day = 1
+        self.stopped_by: StopCondition | None = None
 
-    def generate_order(self):
-        medicines = self.pharmacy.warehouse.medicines
-        num_items = random.randint(1, 5)
+    def generate_orders(self):
+        warehouse = self.pharmacy.warehouse
+        rng = self.demand_rng
+        num_orders = rng.poisson(self.params.order_intensity)
+        if num_orders == 0 or not len(warehouse.catalog):
+            return []
 
-        weights = [2.0 if wm.has_discounted else 1.0 for wm in medicines.values()]
-        total = sum(weights)
-        probs = [w / total for w in weights]
+        weights = np.where(warehouse.discounted(), 2.0, 1.0)
+        num_items = np.minimum(rng.integers(1, 6, size=num_orders), len(warehouse.catalog))
 
-        order_medicines = np.random.choice(list(medicines.keys()), size=num_items, p=probs, replace=False)
-        medicines_amount = {
-            med : random.randint(1, 5)
-            for med in order_medicines
-        }
+        order_medicines, offsets = choice_without_replacement(weights / weights.sum(), num_items, rng)
+        quantities = rng.integers(1, 6, size=order_medicines.size)
 
-        return Order(
-            Customer.generate_customer(),
-            medicines_amount,
-            OrderType.RANDOM
-        )
+        order_medicines = order_medicines.tolist()
+        quantities = quantities.tolist()
+        offsets = offsets.tolist()
 
-    def generate_orders(self):
-        num_orders = np.random.poisson(self.params.order_intensity)
-        orders = [
-            self.generate_order()
-            for _ in range(num_orders)
+        return [
+            Order(
+                CustomerRecord.generate(self.customers_rng),
+                dict(zip(order_medicines[start:end], quantities[start:end])),
+                OrderType.RANDOM
+            )
+            for start, end in zip(offsets, offsets[1:])
         ]
-        return orders
 
+    @property
+    def profiler(self) -> NullProfiler:
+        """
+        Замер этапов дня: `Profiler` включает его, `None` — выключает.
+        """
+        return self.pharmacy.profiler
+
+    @profiler.setter
+    def profiler(self, profiler : NullProfiler | None):
+        self.pharmacy.profiler = profiler or NULL_PROFILER
+
+    def next_day(self) -> PharmacyDayStatistics:
+        profiler = self.pharmacy.profiler
+        profiler.set_day(self.current_day)
+        with profiler.phase('next_day'):
+            with profiler.phase('generate_orders'):
+                orders = self.generate_orders()
+            with profiler.phase('process_day'):
+                statistics = self.pharmacy.process_day(self.current_day, orders)
+            with profiler.phase('totals'):
+                self.totals.add(statistics, self.warehouse.day_sales)
+
+            if self.history != 0 and self.current_day % self.sample_every == 0:
+                self.statistics.append(statistics)
+                if self.history is not None:
+                    self.pharmacy.history.forget_before(self.statistics[0].day)
 
-    def next_day(self):
-        orders = self.generate_orders()
-        self.statistics.append(
-            self.pharmacy.process_day(self.current_day, orders)
-        )
         self.current_day += 1
+        return statistics
+
+    def iter_days(self, *stop_conditions : StopCondition):
+        """
+        Моделирует оставшиеся дни по одному, отдавая статистику каждого дня.
+        Останавливается раньше срока, если выполнено любое из условий (оно сохраняется в `stopped_by`).
+        """
+        self.stopped_by = None
+        for condition in stop_conditions:
+            condition.start(self)
 
-    def complete(self):
         while not self.is_complete:
-            self.next_day()
+            statistics = self.next_day()
+            yield statistics
 
-    def run(self):
-        for day in range(1, self.params.days + 1):
-            self.next_day()
+            for condition in stop_conditions:
+                if condition(self, statistics):
+                    self.stopped_by = condition
+                    return
 
+    def complete(self, *stop_conditions : StopCondition):
+        for _ in self.iter_days(*stop_conditions):
+            pass
+
+    def run(self, *stop_conditions : StopCondition):
+        self.complete(*stop_conditions)
         return self.statistics
 
-    def parse_customers(self, customers_data: list[list]) -> list[Customer]:
-        customers = []
-        for row in customers_data:
-            med_cnts = [
-                med.split(':')
-                for med in row[4].split(', ')
-            ]
-
-            meds = {
-                self._medicines_by_name[name]: int(cnt)
-                for name, cnt in med_cnts
-            }
-
-            c = Customer(
-                name = row[0],
-                phone = row[1],
-                address = row[2],
-                discount_card = row[3] == 'Да',
-                regular_medicines = meds,
-                regularity = int(row[5]),
-            )
-            customers.append(c)
-        return customers
-
-    def parse_medicines(self, medicines_data: list[list]) -> Warehouse:
-        medicines = {}
-        medicines_by_name = {}
-        for row in medicines_data:
-            count = int(row[1])
-            m = Medicine(
-                name = row[0],
-                dosage = row[2],
-                type = MedicineType(row[3]),
-                expiration_days = int(row[4]),
-                wholesale = float(row[5]),
-                group = MedicineGroup(row[6]),
-                purchase_quantity = int(row[7]),
-                min_quantity = int(row[8]),
-            )
-            medicines[m] = count
-            medicines_by_name[m.name] = m
+    def checkpoint(self, extra : dict | None = None) -> bytes:
+        with self.profiler.phase('checkpoint'):
+            return dump_checkpoint(self, extra)
+
+    def restore(self, data : bytes) -> dict:
+        return restore_checkpoint(self, data)
 
-        warehouse = Warehouse(medicines)
-        return warehouse, medicines_by_name
+    def build_warehouse(self, scenario : Scenario) -> tuple[Warehouse | ArrayWarehouse, MedicineCatalog]:
+        catalog, counts = scenario.build_catalog()
+        warehouse_class = ArrayWarehouse if self.params.array_inventory else Warehouse
+        warehouse = warehouse_class(catalog, counts, self.supply_rng)
+        return warehouse, catalog
 
     @property
     def is_complete(self):
@@ -0,0 +1,59 @@
+from .pharmacy import PharmacyDayStatistics
+
+
+class StopCondition:
+    """
+    Условие досрочной остановки `Simulation.iter_days`: проверяется после каждого дня.
+    Перед первым днём `iter_days` вызывает `start`, чтобы условие сбросило своё состояние.
+    """
+    def start(self, sim):
+        pass
+
+    def __call__(self, sim, statistics : PharmacyDayStatistics) -> bool:
+        raise NotImplementedError
+
+
+class LossesAbove(StopCondition):
+    def __init__(self, threshold : float):
+        self.threshold = threshold
+
+    def __call__(self, sim, statistics : PharmacyDayStatistics) -> bool:
+        return sim.totals.losses.total > self.threshold
+
+
+class FillRateBelow(StopCondition):
+    """
+    Доля выполненных единиц товара ниже `rate` `days` дней подряд.
+    """
+    def __init__(self, rate : float, days : int = 1):
+        self.rate = rate
+        self.days = days
+        self._streak = 0
+
+    def start(self, sim):
+        self._streak = 0
+
+    def __call__(self, sim, statistics : PharmacyDayStatistics) -> bool:
+        requested = statistics.requested_units
+        fill_rate = statistics.filled_units / requested if requested else 1.0
+
+        self._streak = self._streak + 1 if fill_rate < self.rate else 0
+        return self._streak >= self.days
+
+
+class ConfidenceReached(StopCondition):
+    """
+    Полуширина доверительного интервала для среднего дневного значения метрики
+    не превышает `relative_width` от самого среднего.
+    """
+    def __init__(self, metric : str = 'profit', relative_width : float = 0.05, confidence : float = 0.95, min_days : int = 30):
+        self.metric = metric
+        self.relative_width = relative_width
+        self.confidence = confidence
+        self.min_days = min_days
+
+    def __call__(self, sim, statistics : PharmacyDayStatistics) -> bool:
+        stat = getattr(sim.totals, self.metric)
+        if stat.count < self.min_days or stat.mean == 0:
+            return False
+        return stat.half_width(self.confidence) <= self.relative_width * abs(stat.mean)
@@ -0,0 +1,140 @@
+import csv
+import hashlib
+import itertools
+import json
+import os
+import numpy as np
+
+from pathlib import Path
+
+from .replication import ReplicationResult, replication_seeds, run_tasks
+from .scenario import Scenario
+from .simulation import SimulationParams
+
+
+def catalog_hash(medicines_data, customers_data) -> str:
+    if not isinstance(medicines_data, Scenario):
+        medicines_data = Scenario.compile(medicines_data, customers_data)
+    return medicines_data.digest
+
+
+class SweepCache:
+    """
+    Дисковый кеш результатов прогонов: один файл `.npy` на точку сетки
+    (`samples[replication, day, metric]`), ключ — параметры, хеш справочников и зерно.
+    """
+    def __init__(self, path : str | os.PathLike):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(params : SimulationParams, catalog : str, seed : int) -> str:
+        payload = json.dumps(
+            {'params': params.model_dump(mode='json'), 'catalog': catalog, 'seed': seed},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key : str) -> np.ndarray | None:
+        file = self.path / f'{key}.npy'
+        if not file.exists():
+            return None
+        return np.load(file)
+
+    def put(self, key : str, samples : np.ndarray):
+        tmp = self.path / f'{key}.tmp.npy'
+        np.save(tmp, samples)
+        os.replace(tmp, self.path / f'{key}.npy')
+
+
+class SweepResult:
+    """
+    Итоги за горизонт по каждой точке сетки: среднее, СКО и доверительный интервал
+    по прогонам для каждой метрики.
+    """
+    def __init__(self, names : list[str], points : list[tuple], samples : list[np.ndarray], confidence : float):
+        self.names = names
+        self.points = points
+        self.samples = dict(zip(points, samples))
+        self.confidence = confidence
+
+    def totals(self, point : tuple) -> np.ndarray:
+        return self.samples[point].sum(axis=1)
+
+    def rows(self) -> list[dict]:
+        rows = []
+        for point in self.points:
+            summary = ReplicationResult(self.totals(point)[:, None, :], self.confidence)
+
+            row = dict(zip(self.names, point))
+            row['replications'] = summary.replications
+            row.update(summary.to_rows()[0])
+            del row['day']
+            rows.append(row)
+        return rows
+
+    def to_csv(self, filename : str | os.PathLike):
+        rows = self.rows()
+        with open(filename, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else self.names)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def sweep(
+    base_params : SimulationParams,
+    grid : dict[str, list],
+    medicines_data,
+    customers_data,
+    replications : int = 10,
+    seed : int = 0,
+    cache_dir : str | os.PathLike | None = None,
+    workers : int | None = None,
+    confidence : float = 0.95,
+) -> SweepResult:
+    """
+    Прогоняет все комбинации значений `grid` (имя поля `SimulationParams` -> список значений).
+    Во всех точках используются одни и те же зёрна прогонов (общие случайные числа),
+    поэтому уже посчитанные прогоны берутся из кеша, а считаются только недостающие.
+    """
+    names = list(grid)
+    points = list(itertools.product(*(grid[name] for name in names)))
+    params = [base_params.model_copy(update=dict(zip(names, point))) for point in points]
+
+    if not isinstance(medicines_data, Scenario):
+        medicines_data, customers_data = Scenario.compile(medicines_data, customers_data), None
+
+    cache = SweepCache(cache_dir) if cache_dir is not None else None
+    catalog = catalog_hash(medicines_data, customers_data)
+    seeds = replication_seeds(seed, replications)
+
+    cached: list[np.ndarray | None] = []
+    tasks = []
+    task_points = []
+    for idx, point_params in enumerate(params):
+        samples = cache.get(cache.key(point_params, catalog, seed)) if cache else None
+
+        done = 0 if samples is None else samples.shape[0]
+        cached.append(samples)
+        for replication in range(done, replications):
+            tasks.append((point_params, seeds[replication]))
+            task_points.append(idx)
+
+    computed = run_tasks(tasks, medicines_data, customers_data, workers) if tasks else []
+
+    new_samples: dict[int, list[np.ndarray]] = {}
+    for idx, result in zip(task_points, computed):
+        new_samples.setdefault(idx, []).append(result)
+
+    results = []
+    for idx, point_params in enumerate(params):
+        parts = [cached[idx]] if cached[idx] is not None else []
+        if idx in new_samples:
+            parts.append(np.stack(new_samples[idx]))
+
+        samples = np.concatenate(parts)
+        if cache and idx in new_samples:
+            cache.put(cache.key(point_params, catalog, seed), samples)
+        results.append(samples[:replications])
+
+    return SweepResult(names, points, results, confidence)
@@ -0,0 +1,417 @@
+"""
+Справочники сценария (лекарства и постоянные клиенты) в виде столбцов.
+
+Строки CSV разбираются сразу в типизированные массивы: столбец целиком переводится
+в числа средствами numpy, и только если это не удалось, значения проверяются по одному,
+чтобы найти ошибочные строки. Такие строки пропускаются и возвращаются списком `RowError`.
+"""
+import csv
+import os
+import numpy as np
+
+from pydantic import BaseModel
+from typing import Iterable, Self
+
+from .medicine import MedicineGroup, MedicineType
+
+
+class RowError(BaseModel):
+    row     : int
+    column  : str
+    value   : str
+    message : str
+
+    def __str__(self):
+        return f'Строка {self.row + 1}, «{self.column}»: {self.message} ({self.value!r})'
+
+
+class CatalogImportError(ValueError):
+    def __init__(self, errors : list[RowError]):
+        self.errors = errors
+        shown = '\n'.join(map(str, errors[:10]))
+        more = f'\n... и ещё {len(errors) - 10}' if len(errors) > 10 else ''
+        super().__init__(f'Ошибки в данных:\n{shown}{more}')
+
+
+class TextColumn:
+    message = 'пустое значение'
+
+    def __init__(self, title : str, required : bool = True):
+        self.title = title
+        self.required = required
+
+    def empty(self, size : int = 0) -> list[str]:
+        return [''] * size
+
+    def parse_many(self, values : list[str]) -> tuple[list[str], np.ndarray]:
+        bad = np.array([not value for value in values], dtype=bool) if self.required else np.zeros(len(values), dtype=bool)
+        return values, bad
+
+    def parse(self, value : str) -> str:
+        if self.required and not value:
+            raise ValueError(self.message)
+        return value
+
+    def invalid(self, column : list[str]) -> np.ndarray:
+        return self.parse_many(column)[1]
+
+    def format(self, value) -> str:
+        return value
+
+
+class NumberColumn:
+    def __init__(self, title : str, dtype : type = int, minimum : float = 0):
+        self.title = title
+        self.dtype = np.int64 if dtype is int else np.float64
+        self.convert = dtype
+        self.minimum = minimum
+        kind = 'целое число' if dtype is int else 'число'
+        self.message = f'ожидается {kind} не меньше {minimum}'
+
+    def empty(self, size : int = 0) -> np.ndarray:
+        return np.zeros(size, dtype=self.dtype)
+
+    def parse_many(self, values : list[str]) -> tuple[np.ndarray, np.ndarray]:
+        try:
+            array = np.array(values, dtype=str).astype(self.dtype) if values else self.empty()
+            bad = np.zeros(len(values), dtype=bool)
+        except (ValueError, OverflowError):
+            array = self.empty(len(values))
+            bad = np.zeros(len(values), dtype=bool)
+            for idx, value in enumerate(values):
+                try:
+                    array[idx] = self.convert(value)
+                except (ValueError, OverflowError):
+                    bad[idx] = True
+
+        bad |= ~np.isfinite(array) | (array < self.minimum)
+        return array, bad
+
+    def parse(self, value : str):
+        array, bad = self.parse_many([value])
+        if bad[0]:
+            raise ValueError(self.message)
+        return array[0]
+
+    def invalid(self, column : np.ndarray) -> np.ndarray:
+        return ~np.isfinite(column) | (column < self.minimum)
+
+    def format(self, value) -> str:
+        return str(self.convert(value))
+
+
+class ChoiceColumn:
+    """
+    Значение из фиксированного списка, хранится кодом (индексом в `choices`).
+    """
+    def __init__(self, title : str, choices : list[str]):
+        self.title = title
+        self.choices = choices
+        self.codes = {choice: code for code, choice in enumerate(choices)}
+        self.message = 'ожидается одно из: ' + ', '.join(choices)
+
+    def empty(self, size : int = 0) -> np.ndarray:
+        return np.zeros(size, dtype=np.int8)
+
+    def parse_many(self, values : list[str]) -> tuple[np.ndarray, np.ndarray]:
+        codes = np.array([self.codes.get(value, -1) for value in values], dtype=np.int8)
+        bad = codes < 0
+        codes[bad] = 0
+        return codes, bad
+
+    def parse(self, value : str) -> int:
+        if value not in self.codes:
+            raise ValueError(self.message)
+        return self.codes[value]
+
+    def invalid(self, column : np.ndarray) -> np.ndarray:
+        return (column < 0) | (column >= len(self.choices))
+
+    def format(self, value) -> str:
+        return self.choices[value]
+
+
+class ColumnarTable:
+    """
+    Общая часть справочников: столбцы по спецификациям `COLUMNS`,
+    разбор строк с ошибками по строкам, чтение и правка отдельных ячеек.
+    """
+    COLUMNS: list = []
+
+    def __init__(self, columns : list | None = None):
+        self.columns = columns if columns is not None else [spec.empty() for spec in self.COLUMNS]
+
+    @classmethod
+    def headers(cls) -> list[str]:
+        return [spec.title for spec in cls.COLUMNS]
+
+    @classmethod
+    def from_rows(cls, rows : Iterable, strict : bool = False) -> tuple[Self, list[RowError]]:
+        """
+        Разбирает строки (списки значений в порядке `COLUMNS`). Строки с ошибками
+        не попадают в таблицу; при `strict=True` вместо этого бросается `CatalogImportError`.
+        """
+        width = len(cls.COLUMNS)
+        texts = [
+            [str(cell).strip() for cell in row[:width]] + [''] * (width - len(row))
+            for row in rows
+        ]
+        values = [list(column) for column in zip(*texts)] or [[] for _ in range(width)]
+
+        table = cls()
+        parsed, bad_masks, errors = table._parse_columns(values)
+
+        bad = np.zeros(len(texts), dtype=bool)
+        for mask in bad_masks:
+            bad |= mask
+        if strict and errors:
+            raise CatalogImportError(errors)
+
+        keep = np.flatnonzero(~bad)
+        table._set_parsed(parsed, keep)
+        return table, errors
+
+    @classmethod
+    def read_csv(cls, filename : str | os.PathLike, strict : bool = False) -> tuple[Self, list[RowError]]:
+        with open(filename, 'r', encoding='utf-8', newline='') as f:
+            rows = (row for row in csv.reader(f) if any(cell.strip() for cell in row))
+            return cls.from_rows(rows, strict)
+
+    def _parse_columns(self, values : list[list[str]]) -> tuple[list, list[np.ndarray], list[RowError]]:
+        parsed = []
+        bad_masks = []
+        errors = []
+        for spec, column in zip(self.COLUMNS, values):
+            array, bad = spec.parse_many(column)
+            parsed.append(array)
+            bad_masks.append(bad)
+            errors.extend(
+                RowError(row=row, column=spec.title, value=column[row], message=spec.message)
+                for row in np.flatnonzero(bad).tolist()
+            )
+        errors.sort(key=lambda error: error.row)
+        return parsed, bad_masks, errors
+
+    def _set_parsed(self, parsed : list, keep : np.ndarray):
+        self.columns = [self._take(array, keep) for array in parsed]
+
+    @staticmethod
+    def _take(column, rows : np.ndarray):
+        if column is None:
+            return None
+        if isinstance(column, list):
+            return [column[idx] for idx in rows.tolist()]
+        return column[rows]
+
+    def validate(self) -> list[RowError]:
+        """
+        Проверка уже разобранных значений — например, после добавления пустых строк в интерфейсе.
+        """
+        errors = [
+            RowError(row=row, column=spec.title, value=self.cell(row, col), message=spec.message)
+            for col, spec in enumerate(self.COLUMNS)
+            for row in np.flatnonzero(self._invalid(col)).tolist()
+        ]
+        errors.sort(key=lambda error: error.row)
+        return errors
+
+    def _invalid(self, col : int) -> np.ndarray:
+        return self.COLUMNS[col].invalid(self.columns[col])
+
+    def write_csv(self, filename : str | os.PathLike):
+        with open(filename, 'w', encoding='utf-8', newline='') as f:
+            csv.writer(f).writerows(self.to_rows())
+
+    def to_rows(self) -> list[list[str]]:
+        return [
+            [self.cell(row, col) for col in range(len(self.COLUMNS))]
+            for row in range(len(self))
+        ]
+
+    def cell(self, row : int, col : int) -> str:
+        return self.COLUMNS[col].format(self.columns[col][row])
+
+    def set_cell(self, row : int, col : int, text : str):
+        self.columns[col][row] = self.COLUMNS[col].parse(text.strip())
+
+    def insert_rows(self, row : int, count : int = 1):
+        self.columns = [
+            column if column is None
+            else column[:row] + spec.empty(count) + column[row:] if isinstance(column, list)
+            else np.insert(column, row, spec.empty(count))
+            for spec, column in zip(self.COLUMNS, self.columns)
+        ]
+
+    def remove_rows(self, row : int, count : int = 1):
+        self.columns = [
+            column if column is None
+            else column[:row] + column[row + count:] if isinstance(column, list)
+            else np.delete(column, np.s_[row:row + count])
+            for column in self.columns
+        ]
+
+    def __len__(self) -> int:
+        return len(self.columns[0])
+
+
+MEDICINE_TYPES = list(MedicineType)
+MEDICINE_GROUPS = list(MedicineGroup)
+
+
+class MedicineTable(ColumnarTable):
+    COLUMNS = [
+        TextColumn('Название'),
+        NumberColumn('Количество'),
+        NumberColumn('Дозировка'),
+        ChoiceColumn('Тип', [t.value for t in MEDICINE_TYPES]),
+        NumberColumn('Срок годности', minimum=1),
+        NumberColumn('Оптовая цена', float),
+        ChoiceColumn('Группа', [g.value for g in MEDICINE_GROUPS]),
+        NumberColumn('Закупочное количество'),
+        NumberColumn('Минимальное количество'),
+    ]
+
+    @property
+    def names(self) -> list[str]:
+        return self.columns[0]
+
+
+class OrdersColumn:
+    """
+    Регулярный заказ вида 'Лекарство 6:3, Лекарство 15:4'. Хранится в сжатом виде:
+    названия лекарств — индексами в словаре `names`, позиции клиента — отрезком `offsets`.
+    """
+    message = "ожидается список 'название:количество' через запятую"
+
+    def __init__(self, title : str):
+        self.title = title
+
+    def empty(self, size : int = 0) -> list[tuple]:
+        return [()] * size
+
+    @staticmethod
+    def split(value : str) -> tuple[tuple[str, int], ...]:
+        items = []
+        for item in value.split(','):
+            name, _, count = item.strip().rpartition(':')
+            if not name or int(count) < 1:
+                raise ValueError(OrdersColumn.message)
+            items.append((name.strip(), int(count)))
+        return tuple(items)
+
+    def parse_many(self, values : list[str]) -> tuple[list[tuple], np.ndarray]:
+        parsed = []
+        bad = np.zeros(len(values), dtype=bool)
+        for idx, value in enumerate(values):
+            try:
+                parsed.append(self.split(value))
+            except ValueError:
+                parsed.append(())
+                bad[idx] = True
+        return parsed, bad
+
+    def parse(self, value : str) -> tuple:
+        return self.split(value)
+
+    def format(self, value) -> str:
+        return ', '.join(f'{name}:{count}' for name, count in value)
+
+
+class CustomerTable(ColumnarTable):
+    """
+    Постоянные клиенты. Позиции регулярных заказов хранятся не в `columns`, а плоскими массивами
+    (`order_names`, `order_counts`, границы клиентов — `order_offsets`).
+    """
+    COLUMNS = [
+        TextColumn('Имя'),
+        TextColumn('Телефон', required=False),
+        TextColumn('Адрес', required=False),
+        ChoiceColumn('Дисконтная карта', ['Нет', 'Да']),
+        OrdersColumn('Регулярные заказы'),
+        NumberColumn('Периодичность', minimum=1),
+    ]
+    ORDERS = 4
+
+    def __init__(self, columns : list | None = None):
+        super().__init__(columns)
+        self.names: list[str] = []
+        self.order_offsets = np.zeros(1, dtype=np.int64)
+        self.order_names = np.zeros(0, dtype=np.int64)
+        self.order_counts = np.zeros(0, dtype=np.int64)
+        self.columns[self.ORDERS] = None
+
+    def _set_parsed(self, parsed : list, keep : np.ndarray):
+        orders = self._take(parsed[self.ORDERS], keep)
+        parsed[self.ORDERS] = None
+        super()._set_parsed(parsed, keep)
+        self._set_orders(orders)
+
+    def _set_orders(self, orders : list[tuple]):
+        ids: dict[str, int] = {}
+        names = []
+        counts = []
+        sizes = []
+        for items in orders:
+            sizes.append(len(items))
+            for name, count in items:
+                names.append(ids.setdefault(name, len(ids)))
+                counts.append(count)
+
+        self.names = list(ids)
+        self.order_offsets = np.zeros(len(orders) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=self.order_offsets[1:])
+        self.order_names = np.array(names, dtype=np.int64)
+        self.order_counts = np.array(counts, dtype=np.int64)
+
+    def _invalid(self, col : int) -> np.ndarray:
+        if col == self.ORDERS:
+            return np.diff(self.order_offsets) == 0
+        return super()._invalid(col)
+
+    def unknown_medicines(self, medicine_names : Iterable[str]) -> list[RowError]:
+        """
+        Позиции регулярных заказов с лекарствами, которых нет среди `medicine_names`.
+        """
+        known = set(medicine_names)
+        missing = np.array([name not in known for name in self.names], dtype=bool)
+        if not missing.any():
+            return []
+
+        rows = np.repeat(np.arange(len(self)), np.diff(self.order_offsets))
+        return [
+            RowError(row=row, column=self.COLUMNS[self.ORDERS].title, value=self.names[name], message='нет в справочнике лекарств')
+            for row, name in zip(rows.tolist(), self.order_names.tolist())
+            if missing[name]
+        ]
+
+    def _orders(self) -> list[tuple]:
+        return [self.orders(row) for row in range(len(self))]
+
+    def orders(self, row : int) -> tuple[tuple[str, int], ...]:
+        start, end = self.order_offsets[row], self.order_offsets[row + 1]
+        return tuple(
+            (self.names[name], count)
+            for name, count in zip(self.order_names[start:end].tolist(), self.order_counts[start:end].tolist())
+        )
+
+    def cell(self, row : int, col : int) -> str:
+        if col == self.ORDERS:
+            return self.COLUMNS[col].format(self.orders(row))
+        return super().cell(row, col)
+
+    def set_cell(self, row : int, col : int, text : str):
+        if col != self.ORDERS:
+            return super().set_cell(row, col, text)
+        orders = self._orders()
+        orders[row] = self.COLUMNS[col].parse(text.strip())
+        self._set_orders(orders)
+
+    def insert_rows(self, row : int, count : int = 1):
+        orders = self._orders()
+        super().insert_rows(row, count)
+        self._set_orders(orders[:row] + [()] * count + orders[row:])
+
+    def remove_rows(self, row : int, count : int = 1):
+        orders = self._orders()
+        super().remove_rows(row, count)
+        self._set_orders(orders[:row] + orders[row + count:])
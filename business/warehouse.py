@@ -1,21 +1,58 @@
+import numpy as np
+
+from typing import Self
+
 from .base import IDaily
-from .medicine import Medicine, WarehouseMedicine, WarehouseMedicineOrder
+from .fulfillment import Fulfillment, OrderLines, allocate
+from .medicine import ExpiryCalendar, MedicineCatalog, WarehouseMedicine, WarehouseMedicineOrder
 from .order import Order, OrderStatus
+from .reorder import MAX_LEAD_DAYS, ReorderPolicy
 
 
 class Warehouse(IDaily):
-    def __init__(self, medicines_count : dict[Medicine, int]):
-        self.medicines: dict[Medicine, WarehouseMedicine] = {
-            medicine: WarehouseMedicine(medicine, count)
-            for medicine, count in medicines_count.items()
+    """
+    Склад из объектов `WarehouseMedicine` на общем календаре партий. Конец дня обходит
+    только лекарства с продажами, поступлениями, ожидаемыми закупками или наступившими
+    событиями партий; уценка и списание остальных не требуют работы.
+
+    Закупки решает правило `reorder` (по умолчанию точка заказа из справочника).
+    """
+    def __init__(self, catalog : MedicineCatalog, counts : list[int], rng : np.random.Generator | None = None):
+        self.catalog = catalog
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.calendar = ExpiryCalendar()
+        self._set_medicines([
+            WarehouseMedicine(medicine, count, self.calendar)
+            for medicine, count in zip(catalog, counts)
+        ])
+        self.reorder = ReorderPolicy(catalog)
+        self.day_sales = np.zeros(len(catalog), dtype=np.int64)
+        self.day_requested = np.zeros(len(catalog), dtype=np.int64)
+        self.day_losses = np.zeros(len(catalog))
+        # закупки заказывает сеть через `purchase_requests` и `receive`, а не сам склад
+        self.external_supply = False
+
+    def _set_medicines(self, medicines : list[WarehouseMedicine]):
+        self.medicines = medicines
+        self._awaiting = {
+            medicine_id
+            for medicine_id, warehouse_medicine in enumerate(medicines)
+            if warehouse_medicine.awaiting_batch
         }
+        self._discounted = np.array([wm.has_discounted() for wm in medicines], dtype=bool)
+        self.calendar.touched.update(range(len(medicines)))
+
+    def discounted(self) -> np.ndarray:
+        return self._discounted.copy()
 
     def process_order(self, order : Order):
         preliminary_reciept = WarehouseMedicineOrder()
 
         order.status = OrderStatus.DELIVERED
-        for medicine, cnt in order.requested_medicines.items():
-            med_bill = self.medicines[medicine].sell(cnt)
+        for medicine_id, cnt in order.requested_medicines.items():
+            med_bill = self.medicines[medicine_id].sell(cnt)
+            self.day_sales[medicine_id] += med_bill.count
+            self.day_requested[medicine_id] += cnt
 
             preliminary_reciept.count += med_bill.count
             preliminary_reciept.cost += med_bill.cost
@@ -28,23 +65,129 @@ class Warehouse(IDaily):
 
         order.set_preliminary_reciept(preliminary_reciept)
 
+    def process_orders(self, orders : list[Order]) -> Fulfillment:
+        """
+        Обрабатывает заказы дня одним проходом; результат тот же, что у `process_order`
+        для каждого заказа по порядку.
+        """
+        lines = OrderLines(orders)
+        touched = np.unique(lines.medicine).tolist()
+        batches, batch_medicine, available, price, multiplier = [], [], [], [], []
+        for medicine_id in touched:
+            warehouse_medicine = self.medicines[medicine_id]
+            wholesale = warehouse_medicine.medicine.wholesale
+            for batch in warehouse_medicine.batches:
+                batches.append(batch)
+                batch_medicine.append(medicine_id)
+                available.append(0 if batch.is_expired else batch.count)
+                price.append(wholesale)
+                multiplier.append(0.5 if batch.is_discounted else 1)
+
+        batch_medicine = np.array(batch_medicine, dtype=np.int64)
+        line_filled, line_cost, batch_sold = allocate(
+            lines.medicine,
+            lines.count,
+            batch_medicine,
+            np.array(available, dtype=np.int64),
+            np.array(price, dtype=float),
+            np.array(multiplier, dtype=float),
+        )
+
+        for index in np.flatnonzero(batch_sold).tolist():
+            batches[index].count -= int(batch_sold[index])
+        sold = np.bincount(batch_medicine, weights=batch_sold, minlength=len(self.medicines)).astype(np.int64)
+        for medicine_id in touched:
+            self.medicines[medicine_id].count -= int(sold[medicine_id])
+        self.day_sales += sold
+        self.day_requested += np.bincount(lines.medicine, weights=lines.count, minlength=len(self.medicines)).astype(np.int64)
+        self.calendar.touched.update(touched)
+
+        fulfillment = Fulfillment(lines, line_filled, line_cost)
+        fulfillment.apply(orders)
+        return fulfillment
+
     def start_day(self):
-        for _, warehouse_medicine in self.medicines.items():
+        self.day_sales = np.zeros(len(self.catalog), dtype=np.int64)
+        self.day_requested = np.zeros(len(self.catalog), dtype=np.int64)
+        self.day_losses = np.zeros(len(self.catalog))
+        for medicine_id in sorted(self._awaiting):
+            warehouse_medicine = self.medicines[medicine_id]
             warehouse_medicine.start_day()
+            if not warehouse_medicine.awaiting_batch:
+                self._awaiting.discard(medicine_id)
+                self._discounted[medicine_id] = warehouse_medicine.has_discounted()
 
     def end_day(self):
+        changed = self.calendar.advance() | self.calendar.take_touched()
+
+        # по возрастанию номера, как при обходе всего склада: от порядка зависят
+        # сумма списаний и сроки закупок из общего генератора
         losses = 0
-        for _, warehouse_medicine in self.medicines.items():
-            losses += warehouse_medicine.end_day()
+        for medicine_id in sorted(changed | self._awaiting):
+            warehouse_medicine = self.medicines[medicine_id]
+            is_changed = medicine_id in changed
+            medicine_losses = warehouse_medicine.end_day(write_off=is_changed)
+            if is_changed:
+                losses += medicine_losses
+                self.day_losses[medicine_id] = medicine_losses
+                self._discounted[medicine_id] = warehouse_medicine.has_discounted()
+
+        self.reorder.observe(self.day_requested)
+        if not self.external_supply:
+            candidates = sorted(changed) if self.reorder.continuous else range(len(self.medicines))
+            medicine_ids, counts = self._purchase_requests(candidates)
+            for medicine_id, count in zip(medicine_ids.tolist(), counts.tolist()):
+                self.medicines[medicine_id].receive(count, int(self.rng.integers(1, MAX_LEAD_DAYS + 1)))
+                self._awaiting.add(medicine_id)
 
         return losses
 
+    def _purchase_requests(self, candidates) -> tuple[np.ndarray, np.ndarray]:
+        medicine_ids = np.array(
+            [medicine_id for medicine_id in candidates if self.medicines[medicine_id].awaiting_batch is None],
+            dtype=np.int64,
+        )
+        counts = np.array([self.medicines[medicine_id].count for medicine_id in medicine_ids.tolist()], dtype=np.int64)
+        quantities = self.reorder.quantities(medicine_ids, counts)
+        ordered = quantities > 0
+        return medicine_ids[ordered], quantities[ordered]
+
+    def purchase_requests(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Закупки, которые правило `reorder` делает сейчас: лекарства без ожидаемой поставки и объёмы.
+        """
+        return self._purchase_requests(range(len(self.medicines)))
+
+    def receive(self, medicine_ids : np.ndarray, counts : np.ndarray, lead_days : np.ndarray):
+        for medicine_id, count, days in zip(medicine_ids.tolist(), counts.tolist(), lead_days.tolist()):
+            self.medicines[medicine_id].receive(count, days)
+            self._awaiting.add(medicine_id)
+
+    def snapshot(self, day : int) -> list[tuple]:
+        return [
+            warehouse_medicine.snapshot(day)
+            for warehouse_medicine in self.medicines
+        ]
+
+    @classmethod
+    def from_snapshot(cls, catalog : MedicineCatalog, states : list[tuple], day : int) -> Self:
+        warehouse = cls(catalog, [])
+        warehouse.load_snapshot(states, day)
+        return warehouse
+
+    def load_snapshot(self, states : list[tuple], day : int):
+        self.calendar = ExpiryCalendar()
+        self._set_medicines([
+            WarehouseMedicine.from_snapshot(medicine, state, day, self.calendar)
+            for medicine, state in zip(self.catalog, states)
+        ])
+
     def to_table(self):
         rows = []
-        for med, wm in self.medicines.items():
+        for wm in self.medicines:
             rows.append([
-                med.name,
+                wm.medicine.name,
                 wm.count,
-                wm.batches[0].expiration_days if wm.batches else '',
+                wm.batches[0].days_left(self.calendar.day) if wm.batches else '',
             ])
         return rows
@@ -1,9 +1,6 @@
-import csv
-from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import (
     QWidget,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QVBoxLayout,
     QHBoxLayout,
     QPushButton,
@@ -11,23 +8,28 @@ from PyQt5.QtWidgets import (
     QSpinBox,
     QFileDialog,
     QHeaderView,
+    QMessageBox,
 )
 
+from .models import CatalogTableModel
+from ..business.tables import CatalogImportError
+
 
 class ConfigTab(QWidget):
-    def __init__(self, columns, headers, generate_callback=None):
+    def __init__(self, table_class, generate_callback=None):
         super().__init__()
-        self.columns = columns
-        self.headers = headers
+        self.table_class = table_class
         self.generate_callback = generate_callback
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(columns)
-        self.table.setHorizontalHeaderLabels(headers)
+        self.model = CatalogTableModel(table_class(), self)
+        self.model.edit_failed.connect(self._show_status)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
 
         self.rows_spin = QSpinBox()
-        self.rows_spin.setRange(1, 100)
+        self.rows_spin.setRange(1, 1_000_000)
         self.rows_spin.setValue(20)
 
         self.add_btn = QPushButton("＋")
@@ -36,11 +38,14 @@ class ConfigTab(QWidget):
         self.save_btn = QPushButton("💾")
         self.generate_btn = QPushButton("🎲")
 
+        self.status_label = QLabel()
+
         control_layout = QHBoxLayout()
         control_layout.addWidget(QLabel("Строк:"))
         control_layout.addWidget(self.rows_spin)
         control_layout.addWidget(self.add_btn)
         control_layout.addWidget(self.del_btn)
+        control_layout.addWidget(self.status_label)
         control_layout.addStretch()
         control_layout.addWidget(self.load_btn)
         control_layout.addWidget(self.save_btn)
@@ -57,61 +62,39 @@ class ConfigTab(QWidget):
         self.save_btn.clicked.connect(self.save_csv)
         self.generate_btn.clicked.connect(self.generate_data)
 
-        self._setup_validators()
-
     def add_row(self):
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-        for col in range(self.columns):
-            self.table.setItem(row, col, QTableWidgetItem(""))
+        self.model.insertRows(self.model.rowCount(), 1)
 
     def delete_row(self):
-        if (row := self.table.currentRow()) >= 0:
-            self.table.removeRow(row)
+        if (row := self.table.currentIndex().row()) >= 0:
+            self.model.removeRows(row, 1)
 
     def load_csv(self):
         if filename := self._get_file_open():
-            with open(filename, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                self.table.setRowCount(0)
-                for row_idx, row in enumerate(reader):
-                    self.table.insertRow(row_idx)
-                    for col in range(min(self.columns, len(row))):
-                        self.table.setItem(row_idx, col, QTableWidgetItem(row[col].strip()))
+            table, errors = self.table_class.read_csv(filename)
+            self.model.set_table(table)
+            self._show_status(f'Загружено строк: {len(table)}, с ошибками: {len(errors)}')
+            if errors:
+                QMessageBox.warning(self, "Ошибки в файле", str(CatalogImportError(errors)))
 
     def save_csv(self):
         if filename := self._get_file_save():
-            with open(filename, 'w', encoding='utf-8', newline='') as f:
-                writer = csv.writer(f)
-                for row in range(self.table.rowCount()):
-                    writer.writerow([
-                        self.table.item(row, col).text().strip()
-                        if self.table.item(row, col) else ""
-                        for col in range(self.columns)
-                    ])
+            self.model.table.write_csv(filename)
 
     def generate_data(self):
         if self.generate_callback:
-            self.generate_callback(self.table, self.rows_spin.value())
+            table, _ = self.table_class.from_rows(self.generate_callback(self.rows_spin.value()))
+            self.model.set_table(table)
+            self._show_status('')
 
     def get_data(self):
-        return [
-            [self.table.item(row, col).text().strip()
-             if self.table.item(row, col) else ""
-             for col in range(self.columns)]
-            for row in range(self.table.rowCount())
-        ]
+        return self.model.table
+
+    def _show_status(self, text : str):
+        self.status_label.setText(text)
 
     def _get_file_open(self):
         return QFileDialog.getOpenFileName(self, "Открыть CSV", "", "CSV Files (*.csv)")[0]
 
     def _get_file_save(self):
         return QFileDialog.getSaveFileName(self, "Сохранить CSV", "", "CSV Files (*.csv)")[0]
-
-    def _setup_validators(self):
-        numeric_columns = [1, 4, 7, 8]
-        for col in numeric_columns:
-            for row in range(self.table.rowCount()):
-                item = self.table.item(row, col)
-                if item:
-                    item.setData(Qt.EditRole, int(item.text()) if item.text() else 0)
@@ -2,12 +2,12 @@ from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtWidgets import (
     QWidget,
     QTabWidget,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QVBoxLayout,
     QSplitter,
 )
 
+from .models import DaysModel, OrdersModel, WarehouseModel
 from ..business import PharmacyDayStatistics
 
 
@@ -18,13 +18,11 @@ class DayDetailsTab(QWidget):
         super().__init__(parent)
         self.splitter = QSplitter(Qt.Horizontal)
 
-        self.days_table = QTableWidget()
-        self.days_table.setColumnCount(5)
-        self.days_table.setHorizontalHeaderLabels([
-            'День', 'Доход', 'Прибыль', 'Потери', 'Маржинальность'
-        ])
-        self.days_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.days_table.itemSelectionChanged.connect(self._on_day_selected)
+        self.days_model = DaysModel(self)
+        self.days_table = self._create_view(self.days_model)
+        self.days_table.setSelectionBehavior(QTableView.SelectRows)
+        self.days_table.setSelectionMode(QTableView.SingleSelection)
+        self.days_table.selectionModel().currentRowChanged.connect(self._on_day_selected)
 
         self.details_tabs = QTabWidget()
         self._init_tables()
@@ -37,74 +35,35 @@ class DayDetailsTab(QWidget):
         layout.addWidget(self.splitter)
         self.setLayout(layout)
 
+    @staticmethod
+    def _create_view(model) -> QTableView:
+        view = QTableView()
+        view.setModel(model)
+        view.setEditTriggers(QTableView.NoEditTriggers)
+        view.setSortingEnabled(True)
+        view.sortByColumn(0, Qt.AscendingOrder)
+        view.verticalHeader().setDefaultSectionSize(view.fontMetrics().height() + 8)
+        return view
+
     def _init_tables(self):
-        self.orders_table = QTableWidget()
-        self.orders_table.setColumnCount(6)
-        self.orders_table.setHorizontalHeaderLabels([
-            'Клиент', 'Адрес', 'Тип', 'Статус', 'Сумма', 'Товары',
-        ])
+        self.orders_model = OrdersModel(self)
+        self.orders_table = self._create_view(self.orders_model)
         self.orders_table.horizontalHeader().setStretchLastSection(True)
-        self.orders_table.setSortingEnabled(True)
-        self.orders_table.setEditTriggers(QTableWidget.NoEditTriggers)
 
-        self.warehouse_table = QTableWidget()
-        self.warehouse_table.setColumnCount(6)
-        self.warehouse_table.setHorizontalHeaderLabels([
-            'Лекарство', 'Партии', 'Поставки',
-            'Количество', 'Минимум', 'Закупки',
-        ])
-        self.warehouse_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.warehouse_model = WarehouseModel(self)
+        self.warehouse_table = self._create_view(self.warehouse_model)
 
         self.details_tabs.addTab(self.orders_table, "📦 Заказы")
         self.details_tabs.addTab(self.warehouse_table, "🏭 Склад")
 
     def update_days(self, stats: list[PharmacyDayStatistics]):
-        self.days_table.setRowCount(len(stats))
-        for row, day in enumerate(stats):
-
-            items = [
-                QTableWidgetItem(f"День {day.day}"),
-                QTableWidgetItem(f"{day.revenue:.0f}₽"),
-                QTableWidgetItem(f"{day.profit:.0f}₽"),
-                QTableWidgetItem(f"{day.losses:.0f}₽"),
-                QTableWidgetItem(f"{day.margin:.1f}%")
-            ]
-
-            for col, item in enumerate(items):
-                item.setTextAlignment(Qt.AlignCenter)
-                self.days_table.setItem(row, col, item)
+        self.days_model.set_statistics(stats)
 
     def update_day_details(self, day_data: PharmacyDayStatistics):
-        valid_orders = [o for o in day_data.orders]
-        self.orders_table.setRowCount(len(valid_orders))
-
-        for row, order in enumerate(sorted(valid_orders, key=lambda x: x.customer.name)):
-            cells = [
-                QTableWidgetItem(order.customer.name),
-                QTableWidgetItem(order.customer.address),
-                QTableWidgetItem(order.type),
-                QTableWidgetItem(order.status),
-                QTableWidgetItem(f"{order.summary:,.0f}₽" if order.summary else ""),
-                QTableWidgetItem(", ".join(f"{med.name}×{qty}" for med, qty in order.requested_medicines.items())),
-            ]
-            for col, cell in enumerate(cells):
-                cell.setFlags(cell.flags() ^ Qt.ItemIsEditable)
-                self.orders_table.setItem(row, col, cell)
-
-        self.warehouse_table.setRowCount(len(day_data.warehouse.medicines.items()))
-        for row, (med, wm) in enumerate(day_data.warehouse.medicines.items()):
-            cells = [
-                QTableWidgetItem(med.name),
-                QTableWidgetItem(wm.str_batches()),
-                QTableWidgetItem(wm.str_awiting()),
-                QTableWidgetItem(str(wm.count)),
-                QTableWidgetItem(str(med.min_quantity)),
-                QTableWidgetItem(str(med.purchase_quantity)),
-            ]
-            for col, cell in enumerate(cells):
-                cell.setFlags(cell.flags() ^ Qt.ItemIsEditable)
-                self.warehouse_table.setItem(row, col, cell)
+        warehouse = day_data.warehouse
+        self.orders_model.set_orders(day_data.orders, warehouse.catalog)
+        self.warehouse_model.set_warehouse(warehouse)
 
-    def _on_day_selected(self):
-        if selected := self.days_table.selectedItems():
-            self.day_changed.emit(selected[0].row())
+    def _on_day_selected(self, current, previous):
+        if current.isValid():
+            self.day_changed.emit(self.days_model.source_row(current.row()))
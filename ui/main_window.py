@@ -1,6 +1,7 @@
 import matplotlib
 import matplotlib.pyplot as plt
 
+from PyQt5.QtCore import QThread, QTimer
 from PyQt5.QtGui import QDoubleValidator
 from PyQt5.QtWidgets import (
     QMainWindow,
@@ -12,15 +13,25 @@ from PyQt5.QtWidgets import (
     QPushButton,
     QLabel,
     QSpinBox,
+    QComboBox,
+    QCheckBox,
+    QFileDialog,
     QLineEdit,
     QGridLayout,
+    QProgressBar,
+    QMessageBox,
 )
 
 from .day_details_tab import DayDetailsTab
 from .stats_tab import StatsTab
 from .warehouse_tab import WarehouseConfigTab
+from .worker import SimulationProgress, SimulationWorker
 
 from ..business import Simulation, SimulationParams, PharmacyDayStatistics
+from ..business.dispatch import POLICIES
+from ..business.reorder import POLICIES as REORDER_POLICIES
+from ..business.profiling import Profiler, write_chrome_trace
+from ..business.tables import CatalogImportError
 
 
 matplotlib.use('Qt5Agg')
@@ -44,6 +55,9 @@ class MainWindow(QMainWindow):
 
         self.sim = None
         self.statistics: list[PharmacyDayStatistics] = []
+        self.checkpoints: list[bytes] = []
+        self.worker_thread: QThread | None = None
+        self.worker: SimulationWorker | None = None
 
     def init_ui(self):
         main_widget = QWidget()
@@ -85,6 +99,16 @@ class MainWindow(QMainWindow):
         self.sensitivity = QLineEdit('5')
         self.sensitivity.setValidator(QDoubleValidator(0, 100, 2))
 
+        self.dispatch_combo = QComboBox()
+        for name, policy in POLICIES.items():
+            self.dispatch_combo.addItem(policy.title, name)
+
+        self.reorder_combo = QComboBox()
+        for name, policy in REORDER_POLICIES.items():
+            self.reorder_combo.addItem(policy.title, name)
+
+        self.profile_check = QCheckBox('Замерять время этапов')
+
         # ------------- Параметры ------------
         self.control_panel = QGroupBox('Параметры моделирования')
         grid = QGridLayout()
@@ -103,6 +127,11 @@ class MainWindow(QMainWindow):
         grid.addWidget(self.base_orders, 0, 5)
         grid.addWidget(QLabel('Чувствительность наценки (%):'), 1, 4)
         grid.addWidget(self.sensitivity, 1, 5)
+        grid.addWidget(QLabel('Очередь доставки:'), 2, 0)
+        grid.addWidget(self.dispatch_combo, 2, 1)
+        grid.addWidget(QLabel('Правило закупок:'), 2, 2)
+        grid.addWidget(self.reorder_combo, 2, 3)
+        grid.addWidget(self.profile_check, 2, 4, 1, 2)
 
         grid.setColumnStretch(1, 1)
         grid.setColumnStretch(3, 1)
@@ -118,6 +147,9 @@ class MainWindow(QMainWindow):
         self.run_btn = QPushButton('\u25B6 Запустить')
         self.run_btn.clicked.connect(self.start_simulation)
 
+        self.prev_btn = QPushButton('Шаг назад')
+        self.prev_btn.clicked.connect(self.prev_day)
+
         self.next_btn = QPushButton('Шаг вперёд')
         self.next_btn.clicked.connect(self.next_day)
 
@@ -127,21 +159,36 @@ class MainWindow(QMainWindow):
         self.restart_btn = QPushButton('Начать заново')
         self.restart_btn.clicked.connect(self.restart_simulation)
 
+        self.cancel_btn = QPushButton('Остановить')
+        self.cancel_btn.clicked.connect(self.cancel_simulation)
+        self.cancel_btn.setEnabled(False)
+
+        self.profile_btn = QPushButton('Профиль')
+        self.profile_btn.clicked.connect(self.show_profile)
+        self.profile_btn.setEnabled(False)
+
         self.exit_btn = QPushButton('Выход')
         self.exit_btn.clicked.connect(self.close)
 
         btn_layout.addWidget(self.run_btn)
+        btn_layout.addWidget(self.prev_btn)
         btn_layout.addWidget(self.next_btn)
         btn_layout.addWidget(self.complete_btn)
+        btn_layout.addWidget(self.cancel_btn)
         btn_layout.addWidget(self.restart_btn)
+        btn_layout.addWidget(self.profile_btn)
         btn_layout.addWidget(self.exit_btn)
 
-        stretch_factors = [5, 1, 3, 5, 3]
+        stretch_factors = [5, 1, 1, 3, 2, 5, 2, 3]
         for idx, factor in enumerate(stretch_factors):
             btn_layout.setStretch(idx, factor)
 
         btn_panel.setLayout(btn_layout)
 
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setFormat('День %v из %m')
+        self.progress_bar.setValue(0)
+
 
         # ------------- Результаты ------------
         self.stats_tab = StatsTab()
@@ -156,6 +203,7 @@ class MainWindow(QMainWindow):
 
         layout.addWidget(self.control_panel)
         layout.addWidget(btn_panel)
+        layout.addWidget(self.progress_bar)
         layout.addWidget(results_tabs)
         layout.addWidget(self.results_label)
 
@@ -170,6 +218,7 @@ class MainWindow(QMainWindow):
         self.config_tab.customers_tab.setEnabled(False)
 
         self.run_btn.setEnabled(False)
+        self.prev_btn.setEnabled(False)
         self.next_btn.setEnabled(True)
         self.complete_btn.setEnabled(True)
         self.restart_btn.setEnabled(True)
@@ -180,26 +229,83 @@ class MainWindow(QMainWindow):
         self.config_tab.customers_tab.setEnabled(True)
 
         self.run_btn.setEnabled(True)
+        self.prev_btn.setEnabled(False)
         self.next_btn.setEnabled(False)
         self.complete_btn.setEnabled(False)
         self.restart_btn.setEnabled(False)
 
     def next_day(self):
+        self.checkpoints.append(self.sim.checkpoint())
         self.sim.next_day()
         self.update_visualization()
 
     def prev_day(self):
-        print('prev')
+        if not self.checkpoints:
+            return
+        self.sim.restore(self.checkpoints.pop())
+        self.update_visualization()
 
     def restart_simulation(self):
         self._unlock_simulation()
 
     def complete_simulation(self):
-        self.sim.complete()
+        self.statistics = list(self.sim.statistics)
+        self._set_running(True)
+
+        self.worker_thread = QThread(self)
+        self.worker = SimulationWorker(self.sim)
+        self.worker.moveToThread(self.worker_thread)
+        self.worker_thread.started.connect(self.worker.run)
+        self.worker.progress.connect(self._on_progress)
+        self.worker.finished.connect(self.worker_thread.quit)
+        self.worker_thread.finished.connect(self._on_simulation_finished)
+        self.worker_thread.start()
+
+    def cancel_simulation(self):
+        if self.worker:
+            self.cancel_btn.setEnabled(False)
+            self.worker.cancel()
+
+    def _set_running(self, running : bool):
+        self.cancel_btn.setEnabled(running)
+        self.restart_btn.setEnabled(not running)
+        self.profile_btn.setEnabled(not running and self.sim.profiler.enabled)
+        if running:
+            self.prev_btn.setEnabled(False)
+            self.next_btn.setEnabled(False)
+            self.complete_btn.setEnabled(False)
+
+    def _on_progress(self, progress : SimulationProgress):
+        self.checkpoints.extend(progress.checkpoints)
+        self.statistics.extend(progress.statistics)
+        self.progress_bar.setValue(progress.day)
+        self._show_results(self.statistics, progress.totals)
+        worker = self.worker
+        QTimer.singleShot(0, lambda: worker.acknowledge())
+
+    def _on_simulation_finished(self):
+        self.worker.deleteLater()
+        self.worker_thread.deleteLater()
+        self.worker = None
+        self.worker_thread = None
+        self._set_running(False)
         self.update_visualization()
 
+    def closeEvent(self, event):
+        if self.worker:
+            self.worker.cancel()
+            self.worker_thread.quit()
+            self.worker_thread.wait()
+        super().closeEvent(event)
+
     def start_simulation(self):
-        self._lock_simulation()
+        medicines = self.config_tab.get_medicines_data()
+        customers = self.config_tab.get_customers_data()
+        for title, table in (('Лекарства', medicines), ('Постоянные клиенты', customers)):
+            if errors := table.validate():
+                QMessageBox.warning(self, title, str(CatalogImportError(errors)))
+                return
+
         params = SimulationParams(
             days = self.days_spin.value(),
             couriers = self.couriers_spin.value(),
@@ -207,48 +313,76 @@ class MainWindow(QMainWindow):
             card_discount = float(self.discount_edit.text()) / 100,
             base_orders = self.base_orders.value(),
             sensitivity = float(self.sensitivity.text()) / 100,
+            dispatch = self.dispatch_combo.currentData(),
+            reorder = self.reorder_combo.currentData(),
         )
 
-        medicines = self.config_tab.get_medicines_data()
-        customers = self.config_tab.get_customers_data()
+        try:
+            self.sim = Simulation(params, medicines, customers, profiler=Profiler() if self.profile_check.isChecked() else None)
+        except CatalogImportError as e:
+            QMessageBox.warning(self, 'Постоянные клиенты', str(e))
+            return
 
-        self.sim = Simulation(params, medicines, customers)
+        self._lock_simulation()
+        self.checkpoints = []
+        self.progress_bar.setRange(0, params.days)
         self.update_visualization()
 
     def update_visualization(self):
         if not self.sim:
             return
 
-        if self.sim.is_complete:
-            self.next_btn.setEnabled(False)
-            self.complete_btn.setEnabled(False)
-
-        statistics = self.sim.statistics
-
-        days = [s.day for s in statistics]
-        profit = [s.profit for s in statistics]
-        losses = [s.losses for s in statistics]
-        orders = [len(s.orders) for s in statistics]
-        delivered = [
-            sum(1 for o in s.orders if o.is_delivered)
-            for s in statistics
-        ]
-
-        self.stats_tab.plot(days, profit, losses, orders, delivered)
+        self.next_btn.setEnabled(not self.sim.is_complete)
+        self.complete_btn.setEnabled(not self.sim.is_complete)
+        self.prev_btn.setEnabled(bool(self.checkpoints))
+        self.profile_btn.setEnabled(self.sim.profiler.enabled and not self.worker)
+        self.progress_bar.setValue(self.sim.current_day - 1)
+
+        self._show_results(self.sim.statistics, self.sim.totals.to_dict())
+
+    def _show_results(self, statistics : list[PharmacyDayStatistics], total : dict):
+        plotted = len(self.stats_tab.days)
+        if plotted > len(statistics) or (plotted and self.stats_tab.days[plotted - 1] != statistics[plotted - 1].day):
+            self.stats_tab.reset()
+            plotted = 0
+
+        new_days = statistics[plotted:]
+        self.stats_tab.append(
+            [s.day for s in new_days],
+            [s.profit for s in new_days],
+            [s.losses for s in new_days],
+            [s.order_count for s in new_days],
+            [s.delivered for s in new_days],
+        )
 
         self.details_tab.update_days(statistics)
 
-        total = sum(statistics)
-        if total == 0:
+        if total['days'] == 0:
+            self.results_label.clear()
             return
         text = (
-            f'📈 Общий доход:      {total.revenue:.0f}₽\n'
-            f'💰 Чистая прибыль:  {total.profit:.0f}₽\n'
-            f'📉 Потери:                 {total.losses:.0f}₽\n'
-            f'🎯 Маржинальность: {total.margin:.1f}%\n'
+            f'📈 Общий доход:      {total["revenue"]["total"]:.0f}₽\n'
+            f'💰 Чистая прибыль:  {total["profit"]["total"]:.0f}₽\n'
+            f'📉 Потери:                 {total["losses"]["total"]:.0f}₽\n'
+            f'🎯 Маржинальность: {total["margin"]:.1f}%\n'
         )
         self.results_label.setText(text)
 
+    def show_profile(self):
+        profiler = self.sim.profiler
+        box = QMessageBox(self)
+        box.setWindowTitle('Время этапов')
+        box.setText(f'<pre>{profiler.summary_table()}</pre>')
+        save_btn = box.addButton('Сохранить трассу…', QMessageBox.ActionRole)
+        box.addButton(QMessageBox.Close)
+        box.exec_()
+
+        if box.clickedButton() is save_btn:
+            filename, _ = QFileDialog.getSaveFileName(self, 'Трасса Chrome', 'trace.json', 'JSON (*.json)')
+            if filename:
+                write_chrome_trace(filename, [profiler])
+
     def show_day_details(self, day_idx):
-        if self.sim and 0 <= day_idx < len(self.sim.statistics):
-            self.details_tab.update_day_details(self.sim.statistics[day_idx])
+        statistics = self.statistics if self.worker else self.sim.statistics if self.sim else []
+        if 0 <= day_idx < len(statistics):
+            self.details_tab.update_day_details(statistics[day_idx])
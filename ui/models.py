@@ -0,0 +1,281 @@
+import numpy as np
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+
+from ..business import PharmacyDayStatistics
+from ..business.medicine import MedicineCatalog
+from ..business.order import Order
+from ..business.tables import ColumnarTable
+from ..business.warehouse import Warehouse
+
+
+class ColumnarTableModel(QAbstractTableModel):
+    """
+    Таблица поверх столбцов-массивов. Текст ячейки формируется только при запросе
+    представлением (то есть для видимых строк), сортировка — перестановка индексов строк.
+    """
+    HEADERS: list[str] = []
+    ALIGNMENT = Qt.AlignLeft | Qt.AlignVCenter
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = np.arange(0)
+        self.sort_column = 0
+        self.sort_order = Qt.AscendingOrder
+
+    def row_count(self) -> int:
+        return 0
+
+    def sort_key(self, column : int) -> np.ndarray:
+        raise NotImplementedError
+
+    def display(self, row : int, column : int) -> str:
+        raise NotImplementedError
+
+    def source_row(self, row : int) -> int:
+        return int(self.rows[row])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.display(self.source_row(index.row()), index.column())
+        if role == Qt.TextAlignmentRole:
+            return int(self.ALIGNMENT)
+        return None
+
+    def _sorted_rows(self) -> np.ndarray:
+        rows = np.argsort(self.sort_key(self.sort_column), kind='stable')
+        if self.sort_order == Qt.DescendingOrder:
+            rows = rows[::-1]
+        return rows
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        if not self.row_count():
+            return
+
+        self.layoutAboutToBeChanged.emit()
+        old_rows = self.rows
+        self.rows = self._sorted_rows()
+
+        positions = np.empty_like(self.rows)
+        positions[self.rows] = np.arange(len(self.rows))
+        old_indexes = self.persistentIndexList()
+        new_indexes = [
+            self.index(int(positions[old_rows[index.row()]]), index.column())
+            for index in old_indexes
+        ]
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
+
+    def _reset(self):
+        self.beginResetModel()
+        self.rows = self._sorted_rows() if self.row_count() else np.arange(0)
+        self.endResetModel()
+
+
+class DaysModel(ColumnarTableModel):
+    HEADERS = ['День', 'Доход', 'Прибыль', 'Потери', 'Маржинальность']
+    ALIGNMENT = Qt.AlignCenter
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.columns = self._empty_columns()
+
+    @staticmethod
+    def _empty_columns() -> list[np.ndarray]:
+        return [np.zeros(0, dtype=np.int64)] + [np.zeros(0) for _ in range(4)]
+
+    def row_count(self) -> int:
+        return len(self.columns[0])
+
+    def sort_key(self, column : int) -> np.ndarray:
+        return self.columns[column]
+
+    def display(self, row : int, column : int) -> str:
+        value = self.columns[column][row]
+        if column == 0:
+            return f"День {value}"
+        if column == 4:
+            return f"{value:.1f}%"
+        return f"{value:.0f}₽"
+
+    def set_statistics(self, stats : list[PharmacyDayStatistics]):
+        """
+        Дописывает только новые дни; при откате или новой симуляции таблица строится заново.
+        """
+        days = self.columns[0]
+        known = len(days)
+        if known > len(stats) or (known and days[-1] != stats[known - 1].day):
+            self.columns = self._empty_columns()
+            known = 0
+
+        new_days = list(stats)[known:]
+        if not new_days and known:
+            return
+
+        added = [
+            np.array([s.day for s in new_days], dtype=np.int64),
+            np.array([s.revenue for s in new_days], dtype=float),
+            np.array([s.profit for s in new_days], dtype=float),
+            np.array([s.losses for s in new_days], dtype=float),
+            np.array([s.margin for s in new_days], dtype=float),
+        ]
+        self.columns = [np.concatenate((column, values)) for column, values in zip(self.columns, added)]
+
+        if known and self.sort_column == 0 and self.sort_order == Qt.AscendingOrder:
+            self.beginInsertRows(QModelIndex(), known, known + len(new_days) - 1)
+            self.rows = np.arange(self.row_count())
+            self.endInsertRows()
+        else:
+            self._reset()
+
+
+class OrdersModel(ColumnarTableModel):
+    HEADERS = ['Клиент', 'Адрес', 'Тип', 'Статус', 'Сумма', 'Товары']
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.orders: list[Order] = []
+        self.catalog: MedicineCatalog | None = None
+        self.names = self.addresses = self.types = self.statuses = np.zeros(0, dtype=str)
+        self.summaries = np.zeros(0)
+
+    def row_count(self) -> int:
+        return len(self.orders)
+
+    def set_orders(self, orders : list[Order], catalog : MedicineCatalog):
+        self.orders = orders
+        self.catalog = catalog
+        self.names = np.array([order.customer.name for order in orders], dtype=str)
+        self.addresses = np.array([order.customer.address for order in orders], dtype=str)
+        self.types = np.array([order.type.value for order in orders], dtype=str)
+        self.statuses = np.array([order.status.value for order in orders], dtype=str)
+        self.summaries = np.array([order.summary or .0 for order in orders], dtype=float)
+        self._reset()
+
+    def _medicines(self, row : int) -> str:
+        return ", ".join(
+            f"{self.catalog[med_id].name}×{qty}"
+            for med_id, qty in self.orders[row].requested_medicines.items()
+        )
+
+    def sort_key(self, column : int) -> np.ndarray:
+        if column == 5:
+            return np.array([self._medicines(row) for row in range(len(self.orders))], dtype=str)
+        return (self.names, self.addresses, self.types, self.statuses, self.summaries)[column]
+
+    def display(self, row : int, column : int) -> str:
+        if column == 4:
+            summary = self.summaries[row]
+            return f"{summary:,.0f}₽" if summary else ""
+        if column == 5:
+            return self._medicines(row)
+        return str((self.names, self.addresses, self.types, self.statuses)[column][row])
+
+
+class WarehouseModel(ColumnarTableModel):
+    HEADERS = ['Лекарство', 'Партии', 'Поставки', 'Количество', 'Минимум', 'Закупки']
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.warehouse: Warehouse | None = None
+        self.names = np.zeros(0, dtype=str)
+        self.counts = self.min_quantities = self.purchase_quantities = np.zeros(0, dtype=np.int64)
+
+    def row_count(self) -> int:
+        return len(self.names)
+
+    def set_warehouse(self, warehouse : Warehouse):
+        self.warehouse = warehouse
+        medicines = warehouse.medicines
+        self.names = np.array([wm.medicine.name for wm in medicines], dtype=str)
+        self.counts = np.array([wm.count for wm in medicines], dtype=np.int64)
+        self.min_quantities = np.array([wm.medicine.min_quantity for wm in medicines], dtype=np.int64)
+        self.purchase_quantities = np.array([wm.medicine.purchase_quantity for wm in medicines], dtype=np.int64)
+        self._reset()
+
+    def sort_key(self, column : int) -> np.ndarray:
+        if column in (1, 2):
+            return np.array([self.display(row, column) for row in range(self.row_count())], dtype=str)
+        return (self.names, None, None, self.counts, self.min_quantities, self.purchase_quantities)[column]
+
+    def display(self, row : int, column : int) -> str:
+        if column == 1:
+            return self.warehouse.medicines[row].str_batches()
+        if column == 2:
+            return self.warehouse.medicines[row].str_awiting()
+        return str((self.names, None, None, self.counts, self.min_quantities, self.purchase_quantities)[column][row])
+
+
+class CatalogTableModel(QAbstractTableModel):
+    """
+    Редактируемое представление справочника (`MedicineTable`, `CustomerTable`).
+    Данные хранит сама таблица, модель только читает и правит её ячейки.
+    """
+    edit_failed = pyqtSignal(str)
+
+    def __init__(self, table : ColumnarTable, parent=None):
+        super().__init__(parent)
+        self.table = table
+
+    def set_table(self, table : ColumnarTable):
+        self.beginResetModel()
+        self.table = table
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.table)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.table.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.table.COLUMNS[section].title
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        return super().flags(index) | Qt.ItemIsEditable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role in (Qt.DisplayRole, Qt.EditRole):
+            return self.table.cell(index.row(), index.column())
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        try:
+            self.table.set_cell(index.row(), index.column(), str(value))
+        except ValueError as e:
+            self.edit_failed.emit(f'{self.table.COLUMNS[index.column()].title}: {e}')
+            return False
+
+        self.dataChanged.emit(index, index)
+        return True
+
+    def insertRows(self, row, count, parent=QModelIndex()):
+        self.beginInsertRows(parent, row, row + count - 1)
+        self.table.insert_rows(row, count)
+        self.endInsertRows()
+        return True
+
+    def removeRows(self, row, count, parent=QModelIndex()):
+        self.beginRemoveRows(parent, row, row + count - 1)
+        self.table.remove_rows(row, count)
+        self.endRemoveRows()
+        return True
@@ -3,14 +3,31 @@ from PyQt5.QtWidgets import (
     QVBoxLayout,
 )
 
+import numpy as np
+
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.collections import PolyCollection
 from matplotlib.figure import Figure
+from matplotlib.patches import Patch
+from matplotlib.path import Path
 from matplotlib.ticker import FuncFormatter
 
+
+BAR_WIDTH = 0.4
+
+
 class StatsTab(QWidget):
+    """
+    Графики по дням. Линии и столбцы создаются один раз, новые дни дописываются
+    в их данные (`append`), а перерисовка откладывается через `draw_idle`.
+
+    Значения линий хранятся в numpy-буферах с запасом (ёмкость удваивается), столбцы нового
+    дня добавляются к путям коллекций, так что день обходится O(1) на стороне данных.
+    Сами линии копируют переданный срез, а отрисовка обходит все дни.
+    """
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.figure = Figure(figsize=(10, 6), dpi=100)
+        self.figure = Figure(figsize=(10, 6), dpi=100, layout='none')
         self.canvas = FigureCanvas(self.figure)
         self.ax = self.figure.add_subplot(111)
         self.ax2 = self.ax.twinx()
@@ -19,34 +36,92 @@ class StatsTab(QWidget):
         self.ax2.set_ylabel('Количество', fontsize=10)
         self.ax2.yaxis.set_label_coords(1.1, 0.5)
         self.ax.grid(True, linestyle='--', alpha=0.5)
+        self.ax.set_xlabel('Дни', fontsize=10)
+        self.ax.set_title('Финансовые показатели и заказы', fontsize=12)
+        self.ax.yaxis.set_major_formatter(FuncFormatter(lambda x, _: f"{x:,.0f}₽"))
+
+        self.profit_line, = self.ax.plot([], [], 'g-', label='Прибыль', marker='o')
+        self.losses_line, = self.ax.plot([], [], 'r--', label='Потери', marker='x')
+        self.orders_bars = PolyCollection([], facecolors='C0', alpha=0.5)
+        self.delivered_bars = PolyCollection([], facecolors='C1', alpha=0.5)
+        self.ax2.add_collection(self.orders_bars)
+        self.ax2.add_collection(self.delivered_bars)
+
+        self.ax.legend(
+            [
+                self.profit_line,
+                self.losses_line,
+                Patch(facecolor='C0', alpha=0.5),
+                Patch(facecolor='C1', alpha=0.5),
+            ],
+            ['Прибыль', 'Потери', 'Все заказы', 'Доставленные'],
+            loc='upper left',
+        )
+        self.figure.tight_layout()
 
         layout = QVBoxLayout()
         layout.addWidget(self.canvas)
         self.setLayout(layout)
 
-    def plot(self, days, profit, losses, orders, delivered):
-        try:
-            self.ax.cla()
-            self.ax2.cla()
+        self._clear_data()
 
-            self.ax.plot(days, profit, 'g-', label='Прибыль', marker='o')
-            self.ax.plot(days, losses, 'r--', label='Потери', marker='x')
+    def _clear_data(self):
+        self.size = 0
+        self.data = np.zeros((3, 64))
+        self.orders_bars.set_verts([])
+        self.delivered_bars.set_verts([])
+        self.money_range = [0.0, 0.0]
+        self.count_max = 0
 
-            x = [d-0.2 for d in days]
-            bars1 = self.ax2.bar(x, orders, 0.4, label='Все заказы', alpha=0.5)
-            x = [d+0.2 for d in days]
-            bars2 = self.ax2.bar(x, delivered, 0.4, label='Доставленные', alpha=0.5)
+    @property
+    def days(self) -> np.ndarray:
+        return self.data[0, :self.size]
 
-            self.ax.set_xlabel('Дни', fontsize=10)
-            self.ax.set_title('Финансовые показатели и заказы', fontsize=12)
+    @staticmethod
+    def _bar(x, height):
+        return Path([(x, 0), (x, height), (x + BAR_WIDTH, height), (x + BAR_WIDTH, 0), (x, 0)], closed=True)
 
-            lines, labels = self.ax.get_legend_handles_labels()
-            bars, bar_labels = self.ax2.get_legend_handles_labels()
-            self.ax.legend(lines + bars, labels + bar_labels, loc='upper left')
+    def reset(self):
+        self._clear_data()
+        self._update_artists()
 
-            self.ax.yaxis.set_major_formatter(FuncFormatter(lambda x, _: f"{x:,.0f}₽"))
-            self.figure.tight_layout()
-            self.canvas.draw()
+    def append(self, days, profit, losses, orders, delivered):
+        try:
+            orders_paths = self.orders_bars.get_paths()
+            delivered_paths = self.delivered_bars.get_paths()
+            for day, day_profit, day_losses, day_orders, day_delivered in zip(days, profit, losses, orders, delivered):
+                if self.size == self.data.shape[1]:
+                    self.data = np.concatenate([self.data, np.zeros_like(self.data)], axis=1)
+                self.data[:, self.size] = day, day_profit, day_losses
+                self.size += 1
+                orders_paths.append(self._bar(day - BAR_WIDTH, day_orders))
+                delivered_paths.append(self._bar(day, day_delivered))
+
+                self.money_range[0] = min(self.money_range[0], day_profit, day_losses)
+                self.money_range[1] = max(self.money_range[1], day_profit, day_losses)
+                self.count_max = max(self.count_max, day_orders, day_delivered)
+
+            self.orders_bars.stale = True
+            self.delivered_bars.stale = True
+            self._update_artists()
 
         except Exception as e:
             print(f"Ошибка графиков: {str(e)}")
+
+    def plot(self, days, profit, losses, orders, delivered):
+        self._clear_data()
+        self.append(days, profit, losses, orders, delivered)
+
+    def _update_artists(self):
+        days, profit, losses = self.data[:, :self.size]
+        self.profit_line.set_data(days, profit)
+        self.losses_line.set_data(days, losses)
+
+        if self.size:
+            self.ax.set_xlim(self.days[0] - 1, self.days[-1] + 1)
+            low, high = self.money_range
+            pad = (high - low) * 0.05 or 1
+            self.ax.set_ylim(low - pad, high + pad)
+            self.ax2.set_ylim(0, self.count_max * 1.1 or 1)
+
+        self.canvas.draw_idle()
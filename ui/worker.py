@@ -0,0 +1,80 @@
+import threading
+import time
+
+from pydantic import BaseModel
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from ..business import Simulation, PharmacyDayStatistics
+
+
+class SimulationProgress(BaseModel):
+    """
+    Пачка дней, посчитанных потоком моделирования с прошлого сигнала.
+    """
+    day         : int
+    days        : int
+    statistics  : list[PharmacyDayStatistics] = []
+    checkpoints : list[bytes] = []
+    totals      : dict = {}
+
+    class Config:
+        arbitrary_types_allowed = True
+
+
+class SimulationWorker(QObject):
+    """
+    Моделирует оставшиеся дни в отдельном потоке. С виджетами не работает: результаты уходят
+    сигналом `progress` не чаще раза в `interval` секунд, остановка — через `cancel()`.
+
+    После каждого сигнала поток ждёт `acknowledge()` от интерфейса: пока окно перерисовывается,
+    моделирование не отнимает у него GIL. Если перерисовка долгая, сигналы становятся реже,
+    чтобы на неё уходило не больше `1 / (SIM_TO_UI + 1)` времени.
+    """
+    SIM_TO_UI = 4
+
+    progress = pyqtSignal(object)
+    finished = pyqtSignal()
+
+    def __init__(self, sim : Simulation, interval : float = 0.25):
+        super().__init__()
+        self.sim = sim
+        self.interval = interval
+        self._cancelled = threading.Event()
+        self._acknowledged = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+        self._acknowledged.set()
+
+    def acknowledge(self):
+        self._acknowledged.set()
+
+    def _batch(self) -> SimulationProgress:
+        return SimulationProgress(day=self.sim.current_day - 1, days=self.sim.params.days)
+
+    def run(self):
+        batch = self._batch()
+        last_emit = time.monotonic()
+        interval = self.interval
+
+        while not self.sim.is_complete and not self._cancelled.is_set():
+            batch.checkpoints.append(self.sim.checkpoint())
+            batch.statistics.append(self.sim.next_day())
+
+            if time.monotonic() - last_emit >= interval:
+                self._acknowledged.clear()
+                self._emit(batch)
+                started = time.monotonic()
+                self._acknowledged.wait()
+
+                last_emit = time.monotonic()
+                interval = max(self.interval, self.SIM_TO_UI * (last_emit - started))
+                batch = self._batch()
+
+        self._emit(batch)
+        self.finished.emit()
+
+    def _emit(self, batch : SimulationProgress):
+        batch.day = self.sim.current_day - 1
+        batch.totals = self.sim.totals.to_dict()
+        self.progress.emit(batch)